@@ -3,21 +3,53 @@ MULTI-AGENT ORCHESTRATOR - WITH REAL DUCKDUCKGO WEB SEARCH
 ============================================================
 
 Agents:
-1. Law Identifier - Extracts IPC sections and laws
+1. Law Identifier - Extracts IPC sections and laws (regex first, LLM for the rest)
 2. Web Research - Uses REAL DuckDuckGo search for relevant case law
 3. Precedent Analyzer - Analyzes citations and precedents
 4. Logic Auditor - Checks reasoning and consistency
 5. Summary Writer - Creates citizen-friendly summary
 
+Fast mode: a single agent returns laws, precedent analysis, logic audit and
+summary as one JSON object (falls back to the five agents on bad JSON).
+
 FIXED: Now uses actual DuckDuckGo to get REAL, RELEVANT links
        (not hardcoded fake URLs)
+
+PROMPT LAYOUT: All agents share one system message (judgment + RAG context)
+       and append only their own task, so Ollama reuses the cached prefix.
+
+DEADLINES: Each agent can run under its own timeout and the whole run under
+       a time budget. An agent that times out, fails, or has no budget left
+       is replaced by a degraded result (e.g. web research skipped, short
+       extractive summary) and listed in "degraded_agents". LLM calls can be
+       hedged: if the first backend has not answered after `hedge_after`
+       seconds, the same prompt goes to `hedge_llm` and the first answer wins.
+
+CHECKPOINTS: With a CheckpointStore, the state is saved after each agent and
+       restored on the next run with the same inputs, prompts and models
+       (see checkpoints.py), so retries and prompt changes rerun only the
+       agents that are affected.
 """
 
+import contextvars
 import json
+import math
 import re
-from typing import TypedDict, Annotated, List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
+from typing import Dict, Optional, TypedDict, Annotated, List
+from pydantic import ValidationError
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
+from schemas import FastAnalysisOutput
+from law_extractor import LawExtractor
+from citation_index import CitationIndex, format_candidates
+from checkpoints import CheckpointStore, chain, fingerprint, restore_state
+from scheduler import QueueTimeout, call_limits, current_call_limits
+import metrics
+import tracing
+
 # --- AGENT STATE ---
 
 class AgentState(TypedDict):
@@ -27,34 +59,204 @@ class AgentState(TypedDict):
     web_research: str
     web_sources: List[dict]
     laws_found: str
+    sections_found: List[str]
     precedent_analysis: str
     logic_audit: str
     final_summary: str
     messages: Annotated[List, list.__add__]
+    llm_calls: List[dict]
     current_agent: str
+    deadline: float            # time.monotonic() by which the running agent must finish
+    budget_deadline: float     # ... and the whole run
+    precedent_candidates: List[dict]   # ranked cases from the citation index
+    related_precedents: List[dict]     # case-graph neighbours of the top candidates
+    degraded_agents: List[dict]
+    resumed_agents: List[str]  # restored from checkpoints instead of rerun
+
+
+class AgentTimeout(TimeoutError):
+    """An agent (or its LLM call) ran past its deadline"""
+
+
+class FastParseError(ValueError):
+    """The fast-mode reply was not the expected JSON object"""
+
+
+# Agents and hedged calls run on worker threads so a slow call can be
+# abandoned. A call already running on a backend cannot be stopped; its
+# thread finishes in the background and its result is dropped. Calls still
+# queued for a slot, and calls not started yet, give up (scheduler.call_limits).
+# Submitting through a copied context keeps contextvars (scheduler priority,
+# call limits, trace span, stage timings).
+_AGENT_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="agent")
+_CALL_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-call")
+
+
+def _submit(executor: ThreadPoolExecutor, fn, *args):
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _run_with_limits(agent: "BaseAgent", state: "AgentState", cancel: threading.Event) -> "AgentState":
+    with call_limits(state['deadline'], cancel):
+        return agent.run(state)
+
+
+# --- SHARED PROMPT PREFIX ---
+# Every agent sends the SAME system message (instructions + judgment + RAG
+# context) first and appends only its own task afterwards. Ollama keeps the
+# KV cache of the last prompt while the model stays loaded, so agents 2-5
+# only have to prefill their short task instead of the whole judgment again.
+
+JUDGMENT_CHARS = 3000
+RAG_CHARS = 1000
+
+SYSTEM_PROMPT = """You are one specialist in a team of legal analysis agents reviewing an Indian court judgment.
+All specialists receive the same judgment and reference material below.
+Answer ONLY the task given to you after this message."""
+
+
+def build_shared_prefix(state: AgentState) -> List:
+    """System message shared byte-for-byte by every agent for one judgment"""
+    return [SystemMessage(content=f"""{SYSTEM_PROMPT}
+
+JUDGMENT TEXT:
+{state['judgment_text'][:JUDGMENT_CHARS]}
+
+RAG CONTEXT (similar cases):
+{state['rag_context'][:RAG_CHARS]}""")]
+
+
+def log_prompt_eval(agent_name: str, response) -> None:
+    """Print Ollama prefill statistics (prompt tokens evaluated and time taken)"""
+    meta = getattr(response, "response_metadata", None) or {}
+    if "prompt_eval_duration" not in meta:
+        return
+    tokens = meta.get("prompt_eval_count", 0)
+    millis = meta.get("prompt_eval_duration", 0) / 1e6
+    print(f"   ⏱️ [{agent_name}] prompt eval: {tokens} tokens in {millis:.0f} ms")
+
+
+def llm_call_stats(agent_name: str, llm, response, latency: float) -> dict:
+    """Model, latency and token usage of one agent LLM call"""
+    meta = getattr(response, "response_metadata", None) or {}
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "agent": agent_name,
+        "model": meta.get("model") or meta.get("model_name") or getattr(llm, "model", "unknown"),
+        "latency_ms": round(latency * 1000, 1),
+        "prompt_tokens": usage.get("input_tokens", meta.get("prompt_eval_count", 0)),
+        "completion_tokens": usage.get("output_tokens", meta.get("eval_count", 0)),
+        "prompt_eval_ms": round(meta.get("prompt_eval_duration", 0) / 1e6, 1),
+    }
+
+
+def extractive_summary(text: str, sentences: int = 3) -> str:
+    """First few substantial sentences - the summary of last resort"""
+    found = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.strip()) > 40]
+    return " ".join(found[:sentences])
 
 
 # --- INDIVIDUAL AGENTS ---
 
-class LawIdentifierAgent:
-    """Agent 1: Specializes in finding applicable laws and IPC sections"""
+class BaseAgent:
+    """Common LLM plumbing: shared prefix + agent-specific task message"""
+
+    name = "Agent"
+    key = ""                  # agent key in MultiAgentOrchestrator.AGENT_KEYS
+    optional = False          # skipped first when the time budget runs short
+    passthrough_errors = ()   # exception types that propagate instead of degrading
+    # Why an agent's own output is missing, as shown in its fallback text
+    DEGRADE_REASONS = {"budget": "time budget", "timeout": "time budget", "error": "backend error"}
     
     def __init__(self, llm):
         self.llm = llm
-        self.name = "Law Identifier"
+        self.hedge_llm = None
+        self.hedge_after: Optional[float] = None
     
-    def run(self, state: AgentState) -> AgentState:
-        print(f"\n🔍 {self.name} Agent is working...")
+    def _invoke(self, state: AgentState, messages):
+        """(response, llm that answered, hedged?) - first of primary/hedge to finish"""
+        _, cancel = current_call_limits()
+        if cancel is not None and cancel.is_set():
+            raise AgentTimeout(f"{self.name}: abandoned before the LLM call")
+        remaining = state.get('deadline', math.inf) - time.monotonic()
+        if self.hedge_llm is None or self.hedge_after is None:
+            return self.llm.invoke(messages), self.llm, False
+        if remaining <= 0:
+            raise AgentTimeout(f"{self.name}: no time left for the LLM call")
         
-        prompt = f"""You are a Legal Law Identification Specialist.
+        calls = {_submit(_CALL_EXECUTOR, self.llm.invoke, messages): (self.llm, "primary")}
+        done, _ = wait(calls, timeout=min(self.hedge_after, remaining))
+        if not done or next(iter(done)).exception() is not None:
+            # Slow or failed: race the same prompt on the hedge backend
+            calls[_submit(_CALL_EXECUTOR, self.hedge_llm.invoke, messages)] = (self.hedge_llm, "hedge")
+
+        pending = set(calls)
+        while pending:
+            remaining = state.get('deadline', math.inf) - time.monotonic()
+            done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    llm, winner = calls[future]
+                    hedged = len(calls) > 1
+                    if hedged:
+                        metrics.HEDGED_CALLS.inc(agent=self.key, winner=winner)
+                    return future.result(), llm, hedged
+            if not pending:
+                raise next(iter(done)).exception()
+        raise AgentTimeout(f"{self.name}: LLM call exceeded its deadline")
+
+    def ask(self, state: AgentState, task: str) -> str:
+        messages = build_shared_prefix(state) + [HumanMessage(content=task)]
+        with tracing.span("llm.invoke", agent=self.name) as span:
+            start = time.perf_counter()
+            response, llm, hedged = self._invoke(state, messages)
+            call = llm_call_stats(self.name, llm, response, time.perf_counter() - start)
+            call['hedged'] = hedged
+            span.set_attributes({
+                "llm.model": call['model'],
+                "llm.prompt_tokens": call['prompt_tokens'] or 0,
+                "llm.completion_tokens": call['completion_tokens'] or 0,
+                "llm.prompt_eval_ms": call['prompt_eval_ms'],
+                "prompt.judgment_truncated": len(state['judgment_text']) > JUDGMENT_CHARS,
+                "prompt.rag_truncated": len(state['rag_context']) > RAG_CHARS,
+                "prompt.task_chars": len(task),
+            })
+        state['llm_calls'].append(call)
+        metrics.observe_llm_call(call)
+        log_prompt_eval(self.name, response)
+        return response.content.strip()
+
+    def fingerprint(self) -> str:
+        """Prompts + model: a change to either invalidates this agent's checkpoints"""
+        prompts = sorted(
+            (name, value) for cls in type(self).__mro__ for name, value in vars(cls).items()
+            if name.isupper() and isinstance(value, str)
+        )
+        return fingerprint(SYSTEM_PROMPT, json.dumps(prompts), str(getattr(self.llm, "model", "")))
 
-YOUR JOB: Identify ALL applicable laws, IPC sections, and legal provisions from this judgment.
+    def mark_degraded(self, state: AgentState, reason: str, detail: str = "") -> None:
+        """Record a fallback in the result - degraded results are never checkpointed"""
+        print(f"   ⏱️ {self.name} degraded ({reason}{': ' + detail if detail else ''})")
+        metrics.AGENT_DEGRADED.inc(agent=self.key, reason=reason)
+        state['degraded_agents'].append({"agent": self.name, "reason": reason, "detail": detail})
 
-JUDGMENT TEXT:
-{state['judgment_text'][:3000]}
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        """Fallback output when the agent cannot finish (override per agent)"""
+        state['current_agent'] = self.name
+        return state
 
-RAG CONTEXT (similar cases):
-{state['rag_context'][:1000]}
+
+class LawIdentifierAgent(BaseAgent):
+    """Agent 1: Specializes in finding applicable laws and IPC sections"""
+
+    name = "Law Identifier"
+    key = "law"
+
+    PROMPT = """YOUR ROLE: Legal Law Identification Specialist.
+
+YOUR JOB: Identify ALL applicable laws, IPC sections, and legal provisions from the judgment above.
 
 INSTRUCTIONS:
 - Extract all IPC sections, Acts, and legal provisions mentioned
@@ -65,32 +267,85 @@ INSTRUCTIONS:
 
 EXTRACT LAWS:"""
 
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        laws = response.content.strip()
+    GAP_PROMPT = """YOUR ROLE: Legal Law Identification Specialist.
+
+ALREADY IDENTIFIED (do not repeat these):
+{resolved}
+
+UNRESOLVED REFERENCES (no Act is named next to them in the judgment):
+{unresolved}
+
+YOUR JOB:
+- Name the Act each unresolved reference belongs to, judging from the judgment above
+- Add any other applicable laws or provisions that are missing
+- Format each as: "Section XXX (Act Name) - Description"
+
+ADDITIONAL LAWS:"""
+
+    def __init__(self, llm, extractor: LawExtractor = None):
+        super().__init__(llm)
+        self.extractor = extractor or LawExtractor()
+
+    def run(self, state: AgentState) -> AgentState:
+        print(f"\n🔍 {self.name} Agent is working...")
+
+        # Regex/lookup pass first - the LLM only resolves what it cannot
+        refs = self.extractor.extract(state['judgment_text'])
+        resolved = [ref for ref in refs if ref.resolved]
+        unresolved = [ref for ref in refs if not ref.resolved]
+        if not refs:
+            laws = self.ask(state, self.PROMPT)
+            refs = self.extractor.extract(laws)
+        elif not unresolved:
+            laws = self.extractor.format_laws(refs)
+            print(f"   ⚡ Extractor resolved {len(refs)} references (LLM skipped)")
+        else:
+            print(f"   ⚡ Extractor resolved {len(resolved)} references, asking the LLM about {len(unresolved)}")
+            answer = self.ask(state, self.GAP_PROMPT.format(
+                resolved=self.extractor.format_laws(resolved) or "(none)",
+                unresolved="\n".join(ref.format() for ref in unresolved),
+            ))
+            answered = [ref for ref in self.extractor.extract(answer) if ref.resolved]
+            # References the LLM could not place are kept as "Act not stated"
+            still_open = [ref for ref in unresolved
+                          if ref.section not in {a.section for a in answered}]
+            laws = "\n".join(part for part in (self.extractor.format_laws(resolved), answer.strip(),
+                                                self.extractor.format_laws(still_open)) if part)
+            refs = resolved + answered
         
         state['laws_found'] = laws
+        state['sections_found'] = self.extractor.ipc_sections(refs)
         state['messages'].append(AIMessage(content=f"[{self.name}] Found laws: {laws[:80]}..."))
         state['current_agent'] = self.name
         
         print(f"   ✅ Found laws: {laws[:100]}...")
         return state
 
+    def fingerprint(self) -> str:
+        # The extractor's section table and default Act decide what the LLM is asked
+        return fingerprint(super().fingerprint(), json.dumps(self.extractor.section_titles, sort_keys=True),
+                           self.extractor.default_act)
 
-class WebResearchAgent:
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        refs = self.extractor.extract(state['judgment_text'])
+        state['laws_found'] = (self.extractor.format_laws(refs) if refs else
+                               f"Applicable laws could not be identified ({self.DEGRADE_REASONS[reason]}).")
+        state['sections_found'] = self.extractor.ipc_sections(refs)
+        return super().degrade(state, reason)
+
+
+class WebResearchAgent(BaseAgent):
     """Agent 2: Uses REAL DuckDuckGo search for relevant legal links"""
     
-    def __init__(self, llm, web_search_function=None):
-        self.llm = llm
-        self.web_search_function = web_search_function
-        self.name = "Web Research"
+    name = "Web Research"
+    key = "web"
+    optional = True
     
-    def _extract_core_facts(self, text: str, laws: str) -> str:
-        """Extract core facts for better search queries"""
-        prompt = f"""From this judgment, extract the MAIN LEGAL ISSUE in 5-8 words max.
+    CORE_FACTS_PROMPT = """YOUR ROLE: Search query writer.
 
-Judgment excerpt: {text[:1500]}
+From the judgment above, extract the MAIN LEGAL ISSUE in 5-8 words max.
 
-Laws: {laws[:200]}
+Laws: {laws}
 
 Examples:
 - "death by negligence motor vehicle accident"
@@ -99,14 +354,24 @@ Examples:
 
 OUTPUT (ONLY the core issue, no explanations):"""
         
+    def __init__(self, llm, web_search_function=None):
+        super().__init__(llm)
+        self.web_search_function = web_search_function
+
+    def _extract_core_facts(self, state: AgentState) -> str:
+        """Extract core facts for better search queries"""
+        task = self.CORE_FACTS_PROMPT.format(laws=state['laws_found'][:200])
+
         try:
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            core = response.content.strip()[:80]
-            # Clean up
-            core = core.replace('"', '').replace("'", '').strip()
-            return core
-        except:
+            core = self.ask(state, task)[:80]
+        except (AgentTimeout, QueueTimeout):
+            raise
+        except Exception as e:
+            # The search still runs on the section alone, but the result is partial
+            self.mark_degraded(state, "error", f"core facts: {e!r}"[:200])
             return "IPC case law"
+        # Clean up
+        return core.replace('"', '').replace("'", '').strip()
     
     def _extract_primary_section(self, laws: str, text: str) -> str:
         """Extract the PRIMARY IPC section (not all sections at once)"""
@@ -145,57 +410,113 @@ OUTPUT (ONLY the core issue, no explanations):"""
             state['current_agent'] = self.name
             return state
         
-        try:
-            # Step 1: Extract core facts and primary section
-            core_facts = self._extract_core_facts(state['judgment_text'], state['laws_found'])
-            primary_section = self._extract_primary_section(state['laws_found'], state['judgment_text'])
-            
-            print(f"   🎯 Core facts: {core_facts}")
-            print(f"   🎯 Primary section: {primary_section}")
+        # Step 1: Extract core facts and primary section
+        core_facts = self._extract_core_facts(state)
+        primary_section = self._extract_primary_section(state['laws_found'], state['judgment_text'])
             
-            # Step 2: Build FOCUSED search query
-            # CRITICAL: Keep it short and specific!
-            search_query = f"{primary_section} {core_facts} recent judgments India"
+        print(f"   🎯 Core facts: {core_facts}")
+        print(f"   🎯 Primary section: {primary_section}")
             
-            print(f"   🔎 Searching: {search_query}")
+        # Step 2: Build FOCUSED search query
+        # CRITICAL: Keep it short and specific!
+        search_query = f"{primary_section} {core_facts} recent judgments India"
             
-            # Step 3: Execute REAL web search via DuckDuckGo
-            search_results = self.web_search_function(search_query)
+        print(f"   🔎 Searching: {search_query}")
             
-            # Extract sources and answer from search results
-            web_sources = search_results.get('sources', [])
-            web_answer = search_results.get('answer', '')
+        # Step 3: Execute REAL web search via DuckDuckGo. Failures propagate:
+        # _run_agent degrades the agent, so an error is never checkpointed
+        search_results = self.web_search_function(search_query)
             
-            print(f"   ✅ Retrieved {len(web_sources)} web sources")
+        # Extract sources and answer from search results
+        web_sources = search_results.get('sources', [])
+        web_answer = search_results.get('answer', '')
             
-            # Store in state
-            state['web_sources'] = web_sources
-            state['web_research'] = web_answer
+        print(f"   ✅ Retrieved {len(web_sources)} web sources")
             
-            state['messages'].append(AIMessage(
-                content=f"[{self.name}] Found {len(web_sources)} relevant sources via DuckDuckGo"
-            ))
+        # Store in state
+        state['web_sources'] = web_sources
+        state['web_research'] = web_answer
             
-        except Exception as e:
-            print(f"   ❌ Web research error: {e}")
-            import traceback
-            traceback.print_exc()
-            state['web_research'] = f"Web research error: {str(e)}"
-            state['web_sources'] = []
+        state['messages'].append(AIMessage(
+            content=f"[{self.name}] Found {len(web_sources)} relevant sources via DuckDuckGo"
+        ))
         
         state['current_agent'] = self.name
         return state
 
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        state['web_research'] = f"Skipped ({self.DEGRADE_REASONS[reason]})"
+        state['web_sources'] = []
+        return super().degrade(state, reason)
+
 
-class PrecedentAnalyzerAgent:
+class PrecedentAnalyzerAgent(BaseAgent):
     """Agent 3: Analyzes precedents using local and web sources"""
     
-    def __init__(self, llm):
-        self.llm = llm
-        self.name = "Precedent Analyzer"
+    name = "Precedent Analyzer"
+    key = "precedent"
+
+    PROMPT = """YOUR ROLE: Legal Precedent Analysis Specialist.
+
+LAWS IDENTIFIED:
+{laws}
+{candidates_text}{related_text}{web_context}
+{sources_text}
+
+ANALYZE:
+1. Which precedents are relevant to these laws? Start from the candidate cases listed, if any,
+   then the related cases (they share sections with the candidates).
+2. How should the judgment be compared with precedents?
+3. What guidelines are established for these sections?
+4. Are there any conflicting decisions?
+
+PRECEDENT ANALYSIS (3-4 paragraphs):"""
+
+    def __init__(self, llm, citation_index: Optional[CitationIndex] = None, max_candidates: int = 5,
+                 max_related: int = 3, related_from: int = 3):
+        super().__init__(llm)
+        self.citation_index = citation_index
+        self.max_candidates = max_candidates
+        self.max_related = max_related      # related cases added to the prompt
+        self.related_from = related_from    # ... found from this many top candidates
+
+    def fingerprint(self) -> str:
+        digest = self.citation_index.digest if self.citation_index else ""
+        return fingerprint(super().fingerprint(), digest, str(self.max_candidates),
+                           str(self.max_related), str(self.related_from))
+
+    def _candidates(self, state: AgentState) -> List[dict]:
+        if not self.citation_index or not state['sections_found']:
+            return []
+        return self.citation_index.candidates(state['sections_found'], self.max_candidates)
+
+    def _related(self, candidates: List[dict]) -> List[dict]:
+        """Case-graph neighbours of the top candidates that are not candidates already"""
+        if not self.citation_index or not candidates or not self.max_related:
+            return []
+        listed = {str(case['case_no']) for case in candidates}
+        top = [case['case_no'] for case in candidates[:self.related_from]]
+        related = self.citation_index.related_to(top, self.max_related + len(listed))
+        return [case for case in related if str(case['case_no']) not in listed][:self.max_related]
+
+    def _lookup(self, state: AgentState) -> None:
+        state['precedent_candidates'] = self._candidates(state)
+        state['related_precedents'] = self._related(state['precedent_candidates'])
     
     def run(self, state: AgentState) -> AgentState:
         print(f"\n📚 {self.name} Agent is working...")
+
+        # Ranked cases from the database for the identified sections, and
+        # their neighbours in the case graph
+        self._lookup(state)
+        candidates_text = related_text = ""
+        if state['precedent_candidates']:
+            candidates_text = ("\nCANDIDATE PRECEDENTS (case database):\n"
+                               + format_candidates(state['precedent_candidates']) + "\n")
+            print(f"   ⚡ {len(state['precedent_candidates'])} candidate precedents from the citation index")
+        if state['related_precedents']:
+            related_text = ("\nRELATED CASES (share sections with the candidates):\n"
+                            + format_candidates(state['related_precedents']) + "\n")
         
         # Include web research findings
         web_context = ""
@@ -210,31 +531,14 @@ class PrecedentAnalyzerAgent:
                 for s in state['web_sources'][:3]
             ])
         
-        prompt = f"""You are a Legal Precedent Analysis Specialist.
-
-LAWS IDENTIFIED:
-{state['laws_found'][:500]}
-
-JUDGMENT TEXT:
-{state['judgment_text'][:3000]}
-
-RAG CONTEXT (similar cases):
-{state['rag_context'][:1000]}
-
-{web_context}
-
-{sources_text}
-
-ANALYZE:
-1. What precedents are relevant to these laws?
-2. How should the judgment be compared with precedents?
-3. What guidelines are established for these sections?
-4. Are there any conflicting decisions?
-
-PRECEDENT ANALYSIS (3-4 paragraphs):"""
-
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        analysis = response.content.strip()
+        task = self.PROMPT.format(
+            laws=state['laws_found'][:500],
+            candidates_text=candidates_text,
+            related_text=related_text,
+            web_context=web_context,
+            sources_text=sources_text,
+        )
+        analysis = self.ask(state, task)
         
         state['precedent_analysis'] = analysis
         state['messages'].append(AIMessage(content=f"[{self.name}] Precedent analysis complete"))
@@ -243,27 +547,32 @@ PRECEDENT ANALYSIS (3-4 paragraphs):"""
         print(f"   ✅ Precedent analysis complete")
         return state
 
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        note = f"Precedent analysis unavailable ({self.DEGRADE_REASONS[reason]})."
+        self._lookup(state)
+        if state['precedent_candidates']:
+            note += f"\n\nCases in the database applying the same sections:\n{format_candidates(state['precedent_candidates'])}"
+            if state['related_precedents']:
+                note += f"\n\nRelated cases:\n{format_candidates(state['related_precedents'])}"
+        elif state['rag_context']:
+            note += f"\n\nRelated material from the case database:\n{state['rag_context'][:800]}"
+        state['precedent_analysis'] = note
+        return super().degrade(state, reason)
+
 
-class LogicAuditorAgent:
+class LogicAuditorAgent(BaseAgent):
     """Agent 4: Audits the logical consistency of the judgment"""
     
-    def __init__(self, llm):
-        self.llm = llm
-        self.name = "Logic Auditor"
+    name = "Logic Auditor"
+    key = "logic"
     
-    def run(self, state: AgentState) -> AgentState:
-        print(f"\n🧠 {self.name} Agent is working...")
-        
-        prompt = f"""You are a Legal Logic Consistency Auditor.
+    PROMPT = """YOUR ROLE: Legal Logic Consistency Auditor.
 
 LAWS APPLIED:
-{state['laws_found'][:500]}
-
-JUDGMENT TEXT:
-{state['judgment_text'][:3000]}
+{laws}
 
 PRECEDENT COMPARISON:
-{state['precedent_analysis'][:1000]}
+{precedents}
 
 AUDIT CHECKLIST:
 ✓ Are facts and findings consistent?
@@ -274,8 +583,14 @@ AUDIT CHECKLIST:
 
 LOGIC AUDIT (2-3 paragraphs):"""
 
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        audit = response.content.strip()
+    def run(self, state: AgentState) -> AgentState:
+        print(f"\n🧠 {self.name} Agent is working...")
+
+        task = self.PROMPT.format(
+            laws=state['laws_found'][:500],
+            precedents=state['precedent_analysis'][:1000],
+        )
+        audit = self.ask(state, task)
         
         state['logic_audit'] = audit
         state['messages'].append(AIMessage(content=f"[{self.name}] Logic audit complete"))
@@ -284,27 +599,24 @@ LOGIC AUDIT (2-3 paragraphs):"""
         print(f"   ✅ Logic audit complete")
         return state
 
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        state['logic_audit'] = f"Logic audit skipped ({self.DEGRADE_REASONS[reason]})."
+        return super().degrade(state, reason)
+
 
-class SummaryWriterAgent:
+class SummaryWriterAgent(BaseAgent):
     """Agent 5: Creates citizen-friendly summary using ALL agent findings"""
     
-    def __init__(self, llm):
-        self.llm = llm
-        self.name = "Summary Writer"
+    name = "Summary Writer"
+    key = "summary"
     
-    def run(self, state: AgentState) -> AgentState:
-        print(f"\n✍️ {self.name} Agent is working...")
-        
-        prompt = f"""Create a simple, citizen-friendly summary of this legal judgment.
-
-JUDGMENT:
-{state['judgment_text'][:2000]}
+    PROMPT = """YOUR ROLE: Create a simple, citizen-friendly summary of the judgment above.
 
 LAWS INVOLVED:
-{state['laws_found'][:300]}
+{laws}
 
 ANALYSIS:
-{state['precedent_analysis'][:500]}
+{analysis}
 
 STRUCTURE YOUR SUMMARY:
 1. What happened? (The case briefly)
@@ -320,8 +632,14 @@ REQUIREMENTS:
 
 SUMMARY:"""
 
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        summary = response.content.strip()
+    def run(self, state: AgentState) -> AgentState:
+        print(f"\n✍️ {self.name} Agent is working...")
+
+        task = self.PROMPT.format(
+            laws=state['laws_found'][:300],
+            analysis=state['precedent_analysis'][:500],
+        )
+        summary = self.ask(state, task)
         
         state['final_summary'] = summary
         state['messages'].append(AIMessage(content=f"[{self.name}] Summary complete"))
@@ -330,57 +648,269 @@ SUMMARY:"""
         print(f"   ✅ Summary written")
         return state
 
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        state['final_summary'] = (f"(Short automatic summary - the full summary is unavailable: "
+                                  f"{self.DEGRADE_REASONS[reason]}.) " + extractive_summary(state['judgment_text']))
+        return super().degrade(state, reason)
+
+
+# --- SINGLE-PASS (FAST) AGENT ---
+
+class FastAnalysisAgent(BaseAgent):
+    """Fast mode: laws, precedents, logic audit and summary in ONE JSON generation"""
+
+    name = "Fast Analyzer"
+    key = "fast"
+    passthrough_errors = (FastParseError,)   # bad JSON falls back to the full pipeline instead
+
+    PROMPT = """YOUR ROLE: Complete legal analyst (single pass).
+
+Analyze the judgment above and reply with ONE JSON object and nothing else.
+The object MUST have exactly these string keys:
+
+{{
+  "laws": "All IPC sections, Acts and provisions, one per line as: Section XXX (Act Name) - Description",
+  "precedent_analysis": "2-3 paragraphs on relevant precedents and how this judgment compares",
+  "logic_audit": "1-2 paragraphs on consistency of facts, reasoning, burden of proof and gaps",
+  "summary": "4-6 simple sentences for a citizen with no legal background"
+}}
+
+JSON:"""
+
+    def parse(self, raw: str) -> FastAnalysisOutput:
+        """Extract and validate the JSON object (raises FastParseError on failure)"""
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end <= start:
+            raise FastParseError("No JSON object in fast-mode response")
+        try:
+            data = json.loads(raw[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise FastParseError(f"Fast-mode response is not valid JSON: {e}")
+        if not isinstance(data, dict):
+            raise FastParseError("Fast-mode JSON is not an object")
+        try:
+            return FastAnalysisOutput(**data)
+        except ValidationError as e:
+            raise FastParseError(f"Fast-mode JSON failed schema validation: {e}")
+
+    def run(self, state: AgentState) -> AgentState:
+        print(f"\n⚡ {self.name} Agent is working...")
+
+        result = self.parse(self.ask(state, self.PROMPT))
+        laws = result.laws
+        if isinstance(laws, list):
+            laws = "\n".join(str(law) for law in laws)
+
+        state['laws_found'] = laws.strip()
+        state['precedent_analysis'] = result.precedent_analysis.strip()
+        state['logic_audit'] = result.logic_audit.strip()
+        state['final_summary'] = result.summary.strip()
+        state['web_research'] = "Skipped in fast mode"
+        state['messages'].append(AIMessage(content=f"[{self.name}] Single-pass analysis complete"))
+        state['current_agent'] = self.name
+
+        print(f"   ✅ Single-pass analysis complete")
+        return state
+
+    def degrade(self, state: AgentState, reason: str = "budget") -> AgentState:
+        why = self.DEGRADE_REASONS[reason]
+        state['laws_found'] = state['laws_found'] or f"Applicable laws could not be identified ({why})."
+        state['precedent_analysis'] = f"Precedent analysis unavailable ({why})."
+        state['logic_audit'] = f"Logic audit skipped ({why})."
+        state['final_summary'] = (f"(Short automatic summary - the full summary is unavailable: {why}.) "
+                                  + extractive_summary(state['judgment_text']))
+        state['web_research'] = "Skipped in fast mode"
+        return super().degrade(state, reason)
+
 
 # --- MULTI-AGENT ORCHESTRATOR ---
 
 class MultiAgentOrchestrator:
     """Manages the multi-agent workflow with REAL DuckDuckGo web search"""
     
-    def __init__(self, llm, web_search_function=None):
+    MODES = ("full", "fast")
+    AGENT_KEYS = ("law", "web", "precedent", "logic", "summary", "fast")
+
+    def __init__(self, llm, web_search_function=None, law_extractor=None, agent_llms=None,
+                 agent_timeouts: Optional[Dict[str, float]] = None, default_timeout: Optional[float] = None,
+                 budget: Optional[float] = None, hedge_llm=None, hedge_after: Optional[float] = None,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 citation_index: Optional[CitationIndex] = None):
+        """
+        agent_llms:      optional {agent key: llm} overrides (keys in AGENT_KEYS), e.g.
+                         a small model for "law"/"web"/"summary"; others use `llm`
+        agent_timeouts:  optional {agent key: seconds}; other agents use default_timeout
+        budget:          seconds for the whole run; agents left without time degrade
+        hedge_llm:       backend that gets a duplicate of any LLM call still running
+                         after hedge_after seconds (None: no hedging)
+        checkpoints:     store for per-agent state, so reruns resume (None: off)
+        citation_index:  section → precedent index; its ranked cases ground the
+                         precedent analysis
+        """
         self.llm = llm
+        self.checkpoints = checkpoints
         self.web_search_function = web_search_function
         
+        agent_llms = agent_llms or {}
+        agent_timeouts = agent_timeouts or {}
+        for name, overrides in (("agent_llms", agent_llms), ("agent_timeouts", agent_timeouts)):
+            unknown = set(overrides) - set(self.AGENT_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown agent keys in {name}: {sorted(unknown)}")
+        pick = lambda key: agent_llms.get(key) or llm
+
         # Initialize all agents
-        self.law_agent = LawIdentifierAgent(llm)
-        self.web_agent = WebResearchAgent(llm, web_search_function)
-        self.precedent_agent = PrecedentAnalyzerAgent(llm)
-        self.logic_agent = LogicAuditorAgent(llm)
-        self.summary_agent = SummaryWriterAgent(llm)
+        self.law_agent = LawIdentifierAgent(pick("law"), law_extractor)
+        self.web_agent = WebResearchAgent(pick("web"), web_search_function)
+        self.precedent_agent = PrecedentAnalyzerAgent(pick("precedent"), citation_index)
+        self.logic_agent = LogicAuditorAgent(pick("logic"))
+        self.summary_agent = SummaryWriterAgent(pick("summary"))
+        self.fast_agent = FastAnalysisAgent(pick("fast"))
     
-    def run(self, judgment_text: str, rag_context: str = "") -> dict:
-        """Execute the multi-agent workflow"""
+        self.timeouts = {key: agent_timeouts.get(key, default_timeout) for key in self.AGENT_KEYS}
+        self.budget = budget
+        for agent in (self.law_agent, self.web_agent, self.precedent_agent,
+                      self.logic_agent, self.summary_agent, self.fast_agent):
+            agent.hedge_llm = hedge_llm
+            agent.hedge_after = hedge_after
         
-        print("\n" + "="*70)
-        print("🤖 MULTI-AGENT SYSTEM ACTIVATED (WITH REAL WEB SEARCH)")
-        print("="*70)
+        # Running (agent, model) totals for tuning the routing
+        self._routing_lock = threading.Lock()
+        self._routing_stats = {}
         
-        # Initialize state
-        state = AgentState(
+    def use_lookups(self, law_extractor: Optional[LawExtractor] = None,
+                    citation_index: Optional[CitationIndex] = None):
+        """Switch to the lookups of a newly loaded index (IndexManager.on_swap)"""
+        if law_extractor is not None:
+            self.law_agent.extractor = law_extractor
+        self.precedent_agent.citation_index = citation_index
+
+    def _new_state(self, judgment_text: str, rag_context: str) -> AgentState:
+        return AgentState(
             judgment_text=judgment_text,
             rag_context=rag_context or "",
             web_research="",
             web_sources=[],
             laws_found="",
+            sections_found=[],
+            precedent_candidates=[],
+            related_precedents=[],
             precedent_analysis="",
             logic_audit="",
             final_summary="",
             messages=[],
-            current_agent="initializing"
+            llm_calls=[],
+            current_agent="initializing",
+            deadline=math.inf,
+            budget_deadline=time.monotonic() + self.budget if self.budget else math.inf,
+            degraded_agents=[],
+            resumed_agents=[],
         )
         
-        # Execute agents in sequence
-        state = self.law_agent.run(state)
-        state = self.web_agent.run(state)
-        state = self.precedent_agent.run(state)
-        state = self.logic_agent.run(state)
-        state = self.summary_agent.run(state)
+    def _degrade(self, agent: BaseAgent, state: AgentState, reason: str, detail: str = "") -> AgentState:
+        agent.mark_degraded(state, reason, detail)
+        return agent.degrade(state, reason)
         
-        print("\n" + "="*70)
-        print("✅ ALL AGENTS COMPLETED")
-        print("="*70 + "\n")
+    def _run_agent(self, agent: BaseAgent, state: AgentState) -> AgentState:
+        timeout = self.timeouts.get(agent.key)
+        remaining = state['budget_deadline'] - time.monotonic()
+        if remaining <= 0 or (agent.optional and timeout and remaining < timeout):
+            return self._degrade(agent, state, "budget")
+        limit = min(timeout or math.inf, remaining)
         
-        # Return formatted results
+        with tracing.span("agent.run", agent=agent.name):
+            if limit == math.inf:
+                try:
+                    return agent.run(state)
+                except agent.passthrough_errors:
+                    raise
+                except Exception as e:
+                    return self._degrade(agent, state, "error", repr(e)[:200])
+
+            # The agent works on a copy: if it is abandoned, its thread keeps
+            # writing to that copy, never to the state the run continues with
+            work = AgentState(state)
+            for field in ("messages", "llm_calls", "web_sources", "sections_found",
+                          "precedent_candidates", "related_precedents", "degraded_agents"):
+                work[field] = list(state[field])
+            work['deadline'] = time.monotonic() + limit
+            cancel = threading.Event()
+            future = _submit(_AGENT_EXECUTOR, _run_with_limits, agent, work, cancel)
+            try:
+                return future.result(timeout=limit)
+            except (FuturesTimeout, AgentTimeout, QueueTimeout):
+                cancel.set()   # its queued and later LLM calls give up instead of running for nobody
+                return self._degrade(agent, state, "timeout", f"no answer within {limit:.1f}s")
+            except agent.passthrough_errors:
+                raise
+            except Exception as e:
+                return self._degrade(agent, state, "error", repr(e)[:200])
+
+    def _load_checkpoint(self, key: str) -> Optional[str]:
+        try:
+            return self.checkpoints.load(key)
+        except Exception as e:
+            print(f"   ⚠️ Checkpoint lookup failed: {e}")
+            return None
+
+    def _save_checkpoint(self, key: str, agent: BaseAgent, state: AgentState) -> None:
+        try:
+            self.checkpoints.save(key, agent.key, state)
+        except Exception as e:
+            print(f"   ⚠️ Checkpoint save failed: {e}")
+
+    def _run_pipeline(self, agents: List[BaseAgent], state: AgentState) -> AgentState:
+        """Run agents in order, resuming from / writing checkpoints when enabled"""
+        if not self.checkpoints:
+            for agent in agents:
+                state = self._run_agent(agent, state)
+            return state
+
+        keys = chain(fingerprint(state['judgment_text'], state['rag_context']), agents)
+        resuming = saving = True
+        for agent, key in zip(agents, keys):
+            saved = self._load_checkpoint(key) if resuming else None
+            if saved is not None:
+                state = restore_state(state, saved)
+                state['current_agent'] = agent.name
+                state['resumed_agents'].append(agent.name)
+                print(f"\n♻️ {agent.name} restored from checkpoint")
+                continue
+
+            # Everything downstream of a recomputed agent is recomputed too
+            resuming = False
+            degraded = len(state['degraded_agents'])
+            state = self._run_agent(agent, state)
+            saving = saving and len(state['degraded_agents']) == degraded
+            if saving:
+                self._save_checkpoint(key, agent, state)
+        return state
+
+    def _record_routing(self, llm_calls: List[dict]) -> None:
+        with self._routing_lock:
+            for call in llm_calls:
+                key = (call['agent'], call['model'])
+                totals = self._routing_stats.setdefault(key, {
+                    "agent": call['agent'], "model": call['model'], "calls": 0,
+                    "total_latency_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                })
+                totals['calls'] += 1
+                totals['total_latency_ms'] += call['latency_ms']
+                totals['prompt_tokens'] += call['prompt_tokens'] or 0
+                totals['completion_tokens'] += call['completion_tokens'] or 0
+
+    def routing_report(self) -> List[dict]:
+        """Per agent, per model: calls, average latency and token totals"""
+        with self._routing_lock:
+            return [
+                {**t, "avg_latency_ms": round(t['total_latency_ms'] / t['calls'], 1)}
+                for t in self._routing_stats.values()
+            ]
+
+    def _format_result(self, state: AgentState, mode: str) -> dict:
+        self._record_routing(state['llm_calls'])
         return {
+            "mode": mode,
             "laws": state['laws_found'],
             "summary": state['final_summary'],
             "analysis": f"""
@@ -392,10 +922,58 @@ LOGIC AUDIT:
 """,
             "web_research": state['web_research'],
             "web_sources": state['web_sources'],  # REAL URLs from DuckDuckGo
+            "precedent_candidates": state['precedent_candidates'],
+            "related_precedents": state['related_precedents'],
             "context_used": state['rag_context'][:500],
-            "agent_messages": [msg.content for msg in state['messages']]
+            "agent_messages": [msg.content for msg in state['messages']],
+            "agent_stats": state['llm_calls'],   # model / latency / tokens per LLM call
+            "degraded_agents": state['degraded_agents'],
+            "resumed_agents": state['resumed_agents'],
         }
 
+    def run(self, judgment_text: str, rag_context: str = "", mode: str = "full") -> dict:
+        """Execute the multi-agent workflow ("full") or the single-pass one ("fast")"""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        if mode == "fast":
+            return self.run_fast(judgment_text, rag_context)
+
+        print("\n" + "="*70)
+        print("🤖 MULTI-AGENT SYSTEM ACTIVATED (WITH REAL WEB SEARCH)")
+        print("="*70)
+
+        state = self._new_state(judgment_text, rag_context)
+
+        # Execute agents in sequence
+        state = self._run_pipeline([self.law_agent, self.web_agent, self.precedent_agent,
+                                    self.logic_agent, self.summary_agent], state)
+
+        print("\n" + "="*70)
+        print("✅ ALL AGENTS COMPLETED")
+        print("="*70 + "\n")
+
+        return self._format_result(state, "full")
+
+    def run_fast(self, judgment_text: str, rag_context: str = "") -> dict:
+        """
+        One structured generation; falls back to the full pipeline on bad
+        JSON. A timeout or backend error degrades instead (no second try on
+        a backend that just failed or ran out of time).
+        """
+
+        print("\n" + "="*70)
+        print("⚡ FAST MODE: SINGLE-PASS STRUCTURED ANALYSIS")
+        print("="*70)
+
+        state = self._new_state(judgment_text, rag_context)
+        try:
+            state = self._run_pipeline([self.fast_agent], state)
+        except FastParseError as e:
+            print(f"   ⚠️ Fast mode failed ({e}) - falling back to full pipeline")
+            return self.run(judgment_text, rag_context, mode="full")
+
+        return self._format_result(state, "fast")
+
 
 # --- EXAMPLE USAGE ---
 
@@ -406,4 +984,5 @@ if __name__ == "__main__":
     print("  ✓ Web Research Agent (REAL DuckDuckGo Search)")
     print("  ✓ Precedent Analyzer Agent")
     print("  ✓ Logic Auditor Agent")
-    print("  ✓ Summary Writer Agent")
\ No newline at end of file
+    print("  ✓ Summary Writer Agent")
+    print("  ✓ Fast Analyzer Agent (single-pass JSON mode)")
\ No newline at end of file
@@ -0,0 +1,580 @@
+"""
+END-TO-END BENCHMARK HARNESS
+============================
+
+Runs the real FastAPI app with local stand-ins for every external service:
+
+• ChatOllama / ChatGoogleGenerativeAI → FakeChatModel (configurable latency)
+• DuckDuckGoSearchResults            → FakeSearchTool (configurable latency)
+• HuggingFaceEmbeddings              → FakeEmbeddings (hash-based, optional)
+
+and measures:
+
+• /analyze throughput and p50/p95/p99 latency at several concurrency levels
+• micro-benchmarks: PDF extraction, chunking, embedding, FAISS search
+• --history: bytes and time for a page of /history (uncompressed, gzip,
+  brotli, ?fields= selection, 304 revalidation)
+
+Results are written as JSON (one file per run, tagged with the git commit) so
+regressions can be compared across commits.
+
+Usage:
+    python benchmark.py --concurrency 1 4 16 --requests 32 --llm-latency 0.2
+    python benchmark.py --real-embeddings --output bench_results/baseline.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+DATA_FOLDER = os.path.join(PROJECT_ROOT, "data")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "bench_results")
+sys.path.append(BASE_DIR)
+
+from langchain_core.messages import AIMessage
+
+
+# --------------------------------------------------
+# FAKE PROVIDERS
+# --------------------------------------------------
+def _sleep(latency: float, jitter: float):
+    if latency > 0:
+        time.sleep(max(0.0, random.gauss(latency, latency * jitter)))
+
+
+class FakeChatModel:
+    """Stand-in for ChatOllama / ChatGoogleGenerativeAI with fixed latency"""
+
+    latency = 0.2
+    jitter = 0.1
+    ms_per_prompt_token = 0.0
+
+    def __init__(self, model: str = "fake-llm", **kwargs):
+        self.model = kwargs.get("model", model)
+
+    def invoke(self, messages, **kwargs):
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(getattr(m, "content", m)) for m in messages
+        )
+        prompt_tokens = len(prompt) // 4
+        _sleep(self.latency + prompt_tokens * self.ms_per_prompt_token / 1000, self.jitter)
+
+        if "ONE JSON object" in prompt:
+            content = json.dumps({
+                "laws": "Section 302 (IPC) - Punishment for Murder",
+                "precedent_analysis": "The judgment follows established precedent.",
+                "logic_audit": "The reasoning is consistent with the findings.",
+                "summary": "The court convicted the accused of murder.",
+            })
+        else:
+            content = "Section 302 (IPC) - Punishment for Murder. " + "Synthetic analysis text. " * 20
+
+        return AIMessage(
+            content=content,
+            response_metadata={"model": self.model, "prompt_eval_count": prompt_tokens},
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        )
+
+
+class FakeSearchTool:
+    """Stand-in for DuckDuckGoSearchResults"""
+
+    latency = 0.3
+    jitter = 0.1
+
+    def __init__(self, **kwargs):
+        pass
+
+    def run(self, query: str) -> str:
+        _sleep(self.latency, self.jitter)
+        slug = hashlib.md5(query.encode()).hexdigest()[:8]
+        return ", ".join(
+            f"[snippet: result {i}, title: Case {i}, link: https://indiankanoon.example/doc/{slug}{i}]"
+            for i in range(5)
+        )
+
+
+class FakeEmbeddings:
+    """Deterministic hash-based embeddings (no model download, ~µs per text)"""
+
+    dim = 384
+
+    def __init__(self, **kwargs):
+        pass
+
+    def _embed(self, text: str):
+        vector = [0.0] * self.dim
+        for token in text.lower().split():
+            h = int(hashlib.md5(token.encode()).hexdigest(), 16)
+            vector[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def __call__(self, text):
+        return self._embed(text)
+
+
+def install_fakes(args):
+    """Patch provider classes BEFORE main.py is imported"""
+    FakeChatModel.latency = args.llm_latency
+    FakeChatModel.jitter = args.jitter
+    FakeChatModel.ms_per_prompt_token = args.prefill_ms_per_token
+    FakeSearchTool.latency = args.search_latency
+    FakeSearchTool.jitter = args.jitter
+
+    import langchain_ollama
+    import langchain_google_genai
+    import langchain_community.tools
+
+    langchain_ollama.ChatOllama = FakeChatModel
+    langchain_google_genai.ChatGoogleGenerativeAI = FakeChatModel
+    langchain_community.tools.DuckDuckGoSearchResults = FakeSearchTool
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark-fake-key")
+    # Throwaway database; no checkpoints, so repeated PDFs are really re-analysed
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-db-"), "bench.db"))
+    os.environ.setdefault("AGENT_CHECKPOINTS", "0")
+    # Load shedding assumes this call duration until calls have been timed
+    os.environ.setdefault("LLM_EXPECTED_CALL_S", str(args.llm_latency))
+
+    if not args.real_embeddings:
+        import langchain_huggingface
+        langchain_huggingface.HuggingFaceEmbeddings = FakeEmbeddings
+
+
+# --------------------------------------------------
+# SYNTHETIC JUDGMENTS
+# --------------------------------------------------
+FACT_TEMPLATES = [
+    "The accused {name} was found near the scene with a blood-stained weapon.",
+    "The prosecution examined {n} witnesses, including the investigating officer.",
+    "Medical evidence showed {n} injuries on the body of the deceased.",
+    "The defence argued that the accused acted in private defence.",
+    "The complainant alleged that {name} had obtained Rs. {n} lakhs by deception.",
+    "The vehicle was being driven at high speed in a crowded market area.",
+    "The trial court relied on the dying declaration recorded by the magistrate.",
+]
+NAMES = ["Ramesh", "Suresh Kumar", "Anil Sharma", "Meena Devi", "Rajesh Patil", "Farhan Ali"]
+SECTIONS = ["302", "304A", "307", "376", "379", "420", "498A", "506", "34", "120B"]
+
+
+def synthetic_judgment(seed: int, paragraphs: int = 12) -> str:
+    rng = random.Random(seed)
+    sections = rng.sample(SECTIONS, 3)
+    lines = [
+        f"IN THE HIGH COURT OF JUDICATURE - CRIMINAL APPEAL NO. {rng.randint(100, 999)} OF {rng.randint(2005, 2024)}",
+        f"State vs. {rng.choice(NAMES)}",
+        f"The appellant was convicted under Sections {', '.join(sections)} IPC.",
+    ]
+    for _ in range(paragraphs):
+        lines.append(" ".join(
+            rng.choice(FACT_TEMPLATES).format(name=rng.choice(NAMES), n=rng.randint(2, 12))
+            for _ in range(4)
+        ))
+    lines.append(f"Accordingly, the conviction under Section {sections[0]} IPC is upheld.")
+    return "\n".join(lines)
+
+
+def make_pdf(text: str, lines_per_page: int = 50, wrap: int = 95) -> bytes:
+    """Minimal text-only PDF (Helvetica) readable by PyPDF2"""
+    wrapped = []
+    for line in text.splitlines():
+        while len(line) > wrap:
+            wrapped.append(line[:wrap])
+            line = line[wrap:]
+        wrapped.append(line)
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    def escape(s: str) -> str:
+        return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, page_lines in enumerate(pages):
+        content_id = page_ids[i] + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        )
+        ops = ["BT", "/F1 10 Tf", "14 TL", "40 760 Td"]
+        ops += [f"({escape(line)}) Tj T*" for line in page_lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# --------------------------------------------------
+# STATS
+# --------------------------------------------------
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms) -> dict:
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": round(statistics.mean(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3) if latencies_ms else 0.0,
+    }
+
+
+def time_calls(fn, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize(latencies)
+
+
+# --------------------------------------------------
+# SERVER + LOAD GENERATOR
+# --------------------------------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int):
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def load_test(url: str, pdfs, concurrency: int, total: int, mode: str, timeout: float,
+              priority: str = "interactive", client_id: str = "") -> dict:
+    import httpx
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    headers = {"X-Client-Id": client_id} if client_id else {}
+
+    def one(i: int):
+        nonlocal errors
+        pdf = pdfs[i % len(pdfs)]
+        start = time.perf_counter()
+        try:
+            with httpx.Client(timeout=timeout) as client:
+                r = client.post(
+                    f"{url}/analyze",
+                    params={"mode": mode, "priority": priority},
+                    headers=headers,
+                    files={"file": (f"judgment_{i}.pdf", pdf, "application/pdf")},
+                )
+            ok = r.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        **summarize(latencies),
+    }
+
+
+def batch_flood(url: str, pdfs, concurrency: int, mode: str, timeout: float, stop: threading.Event) -> dict:
+    """Keep `concurrency` batch requests in flight until stop is set; 429s back off"""
+    import httpx
+
+    counts = {"completed": 0, "shed": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker(w: int):
+        i = 0
+        with httpx.Client(timeout=timeout) as client:
+            while not stop.is_set():
+                i += 1
+                try:
+                    r = client.post(
+                        f"{url}/analyze",
+                        params={"mode": mode, "priority": "batch"},
+                        headers={"X-Client-Id": "bulk-job"},
+                        files={"file": (f"batch_{w}_{i}.pdf", pdfs[(w + i) % len(pdfs)], "application/pdf")},
+                    )
+                    key = {200: "completed", 429: "shed"}.get(r.status_code, "errors")
+                except httpx.HTTPError:
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+                if key == "shed":
+                    stop.wait(min(float(r.headers.get("Retry-After", "1")), 1.0))
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(concurrency)]
+    for t in threads:
+        t.start()
+    return {"threads": threads, "counts": counts}
+
+
+def mixed_load_test(url: str, pdfs, args) -> dict:
+    """Interactive latency alone vs. with a batch flood running (admission control check)"""
+    concurrency = args.concurrency[0]
+    alone = load_test(url, pdfs, concurrency, args.requests, args.mode, args.timeout, client_id="judge")
+
+    stop = threading.Event()
+    flood = batch_flood(url, pdfs, args.batch_concurrency, args.mode, args.timeout, stop)
+    time.sleep(args.llm_latency * 3)   # let the batch queue build up
+    loaded = load_test(url, pdfs, concurrency, args.requests, args.mode, args.timeout, client_id="judge")
+    stop.set()
+    for t in flood["threads"]:
+        t.join(timeout=args.timeout)
+
+    return {
+        "interactive_concurrency": concurrency,
+        "batch_concurrency": args.batch_concurrency,
+        "interactive_alone": alone,
+        "interactive_with_batch": loaded,
+        "batch": flood["counts"],
+        "p95_ratio": round(loaded["p95_ms"] / alone["p95_ms"], 3) if alone["p95_ms"] else None,
+    }
+
+
+def history_benchmark(url: str, main, rows: int, page: int, repeat: int) -> dict:
+    """Bytes on the wire and latency for one /history page, per transfer option"""
+    import httpx
+
+    db = main.SessionLocal()
+    existing = db.query(main.models.Analysis).count()
+    db.close()
+    for seed in range(existing, rows):
+        text = synthetic_judgment(seed, paragraphs=20)
+        main.save_analysis(f"judgment-{seed}.pdf", {
+            "summary": text[:1500], "laws": text[:400], "analysis": text * 2, "web_research": text[:2000],
+            "web_sources": [{"title": f"Source {i}", "url": f"https://example.org/{seed}/{i}"} for i in range(5)],
+        })
+
+    full = ",".join(f for f in main.HISTORY_COLUMNS if f != "id")
+    scenarios = [
+        ("all fields, identity", {"fields": full}, {"Accept-Encoding": "identity"}),
+        ("all fields, gzip", {"fields": full}, {"Accept-Encoding": "gzip"}),
+        ("all fields, br", {"fields": full}, {"Accept-Encoding": "br, gzip"}),
+        ("list fields, br", {}, {"Accept-Encoding": "br, gzip"}),
+        ("revalidate (304)", {"fields": full}, {"Accept-Encoding": "br, gzip"}),
+    ]
+    results = []
+    with httpx.Client(base_url=url, timeout=60) as client:
+        for name, params, headers in scenarios:
+            params = {"limit": page, **params}
+            if name.startswith("revalidate"):
+                etag = client.get("/history", params=params, headers=headers).headers["etag"]
+                headers = {**headers, "If-None-Match": etag}
+            latencies, size, status = [], 0, None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with client.stream("GET", "/history", params=params, headers=headers) as response:
+                    response.read()
+                    size, status = response.num_bytes_downloaded, response.status_code
+                latencies.append((time.perf_counter() - start) * 1000)
+            results.append({"scenario": name, "status": status, "bytes": size,
+                            "encoding": response.headers.get("content-encoding", "identity"),
+                            **summarize(latencies)})
+    return {"rows": rows, "page": page, "scenarios": results}
+
+
+# --------------------------------------------------
+# MICRO-BENCHMARKS
+# --------------------------------------------------
+def micro_benchmarks(main, pdfs, repeat: int) -> dict:
+    from langchain_community.document_loaders import TextLoader
+    from langchain_community.vectorstores import FAISS
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    results = {}
+    results["pdf_extract"] = time_calls(lambda: main.extract_text_from_pdf(pdfs[0]), repeat)
+
+    docs = []
+    for name in ("laws.txt", "precedents.txt"):
+        path = os.path.join(DATA_FOLDER, name)
+        if os.path.exists(path):
+            docs.extend(TextLoader(path, encoding="utf-8").load())
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    results["chunking"] = time_calls(lambda: splitter.split_documents(docs), max(1, repeat // 10))
+    chunks = splitter.split_documents(docs)
+    results["chunking"]["chunks"] = len(chunks)
+
+    texts = [c.page_content for c in chunks]
+    start = time.perf_counter()
+    main.embeddings.embed_documents(texts)
+    embed_s = time.perf_counter() - start
+    results["embedding"] = {
+        "documents": len(texts),
+        "total_ms": round(embed_s * 1000, 3),
+        "docs_per_s": round(len(texts) / embed_s, 1) if embed_s else 0.0,
+        "query": time_calls(lambda: main.embeddings.embed_query(texts[0]), repeat),
+    }
+
+    start = time.perf_counter()
+    store = FAISS.from_documents(chunks, main.embeddings)
+    results["faiss_build_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    query_vector = main.embeddings.embed_query(synthetic_judgment(0))
+    results["faiss_search"] = time_calls(
+        lambda: store.similarity_search_by_vector(query_vector, k=3), repeat
+    )
+    return results, store
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Judicial AI end-to-end benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--mode", choices=["full", "fast"], default="full")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.0,
+                        help="extra fake LLM latency per prompt token (models prefill cost)")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="seconds per fake search")
+    parser.add_argument("--jitter", type=float, default=0.1, help="latency stddev as a fraction")
+    parser.add_argument("--judgments", type=int, default=8, help="distinct synthetic PDFs")
+    parser.add_argument("--repeat", type=int, default=50, help="micro-benchmark repetitions")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="use all-MiniLM-L6-v2 instead of hash embeddings")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--mixed", action="store_true",
+                        help="also measure interactive latency while a batch job floods the API")
+    parser.add_argument("--batch-concurrency", type=int, default=8, help="batch requests in flight (--mixed)")
+    parser.add_argument("--history", action="store_true",
+                        help="measure /history transfer size and latency (caching / compression)")
+    parser.add_argument("--history-rows", type=int, default=200, help="analyses to store (--history)")
+    parser.add_argument("--history-page", type=int, default=50, help="analyses per page (--history)")
+    parser.add_argument("--output", help="JSON results path (default bench_results/<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    install_fakes(args)
+    import main
+
+    pdfs = [make_pdf(synthetic_judgment(seed)) for seed in range(args.judgments)]
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "config": vars(args),
+    }
+
+    if not args.skip_micro:
+        print("⏱️ Running micro-benchmarks...")
+        results["micro"], store = micro_benchmarks(main, pdfs, args.repeat)
+    else:
+        store = None
+
+    # Serve retrieval from an index built with the benchmark's embeddings
+    # (on-disk partitions were built with the real model, so they are bypassed)
+    main.index_manager.install_objects(vector_db=store, kind="benchmark")
+    # Repeated synthetic PDFs would otherwise be answered from the upload dedup index
+    main.upload_index = None
+
+    port = free_port()
+    server, thread = start_server(main.app, port)
+    url = f"http://127.0.0.1:{port}"
+
+    results["analyze"] = []
+    for concurrency in args.concurrency:
+        print(f"🚀 /analyze mode={args.mode} concurrency={concurrency} requests={args.requests}")
+        run = load_test(url, pdfs, concurrency, args.requests, args.mode, args.timeout)
+        print(f"   {run['throughput_rps']} req/s  p50={run['p50_ms']:.0f} ms  "
+              f"p95={run['p95_ms']:.0f} ms  p99={run['p99_ms']:.0f} ms  errors={run['errors']}")
+        results["analyze"].append(run)
+
+    if args.mixed:
+        print(f"🚦 Mixed load: interactive concurrency={args.concurrency[0]} "
+              f"vs batch flood concurrency={args.batch_concurrency}")
+        mixed = mixed_load_test(url, pdfs, args)
+        print(f"   interactive p95 alone={mixed['interactive_alone']['p95_ms']:.0f} ms  "
+              f"with batch={mixed['interactive_with_batch']['p95_ms']:.0f} ms  "
+              f"(x{mixed['p95_ratio']})  batch={mixed['batch']}")
+        results["mixed"] = mixed
+
+    if args.history:
+        print(f"🗂️ /history page of {args.history_page} ({args.history_rows} stored analyses)")
+        results["history"] = history_benchmark(url, main, args.history_rows, args.history_page, args.repeat)
+        for run in results["history"]["scenarios"]:
+            print(f"   {run['scenario']:<22} {run['status']}  {run['bytes']:>8} bytes  "
+                  f"p50={run['p50_ms']:.1f} ms  ({run['encoding']})")
+
+    server.should_exit = True
+    thread.join(timeout=10)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{results['commit']}-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
@@ -8,6 +9,13 @@ from langchain_huggingface import HuggingFaceEmbeddings
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from legal_corpus import load_corpus
+from partitioned_index import build_partitions
+from dedup import deduplicate
+from citation_index import build_citation_index, save_citation_index, CITATION_INDEX_FILE
+from sharded_index import STRATEGIES, build_shard, build_shards, read_manifest, remove_shards
 
 # Load environment variables
 load_dotenv()
@@ -16,20 +24,92 @@ load_dotenv()
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_FOLDER = os.path.join(PROJECT_ROOT, "data")
 VECTOR_STORE_PATH = os.path.join(DATA_FOLDER, "vector_store")
+PARTITIONS_PATH = os.path.join(VECTOR_STORE_PATH, "partitions")
+SHARDS_PATH = os.path.join(VECTOR_STORE_PATH, "shards")
 LAWS_FILE = os.path.join(DATA_FOLDER, "laws.txt")
 PRECEDENTS_FILE = os.path.join(DATA_FOLDER, "precedents.txt")
 
 # Setup Embeddings (LOCAL - No API Key needed)
 embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
 
-def build_vector_store():
+def load_documents():
+    """Section / CASE documents (near-duplicates removed), or generic chunks"""
+    # Structure-aware parsing: one document per section / case
+    split_docs = load_corpus(LAWS_FILE, PRECEDENTS_FILE)
+    if split_docs:
+        statutes = sum(1 for d in split_docs if d.metadata["doc_type"] == "statute")
+        print(f"   📜 Parsed {statutes} sections and {len(split_docs) - statutes} cases")
+        # Index one representative per cluster of near-duplicate cases
+        split_docs, clusters = deduplicate(split_docs)
+        removed = sum(len(c) - 1 for c in clusters)
+        if removed:
+            print(f"   🧹 Dropped {removed} near-duplicate cases ({sum(len(c) > 1 for c in clusters)} clusters)")
+    else:
+        print("   ⚠️ No Section/CASE structure found - falling back to generic chunking")
+        split_docs = load_unstructured_chunks()
+    return split_docs
+
+def build_vector_store(num_shards: int = 0, shard_by: str = "hash"):
     """
-    Reads laws.txt and precedents.txt, chunks them, and builds a FAISS index.
+    Reads laws.txt and precedents.txt, splits them into one document per
+    Section / CASE (with metadata), and builds a FAISS index.
     Run this ONCE to create the 'database'.
+    With num_shards > 1 the index is also split into shards for sharded_index.py.
     """
     print("🔄 Building Vector Store from legal documents...")
     print(f"   Data folder: {DATA_FOLDER}")
-    
+
+    split_docs = load_documents()
+    if not split_docs:
+        print("❌ No documents found. Vector store not created.")
+        print(f"   Make sure laws.txt and precedents.txt exist in: {DATA_FOLDER}")
+        return
+
+    # Create Vector Store
+    try:
+        # Ensure vector_store directory exists
+        os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+        
+        vector_store = FAISS.from_documents(split_docs, embeddings)
+        
+        # Save to disk
+        vector_store.save_local(VECTOR_STORE_PATH)
+        print(f"✅ Vector Store saved to: {VECTOR_STORE_PATH}")
+        print(f"   Total documents indexed: {len(split_docs)}")
+
+        # Per-section sub-indexes (only meaningful for structured documents)
+        if all("doc_type" in d.metadata for d in split_docs):
+            manifest = build_partitions(split_docs, embeddings, PARTITIONS_PATH)
+            print(f"✅ {len(manifest)} partitions saved to: {PARTITIONS_PATH}")
+
+            # Section → precedent index for the Precedent Analyzer
+            citations = build_citation_index(split_docs)
+            save_citation_index(citations)
+            print(f"✅ Citation index ({len(citations['cases'])} cases, {len(citations['sections'])} sections) "
+                  f"saved to: {CITATION_INDEX_FILE}")
+
+        if num_shards > 1:
+            manifest = build_shards(split_docs, embeddings, SHARDS_PATH, num_shards, shard_by)
+            print(f"✅ {num_shards} shards (by {shard_by}) saved to: {SHARDS_PATH} - sizes {manifest['sizes']}")
+        elif read_manifest(SHARDS_PATH):
+            # Shards from an earlier --shards build would be served instead of the new index
+            remove_shards(SHARDS_PATH)
+            print(f"🧹 Removed the shards of an earlier build from: {SHARDS_PATH}")
+    except Exception as e:
+        print(f"❌ Error creating vector store: {e}")
+
+def rebuild_shard(shard: int):
+    """Rebuild ONE shard in place (same count / strategy as the last full build)"""
+    manifest = read_manifest(SHARDS_PATH)
+    if manifest is None:
+        print(f"❌ No shards in {SHARDS_PATH} - build them first with --shards N")
+        return
+    size = build_shard(load_documents(), embeddings, SHARDS_PATH, shard,
+                       manifest["num_shards"], manifest["by"])
+    print(f"✅ Shard {shard} rebuilt ({size} documents) - reload it with POST /admin/reload-index?shard={shard}")
+
+def load_unstructured_chunks():
+    """Generic 1000-character chunking for files without Section/CASE headings"""
     docs = []
     
     # Load Laws
@@ -54,11 +134,6 @@ def build_vector_store():
     else:
         print(f"   ❌ precedents.txt not found at: {PRECEDENTS_FILE}")
 
-    if not docs:
-        print("❌ No documents found. Vector store not created.")
-        print(f"   Make sure laws.txt and precedents.txt exist in: {DATA_FOLDER}")
-        return
-
     # Split text into chunks
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
@@ -67,20 +142,7 @@ def build_vector_store():
     )
     split_docs = text_splitter.split_documents(docs)
     print(f"   📄 Split into {len(split_docs)} chunks")
-
-    # Create Vector Store
-    try:
-        # Ensure vector_store directory exists
-        os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
-        
-        vector_store = FAISS.from_documents(split_docs, embeddings)
-        
-        # Save to disk
-        vector_store.save_local(VECTOR_STORE_PATH)
-        print(f"✅ Vector Store saved to: {VECTOR_STORE_PATH}")
-        print(f"   Total documents indexed: {len(split_docs)}")
-    except Exception as e:
-        print(f"❌ Error creating vector store: {e}")
+    return split_docs
 
 def get_retriever():
     """
@@ -102,12 +164,21 @@ def get_retriever():
         return None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the FAISS vector store")
+    parser.add_argument("--shards", type=int, default=0, help="also split the index into N shards")
+    parser.add_argument("--shard-by", choices=STRATEGIES, default="hash")
+    parser.add_argument("--only-shard", type=int, help="rebuild just this shard")
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("🏗️  BUILDING VECTOR DATABASE")
     print("="*60 + "\n")
     
-    build_vector_store()
+    if args.only_shard is not None:
+        rebuild_shard(args.only_shard)
+    else:
+        build_vector_store(args.shards, args.shard_by)
     
     print("\n" + "="*60)
     print("✅ VECTOR DATABASE BUILD COMPLETE")
-    print("="*60 + "\n")
\ No newline at end of file
+    print("="*60 + "\n")
@@ -0,0 +1,123 @@
+"""
+AGENT CHECKPOINTS
+=================
+
+Persists the AgentState after every completed agent (SQLite, table
+agent_checkpoints next to the Analysis model), so a failed or repeated
+analysis resumes instead of starting over.
+
+Each checkpoint is keyed by a fingerprint CHAIN:
+
+  base        = sha256(judgment text, RAG context)
+  fp(agent_i) = sha256(fp(agent_i-1), agent key, agent prompts, model)
+
+so a retry after the logic audit failed finds the law / web / precedent
+checkpoints and only reruns the logic audit and summary, and changing ONE
+prompt (or the model routed to one agent) changes the fingerprint of that
+agent and every agent after it - only they are recomputed.
+
+Degraded results (see agents.py DEADLINES) are never checkpointed, and
+neither is anything computed after them in the same run.
+"""
+
+import datetime
+import hashlib
+import json
+import threading
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage
+
+from models import AgentCheckpoint
+
+# AgentState fields written by agents (inputs and bookkeeping are not stored)
+OUTPUT_FIELDS = ("laws_found", "sections_found", "web_research", "web_sources",
+                 "precedent_candidates", "related_precedents", "precedent_analysis", "logic_audit",
+                 "final_summary")
+
+
+def fingerprint(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def serialize_state(state: dict) -> str:
+    data = {field: state[field] for field in OUTPUT_FIELDS}
+    data["messages"] = [msg.content for msg in state["messages"]]
+    return json.dumps(data, ensure_ascii=False)
+
+
+def restore_state(state: dict, payload: str) -> dict:
+    data = json.loads(payload)
+    state["messages"] = [AIMessage(content=content) for content in data.pop("messages")]
+    state.update(data)
+    return state
+
+
+class CheckpointStore:
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.writes = 0
+
+    def load(self, key: str) -> Optional[str]:
+        db = self.session_factory()
+        try:
+            row = db.query(AgentCheckpoint).filter(AgentCheckpoint.fingerprint == key).first()
+        finally:
+            db.close()
+        if row is not None:
+            with self._lock:
+                self.hits += 1
+        return row.state if row is not None else None
+
+    def save(self, key: str, agent: str, state: dict) -> None:
+        db = self.session_factory()
+        try:
+            row = db.query(AgentCheckpoint).filter(AgentCheckpoint.fingerprint == key).first()
+            if row is None:
+                row = AgentCheckpoint(fingerprint=key, agent=agent)
+                db.add(row)
+            row.state = serialize_state(state)
+            row.created_at = datetime.datetime.utcnow()
+            db.commit()
+        except Exception:
+            db.rollback()   # e.g. a concurrent run saved the same key first
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            self.writes += 1
+
+    def prune(self, older_than_days: float) -> int:
+        """Delete checkpoints older than N days; returns the number removed"""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)
+        db = self.session_factory()
+        try:
+            removed = db.query(AgentCheckpoint).filter(AgentCheckpoint.created_at < cutoff).delete()
+            db.commit()
+        finally:
+            db.close()
+        return removed
+
+    def stats(self) -> dict:
+        db = self.session_factory()
+        try:
+            stored = db.query(AgentCheckpoint).count()
+        finally:
+            db.close()
+        with self._lock:
+            return {"stored": stored, "restored": self.hits, "written": self.writes}
+
+
+def chain(base: str, agents: List) -> List[str]:
+    """Fingerprint of each agent's output, in pipeline order"""
+    keys, previous = [], base
+    for agent in agents:
+        previous = fingerprint(previous, agent.key, agent.fingerprint())
+        keys.append(previous)
+    return keys
@@ -0,0 +1,194 @@
+"""
+SECTION → PRECEDENT CITATION INDEX
+==================================
+
+Built once from precedents.txt (build_vector_db.py writes
+data/citation_index.json) and served from memory:
+
+  sections  IPC section → case numbers that apply it, ranked
+            (the section is the case's primary charge first, then
+            Supreme Court before High Courts, then most recent)
+  cases     case number → title, year, court, sections, legal principle
+  related   case number → cases sharing a section (case graph),
+            most shared sections first
+
+PrecedentAnalyzerAgent gets the ranked candidates for the sections the Law
+Identifier found, plus the cases linked to the top candidates in the case
+graph (related_to), so the model compares the judgment against real cases
+from the database instead of recalling precedents from scratch.
+
+Usage:
+    python citation_index.py [--sections 302 304A]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CITATION_INDEX_FILE = os.path.join(os.path.dirname(BASE_DIR), "data", "citation_index.json")
+MAX_RELATED = 10
+
+
+def court_rank(court: str) -> int:
+    court = (court or "").lower()
+    if "supreme court" in court:
+        return 0
+    if "high court" in court:
+        return 1
+    return 2
+
+
+def _principle(text: str) -> str:
+    for label in ("Legal Principle", "Key Issue"):
+        match = re.search(rf"^{label}: (.+)$", text, re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+    return ""
+
+
+def build_citation_index(docs: List[Document]) -> dict:
+    """Index the precedent documents (statutes and unstructured chunks are ignored)"""
+    cases, by_section = {}, defaultdict(list)
+    for doc in docs:
+        meta = doc.metadata
+        if meta.get("doc_type") != "precedent":
+            continue
+        case_no = str(meta["case_no"])
+        cases[case_no] = {
+            "case_no": meta["case_no"],
+            "title": meta.get("title", ""),
+            "year": meta.get("year"),
+            "court": meta.get("court", ""),
+            "sections": meta.get("sections", []),
+            "primary_section": meta.get("primary_section", ""),
+            "principle": _principle(doc.page_content),
+        }
+        for section in meta.get("sections", []):
+            by_section[section].append(case_no)
+
+    def rank(section):
+        return lambda no: (cases[no]["primary_section"] != section,
+                           court_rank(cases[no]["court"]), -(cases[no]["year"] or 0))
+
+    sections = {section: sorted(nos, key=rank(section)) for section, nos in sorted(by_section.items())}
+
+    related = {}
+    for case_no, case in cases.items():
+        shared = defaultdict(int)
+        for section in case["sections"]:
+            for other in sections[section]:
+                if other != case_no:
+                    shared[other] += 1
+        ordered = sorted(shared, key=lambda no: (-shared[no], court_rank(cases[no]["court"]),
+                                                 -(cases[no]["year"] or 0)))
+        related[case_no] = [[no, shared[no]] for no in ordered[:MAX_RELATED]]
+
+    return {"sections": sections, "cases": cases, "related": related}
+
+
+def save_citation_index(index: dict, path: str = CITATION_INDEX_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+class CitationIndex:
+    """In-memory lookups over a built index (dict lookups + one small sort)"""
+
+    def __init__(self, data: dict):
+        self.sections: Dict[str, List[str]] = data["sections"]
+        self.cases: Dict[str, dict] = data["cases"]
+        self.related_cases: Dict[str, List[list]] = data["related"]
+        # Changes whenever the index is rebuilt with different content
+        self.digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def load(cls, path: str = CITATION_INDEX_FILE) -> Optional["CitationIndex"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_documents(cls, docs: List[Document]) -> "CitationIndex":
+        return cls(build_citation_index(docs))
+
+    def __len__(self):
+        return len(self.cases)
+
+    def candidates(self, sections: List[str], limit: int = 5) -> List[dict]:
+        """
+        Cases applying any of the sections: most sections matched first,
+        then each section's own ranking (primary charge, court, recency)
+        """
+        matched, best = defaultdict(int), {}
+        for section in dict.fromkeys(s.upper() for s in sections):
+            for position, case_no in enumerate(self.sections.get(section, [])):
+                matched[case_no] += 1
+                best[case_no] = min(best.get(case_no, position), position)
+        ordered = sorted(matched, key=lambda no: (-matched[no], best[no],
+                                                  court_rank(self.cases[no]["court"])))
+        return [self.cases[no] for no in ordered[:limit]]
+
+    def related(self, case_no, limit: int = 5) -> List[dict]:
+        """Cases sharing the most sections with case_no"""
+        return [{**self.cases[no], "shared_sections": shared}
+                for no, shared in self.related_cases.get(str(case_no), [])[:limit]]
+
+    def related_to(self, case_nos: List, limit: int = 5) -> List[dict]:
+        """
+        Graph neighbours of several cases (never the cases themselves):
+        linked to the most of them first, then most shared sections
+        """
+        given = {str(no) for no in case_nos}
+        links, shared = defaultdict(int), defaultdict(int)
+        for case_no in given:
+            for other, count in self.related_cases.get(case_no, []):
+                if other not in given:
+                    links[other] += 1
+                    shared[other] += count
+        ordered = sorted(links, key=lambda no: (-links[no], -shared[no], court_rank(self.cases[no]["court"]),
+                                                -(self.cases[no]["year"] or 0)))
+        return [{**self.cases[no], "shared_sections": shared[no]} for no in ordered[:limit]]
+
+
+def format_candidates(cases: List[dict]) -> str:
+    lines = []
+    for case in cases:
+        line = f"- {case['title']}, {case['court']} [{', '.join(case['sections'])}]"
+        if case["principle"]:
+            line += f": {case['principle']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from legal_corpus import load_corpus
+
+    parser = argparse.ArgumentParser(description="Build / query the section → precedent index")
+    parser.add_argument("--sections", nargs="*", default=["302", "304A"])
+    args = parser.parse_args()
+
+    index = build_citation_index(load_corpus())
+    save_citation_index(index)
+    citations = CitationIndex(index)
+    print(f"✅ {len(citations)} cases over {len(citations.sections)} sections saved to: {CITATION_INDEX_FILE}")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        found = citations.candidates(args.sections)
+    print(f"⚡ candidates({args.sections}) in {(time.perf_counter() - start) * 1000:.1f} µs:")
+    print(format_candidates(found))
+    if found:
+        print(f"\n🔗 Related to CASE {found[0]['case_no']}:")
+        print(format_candidates(citations.related(found[0]["case_no"], limit=3)))
@@ -1,13 +1,17 @@
 
+import os
+
 import sqlalchemy
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 SQLITE_DATABASE_URL = "sqlite:///./judicial_ai.db"
+DATABASE_URL = os.getenv("DATABASE_URL", SQLITE_DATABASE_URL)
 
 engine = create_engine(
-    SQLITE_DATABASE_URL, connect_args={"check_same_thread": False}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
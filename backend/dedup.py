@@ -0,0 +1,232 @@
+"""
+NEAR-DUPLICATE DETECTION (MinHash + LSH)
+========================================
+
+Appeals, reprints and the same judgment from different reporters differ
+only in headers, page numbers and OCR noise. Exact hashing misses them, so
+documents are compared by the Jaccard similarity of their word 5-shingles,
+estimated with MinHash signatures and bucketed with LSH so that only
+likely pairs are ever compared:
+
+  cluster(texts)        → groups of near-duplicates (union-find over LSH pairs)
+  deduplicate(docs)     → one representative per cluster, for ingestion
+  diversify(docs, k)    → top-k without near-duplicate copies, for search
+  NearDuplicateIndex    → incremental index, for the upload path
+  content_hash(text)    → exact identity, to verify a near-duplicate match
+
+With 128 permutations in 16 bands of 8 rows, pairs above ~0.7 Jaccard
+become candidates; candidates are then checked against the threshold
+(0.8 by default) using the full signature.
+
+Usage:
+    python dedup.py                  # cluster report for data/*.txt
+"""
+
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values)"""
+    grams = shingles(text)
+    if not grams:
+        return np.full(NUM_PERM, _MERSENNE, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    # (a * x + b) mod p for every permutation at once; a, x < 2^32 so no overflow
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _MERSENNE).min(axis=1)
+
+
+@lru_cache(maxsize=4096)
+def _cached_signature(text: str) -> np.ndarray:
+    return signature(text)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(a == b))
+
+
+def content_hash(text: str) -> str:
+    """sha256 of the words only: equal for re-extractions that differ in spacing or case"""
+    return hashlib.sha256(" ".join(re.findall(r"[a-z0-9]+", text.lower())).encode("utf-8")).hexdigest()
+
+
+def _bands(sig: np.ndarray):
+    for band in range(BANDS):
+        yield band, sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+
+# --------------------------------------------------
+# BATCH CLUSTERING (ingestion)
+# --------------------------------------------------
+def cluster(texts: List[str], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """Indices of near-duplicate groups (singletons included)"""
+    sigs = [signature(t) for t in texts]
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = defaultdict(list)
+    for i, sig in enumerate(sigs):
+        for key in _bands(sig):
+            buckets[key].append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if find(i) != find(j) and similarity(sigs[i], sigs[j]) >= threshold:
+                    parent[find(j)] = find(i)
+
+    groups = defaultdict(list)
+    for i in range(len(texts)):
+        groups[find(i)].append(i)
+    return list(groups.values())
+
+
+def _always_keep(doc) -> bool:
+    # Statute sections are distinct legal units even when their short texts
+    # share boilerplate ("Punishment: imprisonment ... Bailable")
+    return doc.metadata.get("doc_type") == "statute"
+
+
+def deduplicate(docs: List, threshold: float = DEFAULT_THRESHOLD) -> Tuple[List, List[List[int]]]:
+    """
+    One representative per cluster - the longest copy, which is usually the
+    most complete. The representative's metadata records how many copies
+    it stands for; statutes pass through untouched. Returns
+    (representatives, clusters) with clusters indexing into docs.
+    """
+    candidates = [i for i, d in enumerate(docs) if not _always_keep(d)]
+    clusters = [[candidates[i] for i in group]
+                for group in cluster([docs[i].page_content for i in candidates], threshold)]
+
+    keep = {i for i, d in enumerate(docs) if _always_keep(d)}
+    for group in clusters:
+        best = max(group, key=lambda i: len(docs[i].page_content))
+        if len(group) > 1:
+            docs[best].metadata["duplicates"] = len(group) - 1
+        keep.add(best)
+    return [docs[i] for i in sorted(keep)], clusters
+
+
+# --------------------------------------------------
+# RESULT DIVERSIFICATION (search)
+# --------------------------------------------------
+def diversify(docs: List, k: int, threshold: float = DEFAULT_THRESHOLD) -> List:
+    """First k documents in rank order, skipping near-copies of ones already picked"""
+    picked, sigs = [], []
+    for doc in docs:
+        if _always_keep(doc):
+            picked.append(doc)
+            if len(picked) == k:
+                break
+            continue
+        sig = _cached_signature(doc.page_content)
+        if any(similarity(sig, other) >= threshold for other in sigs):
+            continue
+        picked.append(doc)
+        sigs.append(sig)
+        if len(picked) == k:
+            break
+    return picked
+
+
+# --------------------------------------------------
+# INCREMENTAL INDEX (uploads)
+# --------------------------------------------------
+class NearDuplicateIndex:
+    """Thread-safe LSH index of recent texts with an LRU bound"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, max_entries: int = 1024):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], set] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, sig: np.ndarray) -> Optional[Tuple[Hashable, Any, float]]:
+        """(key, value, similarity) of the closest stored text above the threshold"""
+        with self._lock:
+            candidates = set()
+            for band in _bands(sig):
+                candidates |= self._buckets.get(band, set())
+
+            best = None
+            for key in candidates:
+                score = similarity(sig, self._entries[key][0])
+                if score >= self.threshold and (best is None or score > best[2]):
+                    best = (key, self._entries[key][1], score)
+            if best is not None:
+                self._entries.move_to_end(best[0])
+            return best
+
+    def add(self, key: Hashable, sig: np.ndarray, value: Any = None) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (sig, value)
+            for band in _bands(sig):
+                self._buckets[band].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        sig, _ = self._entries.pop(key)
+        for band in _bands(sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+
+if __name__ == "__main__":
+    import time
+
+    from legal_corpus import load_corpus
+
+    corpus = load_corpus()
+    start = time.perf_counter()
+    kept, groups = deduplicate(corpus)
+    elapsed = time.perf_counter() - start
+    duplicates = [g for g in groups if len(g) > 1]
+    print(f"📄 {len(corpus)} documents → {len(kept)} kept "
+          f"({len(corpus) - len(kept)} near-duplicates removed) in {elapsed * 1000:.0f} ms")
+    for group in duplicates[:10]:
+        print("   " + " ≈ ".join(corpus[i].metadata.get("title", str(i)) for i in group))
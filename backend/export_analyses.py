@@ -0,0 +1,280 @@
+"""
+STREAMING EXPORT OF STORED ANALYSES
+===================================
+
+Writes every saved analysis (analyses joined with judgments) to JSONL or
+Parquet in constant memory: rows come from a server-side cursor
+(stream_results) in fixed-size batches (yield_per) and are written batch by
+batch, so a multi-million-row table never sits in memory (unlike
+verify_db_content.py, which loads whole tables into pandas).
+
+Filters: created_at date range (--since / --until, inclusive) and IPC
+sections (--sections 302 304A: analyses whose identified laws cite any of
+them).
+
+Parquet needs pyarrow (pip install pyarrow); JSONL has no extra dependency.
+The API serves the same stream at GET /export.
+
+Usage:
+    python export_analyses.py --format jsonl --output analyses.jsonl
+    python export_analyses.py --format parquet --output analyses.parquet --since 2025-01-01 --sections 302
+    DATABASE_URL=sqlite:///./scratch.db python export_analyses.py --seed-rows 2000000 --output /dev/null
+"""
+
+import argparse
+import datetime
+import json
+import re
+import sys
+import time
+from typing import Iterator, List, Optional
+
+from sqlalchemy import insert, or_
+
+from database import Base, SessionLocal, engine
+from models import Analysis, Judgment
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # optional: Parquet export only
+    pa = pq = None
+
+FORMATS = ("jsonl", "parquet")
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+DEFAULT_BATCH_SIZE = 5000
+
+COLUMNS = {
+    "id": Analysis.id,
+    "judgment_id": Analysis.judgment_id,
+    "filename": Judgment.filename,
+    "upload_date": Judgment.upload_date,
+    "created_at": Analysis.created_at,
+    "summary": Analysis.summary,
+    "laws": Analysis.laws,
+    "analysis": Analysis.analysis_content,
+    "web_research": Analysis.web_research,
+    "web_sources": Analysis.web_sources,
+}
+
+
+def parse_date(value: Optional[str], end: bool = False) -> Optional[datetime.datetime]:
+    """ISO date or datetime; a bare --until date includes that whole day (both bounds are inclusive)"""
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        # Last instant of the day (timestamps are stored with microseconds)
+        parsed += datetime.timedelta(days=1, microseconds=-1)
+    return parsed
+
+
+def _section_pattern(sections: List[str]):
+    alternatives = "|".join(re.escape(s.upper()) for s in sections)
+    return re.compile(rf"(?<![\dA-Z])(?:{alternatives})(?![\dA-Z])")
+
+
+def iter_rows(db, since: Optional[datetime.datetime] = None, until: Optional[datetime.datetime] = None,
+              sections: Optional[List[str]] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[dict]]:
+    """Batches of export rows, oldest first, read through a server-side cursor"""
+    query = (db.query(*COLUMNS.values())
+             .select_from(Analysis)
+             .join(Judgment, Analysis.judgment_id == Judgment.id))
+    if since:
+        query = query.filter(Analysis.created_at >= since)
+    if until:
+        query = query.filter(Analysis.created_at <= until)
+    pattern = None
+    if sections:
+        # LIKE narrows the scan in SQL; the regex drops "3021" for "302"
+        query = query.filter(or_(*(Analysis.laws.like(f"%{s}%") for s in sections)))
+        pattern = _section_pattern(sections)
+
+    result = db.execute(
+        query.order_by(Analysis.id).statement.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    names = list(COLUMNS)
+    for partition in result.partitions():
+        batch = []
+        for row in partition:
+            record = dict(zip(names, row))
+            if pattern and not pattern.search((record["laws"] or "").upper()):
+                continue
+            record["web_sources"] = json.loads(record["web_sources"]) if record["web_sources"] else []
+            batch.append(record)
+        if batch:
+            yield batch
+
+
+def _jsonable(record: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, datetime.datetime) else v for k, v in record.items()}
+
+
+def jsonl_chunks(batches: Iterator[List[dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(_jsonable(r), ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("judgment_id", pa.int64()),
+        ("filename", pa.string()),
+        ("upload_date", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+        ("summary", pa.string()),
+        ("laws", pa.string()),
+        ("analysis", pa.string()),
+        ("web_research", pa.string()),
+        ("web_sources", pa.list_(pa.struct([("title", pa.string()), ("url", pa.string()),
+                                            ("snippet", pa.string())]))),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object that hands each written chunk back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def parquet_chunks(batches: Iterator[List[dict]]) -> Iterator[bytes]:
+    """Parquet file as a byte stream: one row group per batch"""
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(fmt: str, batches: Iterator[List[dict]]) -> Iterator[bytes]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {FORMATS})")
+    return jsonl_chunks(batches) if fmt == "jsonl" else parquet_chunks(batches)
+
+
+def stream_export(fmt: str = "jsonl", since=None, until=None, sections=None,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encoded export with its own session (closed when the stream ends) - used by GET /export"""
+    db = SessionLocal()
+    try:
+        yield from export_chunks(fmt, iter_rows(db, since, until, sections, batch_size))
+    finally:
+        db.close()
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def seed_rows(count: int, batch_size: int = 10_000):
+    """Insert synthetic analyses for throughput tests (use a scratch DATABASE_URL)"""
+    laws = ["Section 302 (IPC) - Murder", "Section 304A (IPC) - Causing death by negligence",
+            "Section 420 (IPC) - Cheating", "Section 498A (IPC) - Cruelty by husband or relatives"]
+    text = "The appellant was convicted by the trial court and the conviction was challenged on appeal. " * 20
+    now = datetime.datetime.utcnow()
+    with engine.begin() as conn:
+        start = conn.execute(Judgment.__table__.select().with_only_columns(Judgment.id)
+                             .order_by(Judgment.id.desc()).limit(1)).scalar() or 0
+    for offset in range(0, count, batch_size):
+        ids = range(start + offset + 1, start + min(offset + batch_size, count) + 1)
+        with engine.begin() as conn:
+            conn.execute(insert(Judgment.__table__),
+                         [{"id": i, "filename": f"judgment-{i}.pdf", "upload_date": now} for i in ids])
+            conn.execute(insert(Analysis.__table__), [{
+                "judgment_id": i, "summary": text[:600], "laws": laws[i % len(laws)],
+                "analysis_content": text, "web_research": text[:400], "created_at": now,
+                "web_sources": json.dumps([{"title": "Source", "url": f"https://example.org/{i}"}]),
+            } for i in ids])
+        print(f"   🌱 {min(offset + batch_size, count)}/{count} rows", end="\r")
+    print()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process; None where it cannot be read"""
+    try:
+        import resource   # Unix only
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        memory = psutil.Process().memory_info()
+        # Windows reports the peak working set; elsewhere only the current RSS
+        return getattr(memory, "peak_wset", memory.rss) / 2**20
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream stored analyses to JSONL / Parquet")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--output", required=True, help="output file ('-' for stdout, JSONL only)")
+    parser.add_argument("--since", help="created on/after (YYYY-MM-DD or ISO datetime)")
+    parser.add_argument("--until", help="created on/before (YYYY-MM-DD or ISO datetime)")
+    parser.add_argument("--sections", nargs="*", help="only analyses citing any of these IPC sections")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--seed-rows", type=int, default=0, help="first insert N synthetic analyses")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.seed_rows:
+        print(f"🌱 Seeding {args.seed_rows} synthetic analyses...")
+        seed_rows(args.seed_rows)
+
+    since, until = parse_date(args.since), parse_date(args.until, end=True)
+    db = SessionLocal()
+    rows, written = 0, 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    start = time.perf_counter()
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in export_chunks(args.format, counted(iter_rows(db, since, until, args.sections, args.batch_size))):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        db.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    peak = peak_rss_mb()
+    print(f"✅ Exported {rows} analyses ({written / 2**20:.1f} MB {args.format}) in {elapsed:.1f}s - "
+          f"{rows / elapsed if elapsed else 0:,.0f} rows/sec, "
+          f"peak RSS {'n/a' if peak is None else f'{peak:.0f} MB'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+HTTP CACHING + COMPRESSION
+==========================
+
+Helpers for the history endpoints, whose analyses never change once saved:
+
+• Conditional GETs: weak ETag + Last-Modified on every response; a request
+  with a matching If-None-Match (or an If-Modified-Since not older than the
+  record) gets 304 Not Modified with no body
+• Cache-Control: single analyses are immutable (cached for a year), the
+  history list is revalidated on every use (cheap thanks to the ETag)
+• Compression: BrotliMiddleware answers "Accept-Encoding: br" when the
+  brotli package is installed; GZipMiddleware (added after it, so it runs
+  outside) compresses everything else and skips bodies that are already
+  encoded
+• Field selection: ?fields=summary,laws returns only those fields
+
+ETags are weak (W/"...") because the same entity is sent gzip-, brotli- or
+un-encoded.
+"""
+
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:   # optional: gzip only
+    brotli = None
+
+IMMUTABLE = "private, max-age=31536000, immutable"
+REVALIDATE = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    if value.tzinfo is None:   # SQLite returns naive UTC datetimes
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return format_datetime(value.astimezone(datetime.timezone.utc), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime.datetime], cache_control: str) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(request_headers, etag: str, last_modified: Optional[datetime.datetime]) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: List[str]) -> List[str]:
+    """?fields=a,b → ["id", "a", "b"]; ValueError on unknown names"""
+    if not fields:
+        return list(default)
+    allowed = list(allowed)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown} (available: {', '.join(allowed)})")
+    return list(dict.fromkeys(["id", *wanted]))
+
+
+class BrotliMiddleware:
+    """Brotli for complete (non-streaming) responses; everything else passes through"""
+
+    def __init__(self, app, minimum_size: int = 500, quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = quality
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or brotli is None
+                or "br" not in Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = Headers(raw=message["headers"])
+                passthrough = "content-encoding" in headers or message["status"] in (204, 206, 304)
+                if passthrough:
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming (e.g. exports) or tiny: leave it to GZipMiddleware
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = brotli.compress(body, quality=self.quality)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = "br"
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,285 @@
+"""
+VECTOR INDEX HOT RELOAD
+=======================
+
+Holds the live vector index (full FAISS or shards + per-section partitions)
+and the lookups built from the same corpus (citation index, statute
+titles) as one immutable IndexSnapshot and replaces it without restarting
+the API:
+
+  reload()  → loads the new index in a background thread, then swaps the
+              reference in one assignment; requests that already hold the
+              old snapshot finish on it
+  acquire() → ``with manager.acquire() as snap:`` pins a snapshot for the
+              duration of a query; the old snapshot's memory (and shard
+              worker processes) is released when its last query finishes
+  reload_shard(i) → reloads one shard of a sharded index in place
+  watch()   → optional poller that reloads when build_vector_db.py has
+              written a newer index (debounced, so a half-written build is
+              never picked up)
+
+Every snapshot has a version. Caches store the version with each entry and
+ignore entries from older versions (see SemanticCache), and on_swap
+listeners are called so they can drop them eagerly.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from langchain_community.vectorstores import FAISS
+
+from citation_index import CITATION_INDEX_FILE, CitationIndex
+from law_extractor import LAWS_FILE, LawExtractor
+from legal_corpus import load_corpus
+from partitioned_index import MANIFEST as PARTITION_MANIFEST, PartitionedIndex
+from sharded_index import MANIFEST as SHARD_MANIFEST, ShardedIndex, read_manifest as read_shard_manifest
+
+
+@dataclass
+class IndexSnapshot:
+    version: int
+    vector_db: Any = None
+    partitioned_db: Optional[PartitionedIndex] = None
+    kind: str = "none"               # "faiss" | "sharded" | "none" | custom
+    citation_index: Optional[CitationIndex] = None
+    law_extractor: Optional[LawExtractor] = None
+    source_mtime: float = 0.0
+    loaded_at: float = field(default_factory=time.time)
+    load_seconds: float = 0.0
+    in_flight: int = 0
+    retired: bool = False
+
+    def close(self):
+        """Free the index (shard workers are separate processes)"""
+        if hasattr(self.vector_db, "close"):
+            self.vector_db.close()
+        self.vector_db = None
+        self.partitioned_db = None
+
+    def documents(self) -> int:
+        if self.kind == "sharded":
+            return sum(self.vector_db.manifest.get("sizes", {}).values())
+        index = getattr(self.vector_db, "index", None)
+        return int(index.ntotal) if index is not None else 0
+
+
+def index_mtime(path: str) -> float:
+    """Newest modification time of the files build_vector_db.py writes"""
+    files = [
+        os.path.join(path, "index.faiss"),
+        os.path.join(path, "partitions", PARTITION_MANIFEST),
+        os.path.join(path, "shards", SHARD_MANIFEST),
+    ]
+    return max((os.path.getmtime(f) for f in files if os.path.exists(f)), default=0.0)
+
+
+def current_shards(path: str) -> bool:
+    """A shard set exists and is not older than index.faiss (left over from an earlier --shards build)"""
+    manifest = os.path.join(path, "shards", SHARD_MANIFEST)
+    if not read_shard_manifest(os.path.dirname(manifest)):
+        return False
+    single = os.path.join(path, "index.faiss")
+    if os.path.exists(single) and os.path.getmtime(manifest) < os.path.getmtime(single):
+        print(f"⚠️ Shards in {os.path.dirname(manifest)} are older than index.faiss - serving the single index")
+        return False
+    return True
+
+
+def load_lookups(citation_path: str = CITATION_INDEX_FILE, laws_path: str = LAWS_FILE) -> dict:
+    """Citation index (built from precedents.txt if the file is missing) and statute titles"""
+    return {
+        "citation_index": CitationIndex.load(citation_path) or CitationIndex.from_documents(load_corpus()),
+        "law_extractor": LawExtractor.from_file(laws_path),
+    }
+
+
+def load_snapshot(path: str, embeddings, version: int, use_shards: bool = True,
+                  citation_path: str = CITATION_INDEX_FILE, laws_path: str = LAWS_FILE) -> IndexSnapshot:
+    start = time.perf_counter()
+    mtime = index_mtime(path)
+    snapshot = IndexSnapshot(version=version, source_mtime=mtime, **load_lookups(citation_path, laws_path))
+
+    shards_path = os.path.join(path, "shards")
+    if use_shards and current_shards(path):
+        snapshot.vector_db = ShardedIndex(shards_path, embeddings)
+        snapshot.kind = "sharded"
+        # Partitions are searched inside the shard workers, not loaded here
+        snapshot.partitioned_db = snapshot.vector_db.partitions
+    else:
+        if os.path.exists(os.path.join(path, "index.faiss")):
+            snapshot.vector_db = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+            snapshot.kind = "faiss"
+        snapshot.partitioned_db = PartitionedIndex.load(os.path.join(path, "partitions"), embeddings)
+    snapshot.load_seconds = round(time.perf_counter() - start, 3)
+    return snapshot
+
+
+class IndexManager:
+    def __init__(self, path: str, embeddings, use_shards: bool = True,
+                 citation_path: str = CITATION_INDEX_FILE, laws_path: str = LAWS_FILE):
+        self.path = path
+        self.embeddings = embeddings
+        self.use_shards = use_shards
+        self.citation_path = citation_path
+        self.laws_path = laws_path
+        self._current = IndexSnapshot(version=0)
+        self._lock = threading.Lock()          # snapshot refcounts + swap
+        self._reload_lock = threading.Lock()   # one background load at a time
+        self._listeners: List[Callable[[IndexSnapshot], None]] = []
+        self.reloading = False
+        self.last_error: Optional[str] = None
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> IndexSnapshot:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def on_swap(self, listener: Callable[[IndexSnapshot], None]):
+        self._listeners.append(listener)
+
+    @contextlib.contextmanager
+    def acquire(self):
+        with self._lock:
+            snapshot = self._current
+            snapshot.in_flight += 1
+        try:
+            yield snapshot
+        finally:
+            with self._lock:
+                snapshot.in_flight -= 1
+                release = snapshot.retired and snapshot.in_flight == 0
+            if release:
+                snapshot.close()
+
+    def install(self, snapshot: IndexSnapshot) -> IndexSnapshot:
+        """Atomically make snapshot current and retire the previous one"""
+        with self._lock:
+            old = self._current
+            snapshot.version = old.version + 1
+            self._current = snapshot
+            old.retired = True
+            release = old.in_flight == 0
+        if release:
+            old.close()
+        self._notify(snapshot)
+        return snapshot
+
+    def _notify(self, snapshot: IndexSnapshot):
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print("⚠️ Index swap listener failed:", e)
+
+    def install_objects(self, vector_db=None, partitioned_db=None, kind: str = "custom",
+                        citation_index=None, law_extractor=None) -> IndexSnapshot:
+        """Serve already-built objects (benchmarks, tests); lookups not given are kept"""
+        return self.install(IndexSnapshot(
+            version=0, vector_db=vector_db, partitioned_db=partitioned_db, kind=kind,
+            citation_index=citation_index or self._current.citation_index,
+            law_extractor=law_extractor or self._current.law_extractor,
+        ))
+
+    def load(self) -> IndexSnapshot:
+        """Load synchronously (startup) - errors are reported, not raised"""
+        try:
+            snapshot = load_snapshot(self.path, self.embeddings, self.version + 1, self.use_shards,
+                                     self.citation_path, self.laws_path)
+        except Exception as e:
+            self.last_error = repr(e)
+            print("⚠️ Vector DB error:", e)
+            if self._current.law_extractor is None:
+                # Nothing served yet: start without vectors, but with the lookups
+                return self.install_objects(kind="none", **load_lookups(self.citation_path, self.laws_path))
+            return self._current
+        self.last_error = None
+        return self.install(snapshot)
+
+    def reload(self, wait: bool = False) -> bool:
+        """Start a background reload; False if one is already running"""
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        self.reloading = True
+
+        def run():
+            try:
+                snapshot = self.load()
+                if self.last_error:
+                    print(f"❌ Vector index reload failed, still serving version {snapshot.version}: "
+                          f"{self.last_error}")
+                else:
+                    print(f"🔄 Vector index reloaded: version {snapshot.version} "
+                          f"({snapshot.kind}, {snapshot.load_seconds}s)")
+            finally:
+                self.reloading = False
+                self._reload_lock.release()
+
+        thread = threading.Thread(target=run, name="index-reload", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def reload_shard(self, shard: int) -> int:
+        """
+        Reload one shard after build_shard() while the others keep serving;
+        returns its size. The version still moves on, since cached results
+        may include documents of the old shard.
+        """
+        snapshot = self._current
+        if snapshot.kind != "sharded":
+            raise ValueError("The live index is not sharded")
+        if not 0 <= shard < len(snapshot.vector_db):
+            raise IndexError(f"No shard {shard} (the index has {len(snapshot.vector_db)})")
+        size = snapshot.vector_db.reload(shard)[shard]
+        with self._lock:
+            snapshot.version += 1
+        print(f"🔄 Shard {shard} reloaded ({size} documents): version {snapshot.version}")
+        self._notify(snapshot)
+        return size
+
+    def watch(self, interval: float = 30.0):
+        """Poll the index files and reload once a new build has settled"""
+        if self._watcher is not None:
+            return
+
+        def run():
+            pending = None
+            while True:
+                time.sleep(interval)
+                mtime = index_mtime(self.path)
+                if mtime <= self._current.source_mtime:
+                    pending = None
+                elif mtime == pending:     # unchanged for a full interval
+                    self.reload()
+                    pending = None
+                else:
+                    pending = mtime
+
+        self._watcher = threading.Thread(target=run, name="index-watch", daemon=True)
+        self._watcher.start()
+
+    def info(self) -> dict:
+        snapshot = self._current
+        return {
+            "version": snapshot.version,
+            "kind": snapshot.kind,
+            "documents": snapshot.documents(),
+            "partitions": len(snapshot.partitioned_db.manifest) if snapshot.partitioned_db else 0,
+            "loaded_at": snapshot.loaded_at,
+            "load_seconds": snapshot.load_seconds,
+            "source_mtime": snapshot.source_mtime,
+            "on_disk_mtime": index_mtime(self.path),
+            "in_flight": snapshot.in_flight,
+            "reloading": self.reloading,
+            "watching": self._watcher is not None,
+            "last_error": self.last_error,
+        }
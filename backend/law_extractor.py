@@ -0,0 +1,204 @@
+"""
+DETERMINISTIC LAW EXTRACTOR
+===========================
+
+Finds statute references ("Section 302 IPC", "u/s 420", "Sections 302, 34
+and 120B", "Section 498-A IPC", "Section 13(1)(d) of the PC Act",
+"Article 21") with ONE compiled regex and resolves IPC sections to their
+titles from data/laws.txt. Order / Rule / Chapter / para numbers ("Order 7
+Rule 11 CPC") are not sections.
+
+A reference takes the Act named after it - or after the list / "read with"
+chain it belongs to. When no Act is named its Act is UNKNOWN_ACT (never
+assumed to be the IPC), and the Law Identifier agent asks the LLM only about
+those references, or about the whole judgment when nothing is recognised.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+LAWS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/laws.txt")
+
+# Canonical Act names -> aliases as they appear in judgments
+ACT_ALIASES = {
+    "IPC": ["IPC", "I.P.C.", "I.P.C", "Indian Penal Code", "Penal Code"],
+    "CrPC": ["CrPC", "Cr.P.C.", "Cr.P.C", "Code of Criminal Procedure", "Criminal Procedure Code"],
+    "CPC": ["CPC", "C.P.C.", "C.P.C", "Code of Civil Procedure", "Civil Procedure Code"],
+    "Evidence Act": ["Indian Evidence Act", "Evidence Act"],
+    "BNS": ["BNS", "Bharatiya Nyaya Sanhita"],
+    "BNSS": ["BNSS", "Bharatiya Nagarik Suraksha Sanhita"],
+    "BSA": ["BSA", "Bharatiya Sakshya Adhiniyam"],
+    "IT Act": ["IT Act", "I.T. Act", "Information Technology Act"],
+    "Prevention of Corruption Act": ["Prevention of Corruption Act", "PC Act", "P.C. Act"],
+    "NDPS Act": ["NDPS Act", "N.D.P.S. Act", "Narcotic Drugs and Psychotropic Substances Act"],
+    "POCSO Act": ["POCSO Act", "Protection of Children from Sexual Offences Act"],
+    "Negotiable Instruments Act": ["Negotiable Instruments Act", "NI Act", "N.I. Act"],
+    "SC/ST Act": ["SC/ST Act", "SC/ST (Prevention of Atrocities) Act",
+                  "Scheduled Castes and the Scheduled Tribes (Prevention of Atrocities) Act"],
+    "UAPA": ["UAPA", "Unlawful Activities (Prevention) Act"],
+    "Domestic Violence Act": ["Protection of Women from Domestic Violence Act", "Domestic Violence Act", "DV Act"],
+    "Juvenile Justice Act": ["Juvenile Justice (Care and Protection of Children) Act", "Juvenile Justice Act", "JJ Act"],
+    "Motor Vehicles Act": ["Motor Vehicles Act", "MV Act", "M.V. Act"],
+    "Dowry Prohibition Act": ["Dowry Prohibition Act"],
+    "Arms Act": ["Arms Act"],
+}
+UNKNOWN_ACT = "Act not stated"
+
+_ALIAS_TO_ACT = {alias.lower(): act for act, aliases in ACT_ALIASES.items() for alias in aliases}
+
+# Section number with optional sub-clauses: 302, 304A / 304-A, 13(1)(d), 376(2)(g)
+_NUM = r"\d{1,3}(?:-?[A-Z]{1,2})?\b(?:\([A-Z0-9]{1,4}\))*"
+_SEP = r"\s*(?:,|/|&|\band\b|\bor\b|\br/w\b|\bread with\b)\s*"
+_ACT = "|".join(
+    re.escape(alias) for alias in sorted(_ALIAS_TO_ACT, key=len, reverse=True)
+)
+# Numbered parts that are not sections: "Order 7 Rule 11 CPC", "Chapter 2 of the Evidence Act"
+_NOT_SECTION = (r"(?:Orders?|Rules?|Chapters?|Paras?|Paragraphs?|Schedules?|Clauses?|Articles?|Forms?"
+                r"|O\.|R\.|Ch\.|Sch\.|Cl\.|Para\.)")
+
+# One combined pattern: "Section(s)/Sec./S./u/s <list> [of the <Act>]",
+# "Article(s) <list>" and bare "<num> IPC" (matched with its label when it
+# is an Order / Rule / Chapter / para number, so it can be skipped)
+REFERENCE_PATTERN = re.compile(
+    rf"""
+    (?:\b(?:Sections?|Secs?\.?|S\.|u/s\.?)\s*
+        (?P<sections>{_NUM}(?:{_SEP}{_NUM})*)
+        (?:\s*(?:,\s*)?\(?(?:of\s+(?:the\s+)?)?(?P<act>{_ACT}))?
+    )
+    |(?:\bArticles?\s+(?P<articles>{_NUM}(?:{_SEP}{_NUM})*))
+    |(?:(?P<not_section>\b{_NOT_SECTION}\s*)?
+        \b(?P<bare>{_NUM})\s*(?:of\s+(?:the\s+)?)?(?P<bare_act>{_ACT}))
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_LIST_SPLIT = re.compile(_SEP, re.IGNORECASE)
+# Text between two references of one chain ("Section 302 read with Section 34 IPC")
+_CHAIN_GAP = re.compile(rf"^{_SEP}$", re.IGNORECASE)
+_CLAUSES = re.compile(r"\(.*$")
+
+
+def _normalize(number: str) -> str:
+    """"304a" / "304-A" -> "304A", "13(1)(D)" -> "13(1)(d)" """
+    base = _CLAUSES.sub("", number)
+    return base.replace("-", "").upper() + number[len(base):].lower()
+
+
+@dataclass(frozen=True)
+class StatuteRef:
+    """One resolved statute reference"""
+    section: str
+    act: str
+    description: str = ""
+
+    @property
+    def base(self) -> str:
+        """Section without sub-clauses: "13(1)(d)" -> "13" """
+        return _CLAUSES.sub("", self.section)
+
+    @property
+    def resolved(self) -> bool:
+        return self.act != UNKNOWN_ACT
+
+    def format(self) -> str:
+        label = "Article" if self.act == "Constitution of India" else "Section"
+        line = f"{label} {self.section} ({self.act})"
+        return f"{line} - {self.description}" if self.description else line
+
+
+def load_section_titles(path: str = LAWS_FILE) -> Dict[str, str]:
+    """Parse "Section N: Title" headings from laws.txt"""
+    titles = {}
+    if not os.path.exists(path):
+        return titles
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            match = re.match(r"^Section (\S+): (.+)$", line.strip())
+            if match:
+                titles[match.group(1).upper()] = match.group(2).strip()
+    return titles
+
+
+class LawExtractor:
+    """Regex + lookup statute extraction (no LLM)"""
+
+    def __init__(self, section_titles: Optional[Dict[str, str]] = None, default_act: str = UNKNOWN_ACT):
+        """default_act: Act of references that name none (e.g. "IPC" for an IPC-only corpus)"""
+        self.section_titles = section_titles or {}
+        self.default_act = default_act
+
+    @classmethod
+    def from_file(cls, path: str = LAWS_FILE) -> "LawExtractor":
+        return cls(load_section_titles(path))
+
+    def extract(self, text: str) -> List[StatuteRef]:
+        """All statute references in order of first appearance (deduplicated)"""
+        matches = []
+        for match in REFERENCE_PATTERN.finditer(text):
+            if match.group("articles"):
+                numbers, act = match.group("articles"), "Constitution of India"
+            elif match.group("not_section"):
+                continue
+            elif match.group("bare"):
+                numbers, act = match.group("bare"), self._act(match.group("bare_act"))
+            else:
+                numbers, act = match.group("sections"), self._act(match.group("act"))
+            matches.append([match, numbers, act])
+
+        # An unnamed reference chained to the next one takes its Act
+        for current, following in reversed(list(zip(matches, matches[1:]))):
+            if (current[2] == UNKNOWN_ACT and following[2] != "Constitution of India"
+                    and _CHAIN_GAP.match(text[current[0].end():following[0].start()])):
+                current[2] = following[2]
+        # ... and a number already cited with an Act keeps it ("Section 66A IT Act ... Section 66A")
+        named = {}
+        for _, numbers, act in matches:
+            if act not in (UNKNOWN_ACT, "Constitution of India"):
+                for number in _LIST_SPLIT.split(numbers):
+                    named.setdefault(_normalize(number.strip()), act)
+
+        found = {}
+        for _, numbers, named_act in matches:
+            for number in _LIST_SPLIT.split(numbers):
+                number = _normalize(number.strip())
+                act = named.get(number, self.default_act) if named_act == UNKNOWN_ACT else named_act
+                if not number or (act, number) in found:
+                    continue
+                description = self.section_titles.get(_CLAUSES.sub("", number), "") if act == "IPC" else ""
+                found[(act, number)] = StatuteRef(number, act, description)
+        return list(found.values())
+
+    @staticmethod
+    def ipc_sections(refs: List[StatuteRef]) -> List[str]:
+        """IPC section numbers without sub-clauses, deduplicated (e.g. ["302", "34"])"""
+        return list(dict.fromkeys(ref.base for ref in refs if ref.act == "IPC"))
+
+    def sections(self, text: str) -> List[str]:
+        """IPC section numbers only - references to other or unnamed Acts are left out"""
+        return self.ipc_sections(self.extract(text))
+
+    def format_laws(self, refs: List[StatuteRef]) -> str:
+        """Same "Section XXX (Act Name) - Description" lines the LLM is asked for"""
+        return "\n".join(ref.format() for ref in refs)
+
+    def _act(self, alias: Optional[str]) -> str:
+        if not alias:
+            return UNKNOWN_ACT
+        return _ALIAS_TO_ACT.get(alias.lower(), alias)
+
+
+if __name__ == "__main__":
+    import time
+
+    extractor = LawExtractor.from_file()
+    sample = ("The accused was convicted u/s 302 read with Section 34 IPC and "
+              "Sections 120B, 201 of the Indian Penal Code, and under Section 66C "
+              "of the IT Act and Section 13(1)(d) of the PC Act. Article 21 was invoked.")
+    start = time.perf_counter()
+    for _ in range(1000):
+        refs = extractor.extract(sample)
+    elapsed = (time.perf_counter() - start) / 1000 * 1e6
+    print(extractor.format_laws(refs))
+    print(f"\n⏱️ {elapsed:.1f} µs per extraction ({len(extractor.section_titles)} sections loaded)")
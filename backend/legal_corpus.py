@@ -0,0 +1,164 @@
+"""
+STRUCTURE-AWARE LEGAL CORPUS PARSER
+===================================
+
+Turns the two data files into ONE document per legal unit instead of
+generic 1000-character chunks:
+
+• laws.txt        "Section N: Title" blocks → one statute document each
+• precedents.txt  "CASE N: Title (Year)" records → one precedent document each
+
+Every document carries metadata for filtered retrieval:
+
+  statute    doc_type, act, section, title, chapter
+  precedent  doc_type, case_no, title, year, court, charge, sections,
+             primary_section, category
+
+plus start_index / end_index (character offsets in the source file).
+"""
+
+import os
+import re
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+from law_extractor import LawExtractor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FOLDER = os.path.join(os.path.dirname(BASE_DIR), "data")
+LAWS_FILE = os.path.join(DATA_FOLDER, "laws.txt")
+PRECEDENTS_FILE = os.path.join(DATA_FOLDER, "precedents.txt")
+
+_HEADER = re.compile(r"^=== (.+?) ===\s*$", re.MULTILINE)
+_SECTION = re.compile(r"^Section (\S+): (.+)$", re.MULTILINE)
+_CASE = re.compile(r"^CASE (\d+): (.+)$", re.MULTILINE)
+_EXTRACTOR = LawExtractor(default_act="IPC")   # IPC case database: unnamed sections are IPC
+
+
+def _blocks(text: str, heads: List[re.Match]):
+    """(head, start, end) for each heading, ending at the next heading or === header"""
+    headers = [m.start() for m in _HEADER.finditer(text)]
+    for i, head in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(text)
+        end = min([h for h in headers if head.start() < h < end] + [end])
+        yield head, head.start(), end
+
+
+def _header_at(text: str, position: int) -> str:
+    current = ""
+    for match in _HEADER.finditer(text):
+        if match.start() > position:
+            break
+        current = match.group(1).strip()
+    return current
+
+
+def parse_laws(text: str, source: str = "laws.txt") -> List[Document]:
+    docs = []
+    for head, start, end in _blocks(text, list(_SECTION.finditer(text))):
+        docs.append(Document(
+            page_content=text[start:end].strip(),
+            metadata={
+                "source": source,
+                "doc_type": "statute",
+                "act": "IPC",
+                "section": head.group(1).upper(),
+                "title": head.group(2).strip(),
+                "chapter": _header_at(text, start),
+                "start_index": start,
+                "end_index": end,
+            },
+        ))
+    return docs
+
+
+def parse_precedents(text: str, source: str = "precedents.txt") -> List[Document]:
+    docs = []
+    for head, start, end in _blocks(text, list(_CASE.finditer(text))):
+        block = text[start:end].strip()
+        fields = dict(re.findall(r"^(Court|Charge): (.+)$", block, re.MULTILINE))
+        title = head.group(2).strip()
+        year = re.search(r"\((\d{4})\)", title)
+        charge = fields.get("Charge", "").strip()
+        # Cases without a Charge line (e.g. PILs) still cite sections in the text
+        sections = _EXTRACTOR.sections(charge or block)
+        docs.append(Document(
+            page_content=block,
+            metadata={
+                "source": source,
+                "doc_type": "precedent",
+                "case_no": int(head.group(1)),
+                "title": title,
+                "year": int(year.group(1)) if year else None,
+                "court": fields.get("Court", "").strip(),
+                "charge": charge,
+                "sections": sections,
+                "primary_section": sections[0] if sections else "",
+                "category": _header_at(text, start),
+                "start_index": start,
+                "end_index": end,
+            },
+        ))
+    return docs
+
+
+def load_corpus(laws_file: str = LAWS_FILE, precedents_file: str = PRECEDENTS_FILE) -> List[Document]:
+    """All statute + precedent documents (missing files are skipped)"""
+    docs = []
+    for path, parser in ((laws_file, parse_laws), (precedents_file, parse_precedents)):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                docs.extend(parser(f.read(), source=os.path.basename(path)))
+    return docs
+
+
+# --------------------------------------------------
+# QUERY-TIME FILTERING
+# --------------------------------------------------
+def metadata_filter(
+    doc_type: Optional[str] = None,
+    sections: Optional[List[str]] = None,
+    court: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+) -> Optional[Callable[[dict], bool]]:
+    """Callable filter for FAISS.similarity_search(filter=...) - None if no criteria"""
+    wanted = {s.upper() for s in sections} if sections else None
+    if not any([doc_type, wanted, court, year_from, year_to]):
+        return None
+
+    def matches(meta: dict) -> bool:
+        if doc_type and meta.get("doc_type") != doc_type:
+            return False
+        if wanted:
+            doc_sections = set(meta.get("sections") or [meta.get("section", "")])
+            if not wanted & doc_sections:
+                return False
+        if court and court.lower() not in (meta.get("court") or "").lower():
+            return False
+        year = meta.get("year")
+        if year_from and (year is None or year < year_from):
+            return False
+        if year_to and (year is None or year > year_to):
+            return False
+        return True
+
+    return matches
+
+
+def search(vector_db, query: str, k: int = 3, fetch_k: int = 50, **filters) -> List[Document]:
+    """similarity_search with optional metadata filters (see metadata_filter)"""
+    predicate = metadata_filter(**filters)
+    if predicate is None:
+        return vector_db.similarity_search(query, k=k)
+    return vector_db.similarity_search(query, k=k, filter=predicate, fetch_k=fetch_k)
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    statutes = [d for d in corpus if d.metadata["doc_type"] == "statute"]
+    precedents = [d for d in corpus if d.metadata["doc_type"] == "precedent"]
+    print(f"📜 {len(statutes)} statute documents, ⚖️ {len(precedents)} precedent documents")
+    if precedents:
+        print(precedents[0].metadata)
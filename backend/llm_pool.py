@@ -0,0 +1,264 @@
+"""
+LLM PROVIDER POOL
+=================
+
+Spreads agent LLM calls over several Ollama hosts (and Gemini as an overflow
+tier) instead of a single ChatOllama:
+
+• Prefix affinity: calls that start with the same first message (the prefix
+  shared by every agent of one judgment, see agents.build_shared_prefix) go
+  to the backend that served it before, so that host's KV cache is reused
+• Least-loaded routing otherwise (or when the sticky backend is busy or
+  unhealthy): in-flight calls / concurrency limit, ties broken by latency
+• Per-backend concurrency limits (callers wait for a free slot)
+• Retries on another backend when a call fails; failing backends cool down
+• Per-backend latency / error stats for /llm/stats
+
+The pool exposes the same ``invoke(messages)`` as a LangChain chat model, so it
+can be passed anywhere an ``llm`` is expected (agents, orchestrator). Any
+object with ``invoke`` works as a backend, which makes it easy to point the
+pool at local fake LLM servers (e.g. ChatOllama with a fake ``base_url``).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import metrics
+
+
+class LLMBackend:
+    """One model server with its own concurrency limit and running stats"""
+
+    def __init__(self, name: str, llm, max_concurrency: int = 2, overflow: bool = False):
+        self.name = name
+        self.llm = llm
+        self.model = getattr(llm, "model", name)
+        self.max_concurrency = max(1, max_concurrency)
+        self.overflow = overflow
+
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.ewma_latency = 0.0
+        self.unhealthy_until = 0.0
+        self.last_error = ""
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def has_slot(self) -> bool:
+        return self.in_flight < self.max_concurrency
+
+    @property
+    def load(self) -> float:
+        return self.in_flight / self.max_concurrency
+
+    def record(self, latency: float, error: Optional[Exception] = None, cooldown: float = 0.0):
+        self.calls += 1
+        self.total_latency += latency
+        self.ewma_latency = latency if self.calls == 1 else 0.8 * self.ewma_latency + 0.2 * latency
+        if error is not None:
+            self.failures += 1
+            self.last_error = str(error)[:200]
+            self.unhealthy_until = time.monotonic() + cooldown
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "model": self.model,
+            "tier": "overflow" if self.overflow else "primary",
+            "healthy": self.healthy,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "avg_latency_ms": round(1000 * self.total_latency / self.calls, 1) if self.calls else 0.0,
+            "ewma_latency_ms": round(1000 * self.ewma_latency, 1),
+            "last_error": self.last_error,
+        }
+
+
+class NoBackendAvailable(RuntimeError):
+    """Raised when every backend has been tried (or none is configured)"""
+
+
+def prefix_key(messages) -> Optional[str]:
+    """Affinity key: hash of the first message when a task message follows it"""
+    if isinstance(messages, str) or len(messages) < 2:
+        return None
+    content = getattr(messages[0], "content", None)
+    if not isinstance(content, str):
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LLMPool:
+    """Drop-in ``llm`` that load-balances ``invoke`` calls over several backends"""
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        max_retries: int = 2,
+        cooldown: float = 30.0,
+        acquire_timeout: float = 300.0,
+        affinity_size: int = 4096,
+    ):
+        if not backends:
+            raise ValueError("LLMPool needs at least one backend")
+        self.backends = backends
+        self.max_retries = max_retries
+        self.cooldown = cooldown
+        self.acquire_timeout = acquire_timeout
+        self.affinity_size = affinity_size
+        self.model = backends[0].model
+        self._cond = threading.Condition()
+        self._affinity: "OrderedDict[str, str]" = OrderedDict()   # prefix key -> backend name (LRU)
+        self.affinity_hits = 0
+        self.affinity_misses = 0
+
+    @property
+    def primary(self) -> List[LLMBackend]:
+        return [b for b in self.backends if not b.overflow]
+
+    # --- ROUTING ---
+
+    def _sticky(self, key: Optional[str]) -> Optional[LLMBackend]:
+        name = self._affinity.get(key) if key else None
+        return next((b for b in self.backends if b.name == name), None)
+
+    def _choose(self, tried: set, key: Optional[str] = None, avoid: Optional[LLMBackend] = None
+                ) -> Optional[LLMBackend]:
+        """Pick a backend with a free slot, or None if the caller must wait"""
+        untried = [b for b in self.backends if b.name not in tried]
+        if not untried:
+            raise NoBackendAvailable(f"All LLM backends failed: {sorted(tried)}")
+
+        sticky = self._sticky(key)
+        if sticky in untried and sticky.healthy and sticky.has_slot:
+            return sticky
+
+        # Unhealthy backends are only used when nothing healthy is left
+        healthy = [b for b in untried if b.healthy] or untried
+        healthy = [b for b in healthy if b is not avoid] or healthy
+
+        for tier in (False, True):   # primary first, overflow only when primary is saturated
+            free = [b for b in healthy if b.overflow == tier and b.has_slot]
+            if free:
+                return min(free, key=lambda b: (b.load, b.ewma_latency))
+        return None
+
+    def _pin(self, key: str, backend: LLMBackend, hit: bool):
+        self._affinity[key] = backend.name
+        self._affinity.move_to_end(key)
+        while len(self._affinity) > self.affinity_size:
+            self._affinity.popitem(last=False)
+        if hit:
+            self.affinity_hits += 1
+        else:
+            self.affinity_misses += 1
+        metrics.LLM_AFFINITY.inc(result="hit" if hit else "miss")
+
+    def _acquire(self, tried: set, key: Optional[str] = None, hedge: bool = False) -> LLMBackend:
+        deadline = time.monotonic() + self.acquire_timeout
+        waiting = False
+        with self._cond:
+            try:
+                while True:
+                    sticky = self._sticky(key)
+                    if hedge:
+                        # A hedge duplicates a call the sticky backend is still busy with
+                        backend = self._choose(tried, avoid=sticky)
+                    else:
+                        backend = self._choose(tried, key)
+                    if backend:
+                        backend.in_flight += 1
+                        if key and not hedge:
+                            self._pin(key, backend, hit=backend is sticky)
+                        return backend
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise NoBackendAvailable("Timed out waiting for a free LLM slot")
+                    if not waiting:
+                        waiting = True
+                        metrics.QUEUE_DEPTH.inc(priority="pool")
+                    self._cond.wait(timeout=min(remaining, 1.0))
+            finally:
+                if waiting:
+                    metrics.QUEUE_DEPTH.dec(priority="pool")
+
+    def _release(self, backend: LLMBackend, latency: float, error: Optional[Exception] = None):
+        with self._cond:
+            backend.in_flight -= 1
+            backend.record(latency, error, self.cooldown)
+            self._cond.notify_all()
+
+    # --- LLM INTERFACE ---
+
+    def invoke(self, messages, hedge: bool = False, **kwargs):
+        """hedge=True: a duplicate of a slow call - routed away from the prompt's sticky backend"""
+        key = prefix_key(messages)
+        tried = set()
+        last_error = None
+        for _ in range(self.max_retries + 1):
+            try:
+                backend = self._acquire(tried, key, hedge)
+            except NoBackendAvailable:
+                if last_error:
+                    raise last_error
+                raise
+            start = time.perf_counter()
+            try:
+                response = backend.llm.invoke(messages, **kwargs)
+            except Exception as e:
+                self._release(backend, time.perf_counter() - start, e)
+                print(f"   ⚠️ LLM backend {backend.name} failed: {e} - retrying elsewhere")
+                tried.add(backend.name)
+                last_error = e
+                continue
+            self._release(backend, time.perf_counter() - start)
+            return response
+        raise last_error
+
+    def check_health(self, ping_messages) -> int:
+        """Ping every primary backend once; returns how many are healthy"""
+        for backend in self.primary:
+            start = time.perf_counter()
+            try:
+                backend.llm.invoke(ping_messages)
+                backend.record(time.perf_counter() - start)
+                print(f"✅ LLM backend {backend.name} ({backend.model}) connected")
+            except Exception as e:
+                backend.record(time.perf_counter() - start, e, self.cooldown)
+                print(f"❌ LLM backend {backend.name} not reachable: {e}")
+        return sum(1 for b in self.primary if b.healthy)
+
+    def stats(self) -> List[dict]:
+        with self._cond:
+            return [b.stats() for b in self.backends]
+
+    def affinity_stats(self) -> dict:
+        with self._cond:
+            routed = self.affinity_hits + self.affinity_misses
+            return {
+                "prefixes": len(self._affinity),
+                "hits": self.affinity_hits,
+                "misses": self.affinity_misses,
+                "hit_rate": round(self.affinity_hits / routed, 3) if routed else 0.0,
+            }
+
+
+class HedgeRoute:
+    """The pool as a hedge_llm: duplicates go to a backend other than the sticky one"""
+
+    def __init__(self, pool: LLMPool):
+        self.pool = pool
+        self.model = pool.model
+
+    def invoke(self, messages, **kwargs):
+        return self.pool.invoke(messages, hedge=True, **kwargs)
@@ -1,7 +1,7 @@
 """
 JUDICIAL AI BACKEND – FULL WORKING VERSION
 ========================================
-• LLaMA 3.1 via Ollama (Local)
+• LLaMA 3.1 via Ollama (Local, pooled across OLLAMA_HOSTS)
 • RAG with FAISS
 • Multi-Agent Reasoning
 • Web Research (Gemini + DuckDuckGo)
@@ -10,20 +10,28 @@ JUDICIAL AI BACKEND – FULL WORKING VERSION
 
 import os
 import io
+import hmac
+import itertools
+import json
+import multiprocessing
 import sys
 import re
 import PyPDF2
+from typing import Literal, Optional
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from langchain_ollama import ChatOllama
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_community.tools import DuckDuckGoSearchResults
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain_core.messages import HumanMessage
 
 # --------------------------------------------------
@@ -34,6 +42,19 @@ sys.path.append(BASE_DIR)
 load_dotenv()
 
 from agents import MultiAgentOrchestrator   # IMPORTANT: your existing agents.py
+from llm_pool import HedgeRoute, LLMBackend, LLMPool
+from scheduler import LLMScheduler, Overloaded, ScheduledLLM
+from semantic_cache import SemanticCache, same_documents
+from dedup import NearDuplicateIndex, content_hash, diversify, signature
+from index_manager import IndexManager
+from checkpoints import CheckpointStore
+from database import Base, SessionLocal, engine
+import export_analyses
+from http_cache import (IMMUTABLE, REVALIDATE, BrotliMiddleware, cache_headers, not_modified,
+                        parse_fields, weak_etag)
+import models   # registers the tables on Base
+import metrics
+import tracing
 
 # --------------------------------------------------
 # FASTAPI
@@ -49,22 +70,41 @@ app.add_middleware(
     allow_origins=["*"],   # REQUIRED for judges & ngrok
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
+# Compression: brotli when the client accepts it (and the package is
+# installed), gzip otherwise. GZip runs outside and skips encoded bodies
+# (Parquet exports are sent as Content-Encoding: identity).
+app.add_middleware(BrotliMiddleware, minimum_size=1000)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # --------------------------------------------------
-# OLLAMA (LOCAL LLM)
+# OLLAMA (LOCAL LLM HOSTS)
 # --------------------------------------------------
-llm = None
-try:
-    llm = ChatOllama(
-        model="llama3.1",
+# keep_alive keeps the model (and its KV cache) resident between agents;
+# num_ctx must stay constant or Ollama reloads the model and drops the cache.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
+
+# Comma-separated list, e.g. "http://gpu1:11434,http://gpu2:11434"
+OLLAMA_HOSTS = [
+    h.strip() for h in os.getenv("OLLAMA_HOSTS", "http://localhost:11434").split(",") if h.strip()
+]
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+
+def make_ollama(base_url: str, model: str = "llama3.1") -> ChatOllama:
+    return ChatOllama(
+        model=model,
         temperature=0.3,
-        base_url="http://localhost:11434"
+        base_url=base_url,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        num_ctx=OLLAMA_NUM_CTX
     )
-    llm.invoke([HumanMessage(content="ping")])
-    print("✅ Ollama LLaMA 3.1 connected")
-except Exception as e:
-    print("❌ Ollama not running:", e)
+
+ollama_backends = [
+    LLMBackend(host, make_ollama(host), max_concurrency=OLLAMA_MAX_CONCURRENCY)
+    for host in OLLAMA_HOSTS
+]
 
 # --------------------------------------------------
 # GEMINI (CLOUD LLM)
@@ -83,6 +123,81 @@ if os.getenv("GOOGLE_API_KEY"):
 else:
     print("⚠️ GOOGLE_API_KEY missing – web search disabled")
 
+# --------------------------------------------------
+# LLM POOL (OLLAMA HOSTS + GEMINI OVERFLOW)
+# --------------------------------------------------
+pool_backends = list(ollama_backends)
+if gemini_llm and os.getenv("GEMINI_OVERFLOW", "1") == "1":
+    pool_backends.append(LLMBackend(
+        "gemini",
+        gemini_llm,
+        max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+        overflow=True
+    ))
+
+llm_pool = LLMPool(pool_backends, max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")))
+
+LLM_BACKEND_IN_FLIGHT = metrics.REGISTRY.gauge(
+    "judicial_llm_backend_in_flight", "LLM calls in flight per backend", ("backend",))
+LLM_BACKEND_HEALTHY = metrics.REGISTRY.gauge(
+    "judicial_llm_backend_healthy", "1 if the LLM backend is healthy", ("backend",))
+
+llm = None
+if llm_pool.check_health([HumanMessage(content="ping")]):
+    llm = llm_pool
+    print(f"✅ LLM pool ready ({len(pool_backends)} backends)")
+else:
+    print("❌ Ollama not running on any host:", ", ".join(OLLAMA_HOSTS))
+
+# --------------------------------------------------
+# PER-AGENT MODEL ROUTING
+# --------------------------------------------------
+# Short extraction / summary agents can run on a small quantized model
+# (e.g. OLLAMA_SMALL_MODEL=llama3.2:3b) while precedent analysis and the
+# logic audit stay on llama3.1. Both models stay loaded (keep_alive).
+OLLAMA_SMALL_MODEL = os.getenv("OLLAMA_SMALL_MODEL", "")
+SMALL_MODEL_AGENTS = [
+    a.strip() for a in os.getenv("SMALL_MODEL_AGENTS", "law,web,summary").split(",") if a.strip()
+]
+
+agent_llms = {}
+if llm and OLLAMA_SMALL_MODEL:
+    small_pool = LLMPool([
+        LLMBackend(f"{host} [{OLLAMA_SMALL_MODEL}]", make_ollama(host, OLLAMA_SMALL_MODEL),
+                   max_concurrency=OLLAMA_MAX_CONCURRENCY)
+        for host in OLLAMA_HOSTS
+    ])
+    if small_pool.check_health([HumanMessage(content="ping")]):
+        agent_llms = {agent: small_pool for agent in SMALL_MODEL_AGENTS}
+        print(f"✅ Small model {OLLAMA_SMALL_MODEL} routed to: {', '.join(SMALL_MODEL_AGENTS)}")
+    else:
+        print(f"⚠️ Small model {OLLAMA_SMALL_MODEL} unavailable – all agents use llama3.1")
+
+# --------------------------------------------------
+# ADMISSION CONTROL (INTERACTIVE AHEAD OF BATCH)
+# --------------------------------------------------
+# One global limit on concurrent LLM calls across all requests and agents.
+# Defaults to the primary backends' combined capacity, so calls queue here
+# (by priority and client) rather than inside the pool.
+scheduler = LLMScheduler(
+    max_concurrency=int(os.getenv(
+        "LLM_MAX_CONCURRENCY", str(sum(b.max_concurrency for b in llm_pool.primary)))),
+    max_wait={
+        "interactive": float(os.getenv("MAX_QUEUE_WAIT_INTERACTIVE", "30")),
+        "batch": float(os.getenv("MAX_QUEUE_WAIT_BATCH", "300")),
+    },
+    # Slots batch work can never take (default: a quarter, at least one)
+    interactive_reserved=int(os.environ["LLM_INTERACTIVE_RESERVED"])
+    if os.getenv("LLM_INTERACTIVE_RESERVED") else None,
+    # Batch calls queued this long compete as interactive (0 = never)
+    promote_after=float(os.getenv("LLM_BATCH_PROMOTE_AFTER", "120")) or None,
+    # Call duration assumed for load shedding until real calls have been timed
+    expected_call_seconds=float(os.getenv("LLM_EXPECTED_CALL_S", "10"))
+)
+if llm:
+    llm = ScheduledLLM(llm, scheduler)
+    agent_llms = {agent: ScheduledLLM(agent_llm, scheduler) for agent, agent_llm in agent_llms.items()}
+
 # --------------------------------------------------
 # WEB SEARCH
 # --------------------------------------------------
@@ -94,17 +209,80 @@ search_tool = DuckDuckGoSearchResults(max_results=5)
 embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
 VECTOR_PATH = os.path.join(BASE_DIR, "../data/vector_store")
 
-vector_db = None
-if os.path.exists(VECTOR_PATH):
-    try:
-        vector_db = FAISS.load_local(
-            VECTOR_PATH,
-            embeddings,
-            allow_dangerous_deserialization=True
+# Full index (or shards from `build_vector_db.py --shards N`, served by
+# worker processes) + per-section partitions, together with the citation
+# index and statute titles, swappable at runtime via POST /admin/reload-index.
+# VECTOR_SHARDS=0 forces the single index; the parent_process() check stops
+# spawned shard workers from loading shards again.
+index_manager = IndexManager(
+    VECTOR_PATH,
+    embeddings,
+    use_shards=os.getenv("VECTOR_SHARDS", "1") == "1" and multiprocessing.parent_process() is None
+)
+snapshot = index_manager.load()
+if snapshot.vector_db is not None:
+    print(f"✅ Vector DB loaded ({snapshot.kind}, {snapshot.documents()} documents, "
+          f"{len(snapshot.partitioned_db.manifest) if snapshot.partitioned_db else 0} partitions)")
+print(f"✅ Citation index: {len(snapshot.citation_index)} cases, {len(snapshot.citation_index.sections)} sections")
+
+# INDEX_WATCH_INTERVAL=<seconds> reloads automatically after a rebuild
+if float(os.getenv("INDEX_WATCH_INTERVAL", "0")) > 0:
+    index_manager.watch(float(os.getenv("INDEX_WATCH_INTERVAL")))
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")   # unset: index reloads and /export are refused
+
+# UPLOAD_DEDUP=1: recent uploads by MinHash signature; a re-upload of the
+# same judgment (other reporter, re-scan) reuses the earlier analysis once
+# verified - same words, or the same cited statutes (upload_matches)
+upload_index = None
+upload_ids = itertools.count()
+if os.getenv("UPLOAD_DEDUP", "0") == "1":
+    upload_index = NearDuplicateIndex(
+        threshold=float(os.getenv("UPLOAD_DEDUP_THRESHOLD", "0.9")),
+        max_entries=int(os.getenv("UPLOAD_DEDUP_SIZE", "1024")),
+    )
+
+
+def upload_fingerprint(text: str) -> dict:
+    statutes = sorted({(ref.act, ref.section) for ref in index_manager.current.law_extractor.extract(text)})
+    return {"hash": content_hash(text), "statutes": statutes}
+
+
+def upload_matches(entry: dict, fingerprint: dict) -> bool:
+    """MinHash only estimates overlap - a changed section number or operative
+    sentence fits in the other 10%, so similar is not enough to reuse"""
+    if entry["hash"] == fingerprint["hash"]:
+        return True
+    return bool(fingerprint["statutes"]) and entry["statutes"] == fingerprint["statutes"]
+
+# --------------------------------------------------
+# SEMANTIC CACHES
+# --------------------------------------------------
+# Near-duplicate judgments (appeals, reprints) reuse retrieval results;
+# ANALYSIS_CACHE=1 also reuses whole analyses (stricter threshold).
+retrieval_cache = SemanticCache(
+    "retrieval",
+    max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "256")),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97")),
+    verify_rate=float(os.getenv("SEMANTIC_CACHE_VERIFY_RATE", "0.05")),
+)
+analysis_caches = {}
+if os.getenv("ANALYSIS_CACHE", "0") == "1":
+    analysis_caches = {
+        mode: SemanticCache(
+            f"analysis_{mode}",
+            max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "256")),
+            threshold=float(os.getenv("ANALYSIS_CACHE_THRESHOLD", "0.995")),
         )
-        print("✅ Vector DB loaded")
-    except Exception as e:
-        print("⚠️ Vector DB error:", e)
+        for mode in MultiAgentOrchestrator.MODES
+    }
+
+def drop_stale_cache_entries(snapshot):
+    # Lookups already ignore other versions; clearing frees the memory now
+    for cache in [retrieval_cache, *analysis_caches.values()]:
+        cache.clear()
+
+index_manager.on_swap(drop_stale_cache_entries)
 
 # --------------------------------------------------
 # DATA MODELS
@@ -154,7 +332,9 @@ def web_search(query: str):
             "sources": []
         }
 
-    raw_results = search_tool.run(query)
+    with metrics.stage("web_search"), tracing.span("search_tool.run", query=query) as span:
+        raw_results = search_tool.run(query)
+        span.set_attribute("search.result_chars", len(str(raw_results)))
     urls = extract_urls(str(raw_results))
 
     if not urls:
@@ -184,23 +364,80 @@ Sources:
 Provide a concise legal analysis (2 paragraphs).
 """
 
-    response = gemini_llm.invoke(prompt)
+    with metrics.stage("gemini_synthesis"), tracing.span("llm.invoke", agent="Web Synthesis",
+                                                         **{"llm.model": "gemini-2.5-flash"}) as span:
+        response = gemini_llm.invoke(prompt)
+        usage = getattr(response, "usage_metadata", None) or {}
+        span.set_attributes({
+            "llm.prompt_tokens": usage.get("input_tokens", 0),
+            "llm.completion_tokens": usage.get("output_tokens", 0),
+        })
 
     return {
         "answer": response.content.strip(),
         "sources": sources
     }
 
+# --------------------------------------------------
+# DATABASE (HISTORY + AGENT CHECKPOINTS)
+# --------------------------------------------------
+try:
+    Base.metadata.create_all(bind=engine)
+    db_ready = True
+except Exception as e:
+    print("⚠️ Database unavailable (no history / checkpoints):", e)
+    db_ready = False
+
+SAVE_HISTORY = db_ready and os.getenv("ANALYSIS_HISTORY", "1") == "1"
+
 # --------------------------------------------------
 # MULTI-AGENT SYSTEM
 # --------------------------------------------------
+# Deadlines: an agent that runs past its timeout (or finds the run's budget
+# spent) is replaced by a degraded result instead of failing the request.
+# AGENT_TIMEOUTS overrides per agent, e.g. "web=45,precedent=240".
+AGENT_TIMEOUT = float(os.getenv("AGENT_TIMEOUT", "180"))
+AGENT_TIMEOUTS = {
+    key.strip(): float(value)
+    for key, _, value in (item.partition("=") for item in os.getenv("AGENT_TIMEOUTS", "").split(",") if item.strip())
+}
+ANALYSIS_BUDGET = float(os.getenv("ANALYSIS_BUDGET", "600"))
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))   # seconds; 0 = no hedged calls
+
+# Per-agent checkpoints: a retry (or a run with one changed prompt) resumes
+# from the last agent whose inputs are unchanged
+checkpoint_store = None
+if db_ready and os.getenv("AGENT_CHECKPOINTS", "1") == "1":
+    try:
+        checkpoint_store = CheckpointStore(SessionLocal)
+        if float(os.getenv("CHECKPOINT_TTL_DAYS", "7")) > 0:
+            checkpoint_store.prune(float(os.getenv("CHECKPOINT_TTL_DAYS", "7")))
+    except Exception as e:
+        print("⚠️ Agent checkpoints disabled:", e)
+        checkpoint_store = None
+
 multi_agent = None
 if llm:
     try:
         multi_agent = MultiAgentOrchestrator(
             llm=llm,
-            web_search_function=web_search   # ✅ WORKING
+            web_search_function=web_search,   # ✅ WORKING
+            law_extractor=index_manager.current.law_extractor,
+            agent_llms=agent_llms,
+            agent_timeouts=AGENT_TIMEOUTS,
+            default_timeout=AGENT_TIMEOUT or None,
+            budget=ANALYSIS_BUDGET or None,
+            # Hedged calls skip the prompt's sticky backend, which is still
+            # busy with the original - needs two backends
+            hedge_llm=ScheduledLLM(HedgeRoute(llm_pool), scheduler)
+            if LLM_HEDGE_AFTER > 0 and len(pool_backends) > 1 else None,
+            hedge_after=LLM_HEDGE_AFTER if LLM_HEDGE_AFTER > 0 else None,
+            checkpoints=checkpoint_store,
+            citation_index=index_manager.current.citation_index
         )
+        # Reloads swap the section → precedent index and statute titles too
+        index_manager.on_swap(lambda snapshot: multi_agent.use_lookups(snapshot.law_extractor,
+                                                                       snapshot.citation_index))
         print("✅ Multi-Agent initialized (with Web Search)")
     except Exception as e:
         print("❌ Multi-Agent failed:", e)
@@ -208,54 +445,380 @@ if llm:
 # --------------------------------------------------
 # CORE ANALYSIS
 # --------------------------------------------------
-def run_analysis(text: str):
-    context = ""
-    if vector_db:
-        docs = vector_db.similarity_search(text, k=3)
+FETCH_FACTOR = 3   # over-fetch so near-duplicate copies can be dropped
+
+def search_index(snapshot, sections, vector, k: int = 3):
+    """
+    Precedents from the partitions of the IPC sections cited in the
+    judgment, topped up from the full index when the partitions hold fewer
+    than k. Near-duplicate copies of the same case are skipped
+    (dedup.diversify).
+    """
+    docs = []
+    partitions = []
+    partitioned_db, vector_db = snapshot.partitioned_db, snapshot.vector_db
+    if partitioned_db:
+        partitions = partitioned_db.precedent_partitions(sections)
+
+    if partitions:
+        with tracing.span("vector_db.partition_search", k=k, partitions=",".join(partitions),
+                          **{"vector_db.scanned": partitioned_db.documents_in(partitions)}) as span:
+            hits = partitioned_db.search_by_vector(vector, partitions, k=k * FETCH_FACTOR)
+            docs = diversify([doc for doc, _ in hits], k)
+            span.set_attribute("vector_db.results", len(docs))
+
+    if len(docs) < k and vector_db:
+        with tracing.span("vector_db.similarity_search", k=k) as span:
+            seen = {d.page_content for d in docs}
+            candidates = vector_db.similarity_search_by_vector(vector, k=k * FETCH_FACTOR)
+            docs = diversify(docs + [d for d in candidates if d.page_content not in seen], k)
+            span.set_attribute("vector_db.results", len(docs))
+    return docs
+
+def retrieve_context(sections, vector, k: int = 3):
+    """
+    search_index() on the current index snapshot, behind the semantic cache
+    (sampled hits are re-checked). Returns (docs, index version).
+    """
+    # The embedding only covers the opening of the judgment; the sections
+    # (detected in the whole text) choose the partitions, so they scope the entry
+    scope = tuple(sorted(sections))
+    with metrics.stage("vector_search"), index_manager.acquire() as snapshot:
+        if snapshot.vector_db is None and snapshot.partitioned_db is None:
+            return [], snapshot.version
+
+        cached = retrieval_cache.lookup(vector, version=snapshot.version, scope=scope)
+        if cached is not None and not retrieval_cache.should_verify():
+            return cached, snapshot.version
+
+        docs = search_index(snapshot, sections, vector, k)
+        if cached is not None:
+            retrieval_cache.record_verification(same_documents(cached, docs))
+        retrieval_cache.store(vector, docs, version=snapshot.version, scope=scope)
+        return docs, snapshot.version
+
+def run_analysis(text: str, mode: str = "full"):
+    with tracing.span("run_analysis", mode=mode, **{"judgment.chars": len(text)}):
+        # Embed ONCE - reused by both caches and the FAISS search
+        with metrics.stage("embed_query"):
+            vector = embeddings.embed_query(text)
+        law_extractor = index_manager.current.law_extractor
+        refs = law_extractor.extract(text)
+
+        # Analyses depend on the retrieved context, so they are versioned too,
+        # and on every statute cited anywhere in the judgment
+        analysis_cache = analysis_caches.get(mode)
+        scope = tuple(sorted((ref.act, ref.section) for ref in refs))
+        if analysis_cache:
+            cached = analysis_cache.lookup(vector, version=index_manager.version, scope=scope)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        docs, index_version = retrieve_context(law_extractor.ipc_sections(refs), vector, k=3)
         context = "\n".join(d.page_content for d in docs)
 
-    if not multi_agent:
-        return {
-            "summary": "LLM not active",
-            "analysis": "",
-            "laws": ""
-        }
+        if not multi_agent:
+            return {
+                "summary": "LLM not active",
+                "analysis": "",
+                "laws": ""
+            }
+
+        with metrics.stage(f"multi_agent_{mode}"):
+            result = multi_agent.run(
+                judgment_text=text,
+                rag_context=context,
+                mode=mode
+            )
+        # A degraded result (agents cut short) is served once, never reused
+        if analysis_cache and not result.get("degraded_agents"):
+            analysis_cache.store(vector, result, version=index_version, scope=scope)
+        result["index_version"] = index_version
+        return result
 
-    return multi_agent.run(
-        judgment_text=text,
-        rag_context=context
-    )
+# --------------------------------------------------
+# ANALYSIS HISTORY
+# --------------------------------------------------
+# Public field name → column (only the selected columns are read)
+HISTORY_COLUMNS = {
+    "id": models.Analysis.id,
+    "judgment_id": models.Analysis.judgment_id,
+    "filename": models.Judgment.filename,
+    "upload_date": models.Judgment.upload_date,
+    "created_at": models.Analysis.created_at,
+    "summary": models.Analysis.summary,
+    "laws": models.Analysis.laws,
+    "analysis": models.Analysis.analysis_content,
+    "web_research": models.Analysis.web_research,
+    "web_sources": models.Analysis.web_sources,
+}
+HISTORY_LIST_FIELDS = ["id", "judgment_id", "filename", "upload_date", "created_at"]   # what the sidebar renders
+
+def save_analysis(filename: str, result: dict):
+    """Store a finished analysis; returns its id (None if saving failed)"""
+    db = SessionLocal()
+    try:
+        judgment = models.Judgment(filename=filename)
+        analysis = models.Analysis(
+            judgment=judgment,
+            summary=result.get("summary"),
+            laws=result.get("laws"),
+            analysis_content=result.get("analysis"),
+            web_research=result.get("web_research"),
+            web_sources=json.dumps(result.get("web_sources", [])),
+        )
+        db.add(analysis)
+        db.commit()
+        return analysis.id
+    except Exception as e:
+        db.rollback()
+        print("⚠️ Could not save analysis:", e)
+        return None
+    finally:
+        db.close()
+
+def history_row(row, fields) -> dict:
+    record = dict(zip(fields, row))
+    for name in ("upload_date", "created_at"):
+        if record.get(name) is not None:
+            record[name] = record[name].isoformat()
+    if record.get("web_sources") is not None:
+        record["web_sources"] = json.loads(record["web_sources"])
+    return record
+
+def require_admin(token: str):
+    """Admin routes stay closed until ADMIN_TOKEN is configured"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def select_history_fields(fields, default):
+    try:
+        return parse_fields(fields, HISTORY_COLUMNS, default)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # --------------------------------------------------
 # API ENDPOINTS
 # --------------------------------------------------
 @app.post("/analyze")
-async def analyze_pdf(file: UploadFile = File(...)):
+async def analyze_pdf(
+    request: Request,
+    file: UploadFile = File(...),
+    mode: Literal["full", "fast"] = "full",   # fast = single JSON generation
+    debug: bool = False,                      # include per-stage timings
+    priority: Literal["interactive", "batch"] = "interactive",
+    x_client_id: str = Header(default="")     # fairness key (defaults to client IP)
+):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
-    data = await file.read()
-    text = extract_text_from_pdf(data)
-    result = run_analysis(text)
-
-    return {
+    client = x_client_id or (request.client.host if request.client else "anonymous")
+    try:
+        admission = scheduler.admit(priority, calls=1 if mode == "fast" else None)
+    except Overloaded as e:
+        metrics.REQUESTS_TOTAL.inc(mode=mode, status="shed")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    timings = metrics.start_request_timing()
+    status = "error"
+    with admission, metrics.IN_FLIGHT.track():
+        try:
+            data = await file.read()
+            with metrics.stage("pdf_extract"):
+                text = extract_text_from_pdf(data)
+
+            duplicate = None
+            if upload_index is not None:
+                with metrics.stage("dedup"):
+                    sig = signature(text)
+                    fingerprint = upload_fingerprint(text)
+                    duplicate = upload_index.find(sig)
+                    if duplicate and not upload_matches(duplicate[1], fingerprint):
+                        duplicate = None
+            # Reusable only if analysed against the index that is live now
+            previous = duplicate[1]["results"].get(mode) if duplicate else None
+            reusable = (bool(previous) and previous.get("index_version") == index_manager.version
+                        and not previous.get("degraded_agents"))
+            if upload_index is not None:
+                metrics.cache_result("upload_dedup", reusable)
+
+            if reusable:
+                result = {**previous, "cached": True}
+            else:
+                # Agents block for minutes - keep the event loop free for other requests
+                with metrics.stage("total"), scheduler.context(priority, client):
+                    result = await run_in_threadpool(run_analysis, text, mode)
+                if duplicate:
+                    duplicate[1]["results"][mode] = result
+                elif upload_index is not None:
+                    upload_index.add(next(upload_ids), sig,
+                                     {"filename": file.filename, **fingerprint, "results": {mode: result}})
+            status = "ok"
+        finally:
+            metrics.REQUESTS_TOTAL.inc(mode=mode, status=status)
+
+    response = {
         "filename": file.filename,
+        "mode": result.get("mode", mode),
         "summary": result.get("summary"),
         "laws": result.get("laws"),
         "analysis": result.get("analysis"),
-        "web_sources": result.get("web_sources", [])
+        "web_sources": result.get("web_sources", []),
+        "precedent_candidates": result.get("precedent_candidates", []),
+        "related_precedents": result.get("related_precedents", []),
+        "agent_stats": result.get("agent_stats", []),
+        "degraded_agents": result.get("degraded_agents", []),
+        "resumed_agents": result.get("resumed_agents", []),
+        "cached": result.get("cached", False)
     }
+    if reusable:
+        response["duplicate_of"] = {"filename": duplicate[1]["filename"], "similarity": round(duplicate[2], 3)}
+    if SAVE_HISTORY:
+        response["id"] = await run_in_threadpool(save_analysis, file.filename, result)
+    if debug:
+        response["timings"] = timings
+    return response
+
+@app.get("/history")
+def history(request: Request, limit: int = 50, offset: int = 0, fields: str = ""):
+    """Saved analyses, newest first; ?fields=summary,laws picks the returned fields"""
+    if not db_ready:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    selected = select_history_fields(fields, HISTORY_LIST_FIELDS)
+    limit = max(1, min(limit, 500))
+
+    db = SessionLocal()
+    try:
+        # Rows are never modified, so count + newest id identify the list
+        count, newest_id, newest = db.query(
+            func.count(models.Analysis.id), func.max(models.Analysis.id), func.max(models.Analysis.created_at)
+        ).one()
+        etag = weak_etag("history", count, newest_id, limit, offset, ",".join(selected))
+        headers = cache_headers(etag, newest, REVALIDATE)
+        if not_modified(request.headers, etag, newest):
+            return Response(status_code=304, headers=headers)
+
+        rows = (db.query(*(HISTORY_COLUMNS[f] for f in selected))
+                .select_from(models.Analysis)
+                .join(models.Judgment, models.Analysis.judgment_id == models.Judgment.id)
+                .order_by(models.Analysis.id.desc())
+                .offset(max(0, offset)).limit(limit).all())
+    finally:
+        db.close()
+    return JSONResponse([history_row(row, selected) for row in rows], headers=headers)
+
+@app.get("/history/{analysis_id}")
+def history_item(analysis_id: int, request: Request, fields: str = ""):
+    """One saved analysis (immutable: cached by the client for a year)"""
+    if not db_ready:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    selected = select_history_fields(fields, list(HISTORY_COLUMNS))
+
+    db = SessionLocal()
+    try:
+        created = db.query(models.Analysis.created_at).filter(models.Analysis.id == analysis_id).scalar()
+        if created is None:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        etag = weak_etag("analysis", analysis_id, created.isoformat(), ",".join(selected))
+        headers = cache_headers(etag, created, IMMUTABLE)
+        # Answered before any of the large text columns are read
+        if not_modified(request.headers, etag, created):
+            return Response(status_code=304, headers=headers)
+
+        row = (db.query(*(HISTORY_COLUMNS[f] for f in selected))
+               .select_from(models.Analysis)
+               .join(models.Judgment, models.Analysis.judgment_id == models.Judgment.id)
+               .filter(models.Analysis.id == analysis_id).one())
+    finally:
+        db.close()
+    return JSONResponse(history_row(row, selected), headers=headers)
+
+@app.get("/export")
+def export(
+    format: Literal["jsonl", "parquet"] = "jsonl",
+    since: str = "",                        # YYYY-MM-DD (inclusive)
+    until: str = "",
+    sections: str = "",                     # e.g. "302,304A"
+    x_admin_token: str = Header(default="")
+):
+    """All stored analyses as a stream (constant memory - see export_analyses.py)"""
+    require_admin(x_admin_token)
+    if not db_ready:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    if format == "parquet" and export_analyses.pa is None:
+        raise HTTPException(status_code=501, detail="Parquet export needs pyarrow on the server")
+    try:
+        window = export_analyses.parse_date(since), export_analyses.parse_date(until, end=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Bad date: {e}")
+
+    stream = export_analyses.stream_export(
+        format, *window, [s.strip() for s in sections.split(",") if s.strip()] or None)
+    headers = {"Content-Disposition": f'attachment; filename="analyses.{format}"'}
+    if format == "parquet":
+        headers["Content-Encoding"] = "identity"   # compressed already: the middlewares leave it alone
+    return StreamingResponse(stream, media_type=export_analyses.MEDIA_TYPES[format], headers=headers)
 
 @app.post("/web-search")
 def manual_web_search(query: WebQuery):
     return web_search(query.query)
 
+@app.get("/metrics")
+def prometheus_metrics():
+    for backend in llm_pool.stats():
+        LLM_BACKEND_IN_FLIGHT.set(backend["in_flight"], backend=backend["name"])
+        LLM_BACKEND_HEALTHY.set(int(backend["healthy"]), backend=backend["name"])
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/llm/stats")
+def llm_stats():
+    return {
+        "backends": llm_pool.stats(),
+        "affinity": llm_pool.affinity_stats(),
+        "scheduler": scheduler.stats(),
+        "agents": multi_agent.routing_report() if multi_agent else []
+    }
+
+@app.post("/admin/reload-index", status_code=202)
+def reload_index(response: Response, shard: Optional[int] = None, x_admin_token: str = Header(default="")):
+    """
+    Load the rebuilt index in the background and swap it in when ready;
+    ?shard=i reloads just that shard (after build_vector_db.py --only-shard i)
+    """
+    require_admin(x_admin_token)
+    if shard is not None:
+        try:
+            size = index_manager.reload_shard(shard)
+        except IndexError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        response.status_code = 200
+        return {"shard": shard, "documents": size, "version": index_manager.version}
+    started = index_manager.reload()
+    return {"started": started, "reloading": True, "version": index_manager.version}
+
+@app.get("/admin/index")
+def index_info():
+    return index_manager.info()
+
+@app.get("/cache/stats")
+def cache_stats():
+    caches = [retrieval_cache, *analysis_caches.values()]
+    stats = {cache.name: cache.stats() for cache in caches}
+    if checkpoint_store:
+        stats["agent_checkpoints"] = checkpoint_store.stats()
+    return stats
+
 @app.get("/health")
 def health():
     return {
         "status": "online",
         "ollama": bool(llm),
-        "vector_db": bool(vector_db),
+        "llm_backends_healthy": sum(1 for b in llm_pool.stats() if b["healthy"]),
+        "vector_db": index_manager.current.vector_db is not None,
         "multi_agent": bool(multi_agent),
         "web_search": bool(gemini_llm)
     }
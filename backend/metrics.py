@@ -0,0 +1,242 @@
+"""
+METRICS & STAGE TIMING
+======================
+
+Minimal Prometheus-compatible metrics registry (text exposition format,
+served at /metrics) plus per-request stage timing.
+
+• Counter / Gauge / Histogram with labels, thread-safe, no extra dependency
+• ``stage("name")`` times a pipeline stage into ``judicial_stage_seconds``
+  AND into the current request's timing list (returned with ?debug=true)
+"""
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Seconds - covers PDF parsing (ms) up to full multi-agent runs (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> List[str]:
+        return [f"{self.name}{_label_str(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track(self, **labels):
+        """Count in-progress work for the duration of a block"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_value(self, key, state) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            labels = _label_str(self.labelnames, key, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _label_str(self.labelnames, key, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{labels} {state['count']}")
+        plain = _label_str(self.labelnames, key)
+        lines.append(f"{self.name}_sum{plain} {state['sum']}")
+        lines.append(f"{self.name}_count{plain} {state['count']}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders the /metrics payload"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- PIPELINE METRICS ---
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "judicial_stage_seconds", "Time spent in each pipeline stage", ("stage",))
+AGENT_SECONDS = REGISTRY.histogram(
+    "judicial_agent_seconds", "Time spent in each agent LLM call", ("agent", "model"))
+LLM_TOKENS = REGISTRY.histogram(
+    "judicial_llm_tokens", "Tokens per agent LLM call", ("agent", "direction"), TOKEN_BUCKETS)
+LLM_TOKENS_TOTAL = REGISTRY.counter(
+    "judicial_llm_tokens_total", "Total tokens processed by agent LLM calls", ("agent", "direction"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "judicial_cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+CACHE_FALSE_HITS = REGISTRY.counter(
+    "judicial_cache_false_hits_total", "Sampled cache hits whose recomputed result differed", ("cache",))
+REQUESTS_TOTAL = REGISTRY.counter(
+    "judicial_requests_total", "Analysis requests by mode and outcome", ("mode", "status"))
+IN_FLIGHT = REGISTRY.gauge(
+    "judicial_requests_in_flight", "Analysis requests currently being processed")
+QUEUE_DEPTH = REGISTRY.gauge(
+    "judicial_queue_depth", "Requests waiting for an LLM slot", ("priority",))
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "judicial_queue_wait_seconds", "Time an LLM call waited for a scheduler slot", ("priority",))
+SCHEDULER_SHED = REGISTRY.counter(
+    "judicial_scheduler_shed_total", "Requests rejected with 429 by admission control", ("priority",))
+SCHEDULER_ABANDONED = REGISTRY.counter(
+    "judicial_scheduler_abandoned_total", "LLM calls that gave up waiting for a slot", ("priority", "reason"))
+AGENT_DEGRADED = REGISTRY.counter(
+    "judicial_agent_degraded_total", "Agents replaced by their fallback output", ("agent", "reason"))
+LLM_AFFINITY = REGISTRY.counter(
+    "judicial_llm_affinity_total", "Pool routing of prompts by shared prefix (hit: sent to the backend "
+    "that already served the prefix)", ("result",))
+HEDGED_CALLS = REGISTRY.counter(
+    "judicial_hedged_calls_total", "LLM calls duplicated to the hedge backend, by which call answered",
+    ("agent", "winner"))
+
+# --- PER-REQUEST TIMING ---
+
+_request_timings: contextvars.ContextVar[Optional[List[dict]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timing() -> List[dict]:
+    """Begin collecting stage timings for the current request (context-local)"""
+    timings: List[dict] = []
+    _request_timings.set(timings)
+    return timings
+
+
+def record_timing(name: str, seconds: float, **extra) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append({"stage": name, "ms": round(seconds * 1000, 2), **extra})
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the histogram and the request's timing list"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        record_timing(name, elapsed)
+
+
+def observe_llm_call(call: dict) -> None:
+    """Feed one agent LLM call record (see agents.llm_call_stats) into the metrics"""
+    agent = call.get("agent", "unknown")
+    AGENT_SECONDS.observe(call.get("latency_ms", 0) / 1000, agent=agent, model=call.get("model", ""))
+    for direction, field in (("prompt", "prompt_tokens"), ("completion", "completion_tokens")):
+        tokens = call.get(field) or 0
+        LLM_TOKENS.observe(tokens, agent=agent, direction=direction)
+        LLM_TOKENS_TOTAL.inc(tokens, agent=agent, direction=direction)
+    record_timing(f"agent:{agent}", call.get("latency_ms", 0) / 1000, model=call.get("model", ""))
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
@@ -2,7 +2,11 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 import datetime
-from .database import Base
+
+try:
+    from .database import Base
+except ImportError:   # backend/ run as the top-level directory (uvicorn main:app)
+    from database import Base
 
 class Judgment(Base):
     __tablename__ = "judgments"
@@ -27,3 +31,13 @@ class Analysis(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     judgment = relationship("Judgment", back_populates="analyses")
+
+class AgentCheckpoint(Base):
+    """AgentState after one agent, keyed by the fingerprint of everything that produced it"""
+    __tablename__ = "agent_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(64), unique=True, index=True)
+    agent = Column(String)          # agent key ("law", "web", ...)
+    state = Column(Text)            # JSON of the agent output fields
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
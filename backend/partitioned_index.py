@@ -0,0 +1,139 @@
+"""
+PARTITIONED VECTOR INDEX
+========================
+
+Per-partition FAISS sub-indexes so a query like "top 3 precedents for
+Section 302" only scans the documents that can match instead of the whole
+corpus:
+
+  statute              all statute (IPC section) documents
+  precedent:<section>  precedents whose charge cites that IPC section
+  precedent:_none      precedents without a recognised section
+
+A precedent citing several sections is stored in each of their partitions;
+results are merged by distance and de-duplicated. Partitions are loaded
+lazily, so memory only holds the partitions that are actually queried.
+
+Layout on disk (next to the main index):
+  vector_store/partitions/manifest.json
+  vector_store/partitions/<partition>/index.faiss + index.pkl
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+MANIFEST = "manifest.json"
+NO_SECTION = "_none"
+
+
+def partition_keys(doc: Document) -> List[str]:
+    """Partitions a document belongs to"""
+    meta = doc.metadata
+    if meta.get("doc_type") == "statute":
+        return ["statute"]
+    sections = meta.get("sections") or []
+    if not sections:
+        return [f"precedent:{NO_SECTION}"]
+    return [f"precedent:{s.upper()}" for s in sections]
+
+
+def _dirname(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", key)
+
+
+def _doc_id(doc: Document) -> Tuple:
+    meta = doc.metadata
+    return (meta.get("doc_type"), meta.get("case_no") or meta.get("section") or doc.page_content[:80])
+
+
+def build_partitions(docs: List[Document], embeddings, path: str) -> Dict[str, dict]:
+    """Embed every document ONCE and write one FAISS index per partition"""
+    vectors = embeddings.embed_documents([d.page_content for d in docs])
+
+    groups = defaultdict(list)
+    for doc, vector in zip(docs, vectors):
+        for key in partition_keys(doc):
+            groups[key].append((doc, vector))
+
+    os.makedirs(path, exist_ok=True)
+    manifest = {}
+    for key, members in sorted(groups.items()):
+        store = FAISS.from_embeddings(
+            [(doc.page_content, vector) for doc, vector in members],
+            embeddings,
+            metadatas=[doc.metadata for doc, _ in members],
+        )
+        store.save_local(os.path.join(path, _dirname(key)))
+        manifest[key] = {"dir": _dirname(key), "count": len(members)}
+
+    with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class PartitionedIndex:
+    """Lazily loaded set of partition indexes sharing one embedding model"""
+
+    def __init__(self, path: str, embeddings, manifest: Dict[str, dict]):
+        self.path = path
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self._stores: Dict[str, FAISS] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, embeddings) -> Optional["PartitionedIndex"]:
+        manifest_path = os.path.join(path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            return cls(path, embeddings, json.load(f))
+
+    def _store(self, key: str) -> Optional[FAISS]:
+        if key not in self.manifest:
+            return None
+        with self._lock:
+            if key not in self._stores:
+                self._stores[key] = FAISS.load_local(
+                    os.path.join(self.path, self.manifest[key]["dir"]),
+                    self.embeddings,
+                    allow_dangerous_deserialization=True,
+                )
+            return self._stores[key]
+
+    def precedent_partitions(self, sections: List[str]) -> List[str]:
+        keys = [f"precedent:{s.upper()}" for s in sections]
+        return [k for k in dict.fromkeys(keys) if k in self.manifest]
+
+    def documents_in(self, partitions: List[str]) -> int:
+        return sum(self.manifest[p]["count"] for p in partitions if p in self.manifest)
+
+    def search_by_vector(self, vector: List[float], partitions: List[str], k: int = 3) -> List[Tuple[Document, float]]:
+        """Scatter over the given partitions, merge by distance, drop duplicates"""
+        hits = []
+        for key in partitions:
+            store = self._store(key)
+            if store is not None:
+                hits.extend(store.similarity_search_with_score_by_vector(vector, k=k))
+
+        hits.sort(key=lambda hit: hit[1])   # L2 distance: lower is closer
+        seen, merged = set(), []
+        for doc, score in hits:
+            doc_id = _doc_id(doc)
+            if doc_id not in seen:
+                seen.add(doc_id)
+                merged.append((doc, score))
+            if len(merged) == k:
+                break
+        return merged
+
+    def search(self, query: str, partitions: List[str], k: int = 3) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+        return [doc for doc, _ in self.search_by_vector(vector, partitions, k)]
@@ -0,0 +1,305 @@
+"""
+RAG RETRIEVAL EVALUATION
+========================
+
+Builds labelled query sets from data/precedents.txt and data/laws.txt and
+sweeps chunking / index parameters, reporting side by side:
+
+• recall@1/3/5 and MRR@10
+• number of chunks, index size, embedding + index build time
+• query latency (embedding and FAISS search separately)
+
+Strategies: RecursiveCharacterTextSplitter for every chunk size / overlap,
+plus "structured" (one document per Section / CASE, see legal_corpus.py).
+
+Query sets:
+  case     - a field of each precedent (Facts by default)  → that CASE
+  statute  - the title of each IPC section                 → that Section
+
+A retrieved chunk counts as relevant when it overlaps the expected case or
+section by at least half of the shorter of the two (or 200 characters).
+
+Usage:
+    python rag_eval.py                                   # default sweep
+    python rag_eval.py --chunk-sizes 500 1000 --overlaps 0 100 --indexes flat hnsw
+    python rag_eval.py --fake-embeddings --output rag_eval.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BASE_DIR)
+DATA_FOLDER = os.path.join(PROJECT_ROOT, "data")
+LAWS_FILE = os.path.join(DATA_FOLDER, "laws.txt")
+PRECEDENTS_FILE = os.path.join(DATA_FOLDER, "precedents.txt")
+sys.path.append(BASE_DIR)
+
+from legal_corpus import parse_laws, parse_precedents
+
+KS = (1, 3, 5)
+MRR_DEPTH = 10
+
+
+# --------------------------------------------------
+# LABELLED SPANS + QUERIES
+# --------------------------------------------------
+def load_case_spans(text: str) -> List[dict]:
+    """CASE blocks with character offsets and their "Field: value" lines"""
+    return [{
+        "id": f"case:{doc.metadata['case_no']}",
+        "source": "precedents",
+        "start": doc.metadata["start_index"],
+        "end": doc.metadata["end_index"],
+        "title": doc.metadata["title"],
+        "fields": dict(re.findall(r"^([A-Z][A-Za-z ]+): (.+)$", doc.page_content, re.MULTILINE)),
+    } for doc in parse_precedents(text)]
+
+
+def load_section_spans(text: str) -> List[dict]:
+    return [{
+        "id": f"section:{doc.metadata['section']}",
+        "source": "laws",
+        "start": doc.metadata["start_index"],
+        "end": doc.metadata["end_index"],
+        "title": doc.metadata["title"],
+    } for doc in parse_laws(text)]
+
+
+def build_queries(cases: List[dict], sections: List[dict], case_field: str) -> Dict[str, List[dict]]:
+    case_queries = [
+        {"query": c["fields"][case_field], "expected": c["id"]}
+        for c in cases if c["fields"].get(case_field)
+    ]
+    statute_queries = [{"query": s["title"], "expected": s["id"]} for s in sections]
+    return {"case": case_queries, "statute": statute_queries}
+
+
+# --------------------------------------------------
+# CHUNKING + RELEVANCE
+# --------------------------------------------------
+def chunk_corpus(texts: Dict[str, str], chunk_size: int, overlap: int) -> List[dict]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+        separators=["\n\n", "\n", " ", ""],
+        add_start_index=True,
+    )
+    chunks = []
+    for source, text in texts.items():
+        for doc in splitter.create_documents([text], metadatas=[{"source": source}]):
+            start = doc.metadata["start_index"]
+            chunks.append({"source": source, "start": start, "end": start + len(doc.page_content),
+                           "text": doc.page_content})
+    return chunks
+
+
+def structured_chunks(texts: Dict[str, str]) -> List[dict]:
+    """One chunk per Section / CASE (legal_corpus parser)"""
+    chunks = []
+    for source, parser in (("laws", parse_laws), ("precedents", parse_precedents)):
+        for doc in parser(texts[source]):
+            chunks.append({"source": source, "start": doc.metadata["start_index"],
+                           "end": doc.metadata["end_index"], "text": doc.page_content})
+    return chunks
+
+
+def label_chunks(chunks: List[dict], spans: List[dict]) -> List[set]:
+    """Span ids each chunk substantially overlaps"""
+    labels = []
+    for chunk in chunks:
+        ids = set()
+        for span in spans:
+            if span["source"] != chunk["source"]:
+                continue
+            overlap = min(chunk["end"], span["end"]) - max(chunk["start"], span["start"])
+            needed = min(200, (chunk["end"] - chunk["start"]) // 2, (span["end"] - span["start"]) // 2)
+            if overlap > 0 and overlap >= needed:
+                ids.add(span["id"])
+        labels.append(ids)
+    return labels
+
+
+# --------------------------------------------------
+# INDEXES
+# --------------------------------------------------
+def build_index(kind: str, vectors: np.ndarray):
+    import faiss
+
+    dim = vectors.shape[1]
+    if kind == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, 32)
+    elif kind == "ivf":
+        nlist = max(1, int(np.sqrt(len(vectors))))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+        index.train(vectors)
+        index.nprobe = max(1, nlist // 4)
+    elif kind == "pq":
+        m = 8 if dim % 8 == 0 else 1
+        nbits = 8 if len(vectors) >= 256 * 4 else 4
+        index = faiss.IndexPQ(dim, m, nbits)
+        index.train(vectors)
+    else:
+        raise ValueError(f"Unknown index type: {kind}")
+    index.add(vectors)
+    return index
+
+
+def index_bytes(index) -> int:
+    import faiss
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def evaluate(index, query_vectors: np.ndarray, queries: List[dict], labels: List[set]) -> dict:
+    depth = max(max(KS), MRR_DEPTH)
+    start = time.perf_counter()
+    _, ids = index.search(query_vectors, depth)
+    search_ms = (time.perf_counter() - start) * 1000 / max(1, len(queries))
+
+    hits = {k: 0 for k in KS}
+    reciprocal = 0.0
+    for query, row in zip(queries, ids):
+        rank = next(
+            (r for r, chunk_id in enumerate(row) if chunk_id >= 0 and query["expected"] in labels[chunk_id]),
+            None,
+        )
+        if rank is None:
+            continue
+        for k in KS:
+            hits[k] += rank < k
+        if rank < MRR_DEPTH:
+            reciprocal += 1.0 / (rank + 1)
+
+    n = max(1, len(queries))
+    return {
+        **{f"recall@{k}": round(hits[k] / n, 4) for k in KS},
+        f"mrr@{MRR_DEPTH}": round(reciprocal / n, 4),
+        "search_ms_per_query": round(search_ms, 4),
+    }
+
+
+def get_embeddings(fake: bool):
+    if fake:
+        from benchmark import FakeEmbeddings
+        return FakeEmbeddings()
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+
+
+# --------------------------------------------------
+# SWEEP
+# --------------------------------------------------
+def run_sweep(args) -> dict:
+    texts = {}
+    for source, path in (("laws", LAWS_FILE), ("precedents", PRECEDENTS_FILE)):
+        with open(path, encoding="utf-8") as f:
+            texts[source] = f.read()
+
+    cases = load_case_spans(texts["precedents"])
+    sections = load_section_spans(texts["laws"])
+    spans = cases + sections
+    query_sets = build_queries(cases, sections, args.case_field)
+    embeddings = get_embeddings(args.fake_embeddings)
+
+    print(f"📋 {len(query_sets['case'])} case queries, {len(query_sets['statute'])} statute queries")
+
+    start = time.perf_counter()
+    query_vectors = {
+        name: np.asarray(embeddings.embed_documents([q["query"] for q in qs]), dtype="float32")
+        for name, qs in query_sets.items()
+    }
+    total_queries = sum(len(qs) for qs in query_sets.values())
+    query_embed_ms = (time.perf_counter() - start) * 1000 / max(1, total_queries)
+
+    strategies = [
+        (chunk_size, overlap, lambda s=chunk_size, o=overlap: chunk_corpus(texts, s, o))
+        for chunk_size in args.chunk_sizes
+        for overlap in args.overlaps
+        if overlap < chunk_size
+    ]
+    if not args.no_structured:
+        strategies.append(("structured", 0, lambda: structured_chunks(texts)))
+
+    rows = []
+    for chunk_size, overlap, make_chunks in strategies:
+        chunks = make_chunks()
+        labels = label_chunks(chunks, spans)
+
+        start = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents([c["text"] for c in chunks]), dtype="float32")
+        embed_s = time.perf_counter() - start
+
+        for kind in args.indexes:
+            start = time.perf_counter()
+            index = build_index(kind, vectors)
+            build_s = time.perf_counter() - start
+
+            row = {
+                "chunk_size": chunk_size,
+                "overlap": overlap,
+                "index": kind,
+                "chunks": len(chunks),
+                "avg_chunk_chars": round(sum(len(c["text"]) for c in chunks) / len(chunks), 1),
+                "index_bytes": index_bytes(index),
+                "embed_s": round(embed_s, 3),
+                "build_s": round(build_s, 4),
+                "query_embed_ms": round(query_embed_ms, 3),
+            }
+            for name, qs in query_sets.items():
+                for metric, value in evaluate(index, query_vectors[name], qs, labels).items():
+                    row[f"{name}_{metric}"] = value
+            rows.append(row)
+            print(f"   size={chunk_size:<10} overlap={overlap:<4} {kind:<5} chunks={len(chunks):<5} "
+                  f"case R@3={row['case_recall@3']:.2f} MRR={row[f'case_mrr@{MRR_DEPTH}']:.2f}  "
+                  f"statute R@3={row['statute_recall@3']:.2f}  "
+                  f"search={row['case_search_ms_per_query']:.3f} ms")
+
+    return {"config": vars(args), "results": rows}
+
+
+def print_table(rows: List[dict]):
+    columns = ["chunk_size", "overlap", "index", "chunks", "index_bytes", "build_s",
+               "case_recall@1", "case_recall@3", f"case_mrr@{MRR_DEPTH}",
+               "statute_recall@3", f"statute_mrr@{MRR_DEPTH}", "case_search_ms_per_query"]
+    print("\n" + " | ".join(columns))
+    for row in rows:
+        print(" | ".join(str(row.get(c, "")) for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep chunking / index settings for the RAG layer")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100, 200])
+    parser.add_argument("--indexes", nargs="+", default=["flat", "hnsw", "ivf"],
+                        choices=["flat", "hnsw", "ivf", "pq"])
+    parser.add_argument("--case-field", default="Facts",
+                        help="precedent field used as the query (Facts, Key Issue, Legal Principle...)")
+    parser.add_argument("--no-structured", action="store_true",
+                        help="skip the one-document-per-Section/CASE strategy")
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="hash embeddings (pipeline check only - recall is not meaningful)")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("📐 RAG RETRIEVAL EVALUATION")
+    print("="*60 + "\n")
+
+    report = run_sweep(args)
+    print_table(report["results"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
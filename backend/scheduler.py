@@ -0,0 +1,307 @@
+"""
+LLM ADMISSION CONTROL + PRIORITY SCHEDULING
+===========================================
+
+Sits between the agents and the LLM pool so that a bulk job cannot flood
+the model servers ahead of interactive users:
+
+• Global limit on concurrent LLM calls (all agents, all requests)
+• Priority classes: every waiting "interactive" call is granted a slot
+  before any "batch" call, and batch calls may never hold the slots
+  reserved for interactive work (calls are not preemptible, so without
+  a reserve an interactive call still waits for a running batch call)
+• Per-client fairness inside a class: the waiting call whose client has
+  the fewest calls running goes next (then first come, first served)
+• Aging: a batch call queued longer than promote_after seconds competes
+  as interactive, so a steady interactive load cannot starve it
+• Bounded waits: slot(timeout=..., cancel=...) gives up with QueueTimeout
+  when the wait limit passes or the caller sets the cancel event
+• Load shedding: admit() estimates the queue wait for a NEW request and
+  raises Overloaded (→ HTTP 429 + Retry-After) above the class threshold,
+  instead of letting the request queue for minutes. Admitted requests
+  count until released, including while they are still extracting the PDF
+  or retrieving (not queued for a slot yet), so a burst cannot all be
+  admitted at once; before the first call completes the estimate uses
+  expected_call_seconds as the call duration
+
+Requests declare their class / client with ``scheduler.context(...)``; the
+values travel in a contextvar, so every agent's ``llm.invoke`` made for
+that request is scheduled accordingly (ScheduledLLM wraps the pool).
+Threads started by the request must run in a copied context
+(contextvars.copy_context) to keep them. ``call_limits(deadline, cancel)``
+works the same way for the caller's deadline: ScheduledLLM stops waiting
+for a slot once it passes or the cancel event is set, and never starts a
+call whose caller has already given up.
+"""
+
+import contextlib
+import contextvars
+import itertools
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+import metrics
+
+PRIORITIES = ("interactive", "batch")   # highest first
+
+_request_class: contextvars.ContextVar[tuple] = contextvars.ContextVar(
+    "llm_request_class", default=("interactive", "anonymous"))
+_call_limits: contextvars.ContextVar[tuple] = contextvars.ContextVar(
+    "llm_call_limits", default=(math.inf, None))
+
+
+@contextlib.contextmanager
+def call_limits(deadline: float = math.inf, cancel: Optional[threading.Event] = None):
+    """LLM calls made inside give up at `deadline` (time.monotonic()) or once `cancel` is set"""
+    token = _call_limits.set((deadline, cancel))
+    try:
+        yield
+    finally:
+        _call_limits.reset(token)
+
+
+def current_call_limits() -> Tuple[float, Optional[threading.Event]]:
+    return _call_limits.get()
+
+
+class Overloaded(RuntimeError):
+    """Estimated queue wait is above the admission threshold"""
+
+    def __init__(self, priority: str, estimated_wait: float):
+        self.priority = priority
+        self.estimated_wait = estimated_wait
+        self.retry_after = max(1, math.ceil(estimated_wait))
+        super().__init__(f"{priority} queue wait ~{estimated_wait:.0f}s - retry after {self.retry_after}s")
+
+
+class QueueTimeout(TimeoutError):
+    """Gave up waiting for a slot (wait limit passed, or the caller cancelled)"""
+
+    def __init__(self, priority: str, waited: float, reason: str = "timeout"):
+        self.priority = priority
+        self.waited = waited
+        self.reason = reason
+        super().__init__(f"{priority} call gave up after {waited:.1f}s in the queue ({reason})")
+
+
+class Admission:
+    """An admitted request: counted by estimated_wait() until released (or its block exits)"""
+
+    def __init__(self, scheduler: "LLMScheduler", rank: int):
+        self._scheduler = scheduler
+        self.rank = rank
+        self.released = False
+
+    def release(self):
+        with self._scheduler._cond:
+            if not self.released:
+                self.released = True
+                self._scheduler._admitted[self.rank] -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Waiter:
+    __slots__ = ("seq", "rank", "client", "granted", "queued")
+
+    def __init__(self, seq: int, rank: int, client: str):
+        self.seq = seq
+        self.rank = rank
+        self.client = client
+        self.granted = False
+        self.queued = time.monotonic()
+
+
+class LLMScheduler:
+    CANCEL_POLL = 0.05   # seconds between checks of a waiter's cancel event
+
+    def __init__(self, max_concurrency: int, max_wait: Optional[Dict[str, float]] = None,
+                 calls_per_request: int = 5, interactive_reserved: Optional[int] = None,
+                 promote_after: Optional[float] = None, expected_call_seconds: float = 0.0):
+        self.max_concurrency = max(1, max_concurrency)
+        if interactive_reserved is None:
+            interactive_reserved = max(1, self.max_concurrency // 4) if self.max_concurrency > 1 else 0
+        self.interactive_reserved = min(interactive_reserved, self.max_concurrency - 1)
+        self.max_wait = {"interactive": 30.0, "batch": 300.0, **(max_wait or {})}
+        self.calls_per_request = calls_per_request
+        self.promote_after = promote_after   # seconds before a queued batch call ranks as interactive
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._active_by_rank = [0] * len(PRIORITIES)
+        self._client_active: Dict[str, int] = {}
+        self._call_seconds = expected_call_seconds   # EWMA of slot hold time (prior until calls complete)
+        self._admitted = [0] * len(PRIORITIES)       # admitted requests not finished yet
+        self.granted = defaultdict(int)
+        self.shed = defaultdict(int)
+        self.abandoned = defaultdict(int)
+
+    # --- REQUEST SIDE ---
+
+    @contextlib.contextmanager
+    def context(self, priority: str = "interactive", client: str = "anonymous"):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r} (expected one of {PRIORITIES})")
+        token = _request_class.set((priority, client))
+        try:
+            yield
+        finally:
+            _request_class.reset(token)
+
+    def estimated_wait(self, priority: str, calls: Optional[int] = None) -> float:
+        """Seconds a new request of this class would spend queued for its LLM calls"""
+        rank = PRIORITIES.index(priority)
+        with self._cond:
+            return self._estimated_wait(rank, calls)
+
+    def _estimated_wait(self, rank: int, calls: Optional[int]) -> float:
+        queued = sum(1 for w in self._waiters if w.rank <= rank)
+        # Admitted requests make their calls one after another, so each
+        # wants one slot at a time: those beyond the slot count are ahead
+        # even before their first call is queued
+        admitted = sum(self._admitted[:rank + 1])
+        ahead = max(queued, admitted - self.max_concurrency)
+        busy = self._active >= self.max_concurrency or admitted >= self.max_concurrency
+        if not busy and not ahead:
+            return 0.0
+        # Every queued call ahead needs a slot; this request then makes
+        # `calls` sequential calls, each queueing behind the same load
+        return (ahead + 1) / self.max_concurrency * self._call_seconds * (calls or self.calls_per_request)
+
+    def admit(self, priority: str = "interactive", calls: Optional[int] = None) -> Admission:
+        """
+        Raise Overloaded instead of queueing when the wait is too long;
+        otherwise count the request as admitted until the returned
+        Admission is released
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r} (expected one of {PRIORITIES})")
+        rank = PRIORITIES.index(priority)
+        with self._cond:
+            wait = self._estimated_wait(rank, calls)
+            if wait <= self.max_wait[priority]:
+                self._admitted[rank] += 1
+                return Admission(self, rank)
+            self.shed[priority] += 1
+        metrics.SCHEDULER_SHED.inc(priority=priority)
+        raise Overloaded(priority, wait)
+
+    # --- CALL SIDE ---
+
+    def _eligible(self, waiter: _Waiter) -> bool:
+        if waiter.rank == 0:
+            return True
+        batch_active = self._active - self._active_by_rank[0]
+        return batch_active < self.max_concurrency - self.interactive_reserved
+
+    def _priority(self, waiter: _Waiter, now: float) -> int:
+        # Ranked when a slot frees up: aged batch calls compete as interactive
+        # (the interactive reserve still applies)
+        if self.promote_after is not None and now - waiter.queued >= self.promote_after:
+            return 0
+        return waiter.rank
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._active < self.max_concurrency:
+            eligible = [w for w in self._waiters if self._eligible(w)]
+            if not eligible:
+                break
+            waiter = min(eligible, key=lambda w: (self._priority(w, now), self._client_active.get(w.client, 0),
+                                                  w.seq))
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self._active += 1
+            self._active_by_rank[waiter.rank] += 1
+            self._client_active[waiter.client] = self._client_active.get(waiter.client, 0) + 1
+        self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, timeout: Optional[float] = None, cancel: Optional[threading.Event] = None):
+        """
+        Hold one of the LLM slots for the duration of the block. Raises
+        QueueTimeout when no slot is granted within `timeout` seconds or
+        `cancel` is set while waiting (checked every CANCEL_POLL seconds).
+        """
+        priority, client = _request_class.get()
+        waiter = _Waiter(next(self._seq), PRIORITIES.index(priority), client)
+        queued = time.perf_counter()
+        deadline = math.inf if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._waiters.append(waiter)
+            self._dispatch()
+            if not waiter.granted:
+                with metrics.QUEUE_DEPTH.track(priority=priority):
+                    while not waiter.granted:
+                        reason = "cancelled" if cancel is not None and cancel.is_set() else None
+                        remaining = deadline - time.monotonic()
+                        if reason is None and remaining <= 0:
+                            reason = "timeout"
+                        if reason:
+                            self._waiters.remove(waiter)
+                            self.abandoned[priority] += 1
+                            metrics.SCHEDULER_ABANDONED.inc(priority=priority, reason=reason)
+                            raise QueueTimeout(priority, time.perf_counter() - queued, reason)
+                        wait = min(remaining, self.CANCEL_POLL) if cancel is not None else remaining
+                        self._cond.wait(None if wait == math.inf else wait)
+            self.granted[priority] += 1
+        metrics.QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, priority=priority)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            with self._cond:
+                self._active -= 1
+                self._active_by_rank[waiter.rank] -= 1
+                self._client_active[client] -= 1
+                if not self._client_active[client]:
+                    del self._client_active[client]
+                self._call_seconds = held if not self._call_seconds else 0.8 * self._call_seconds + 0.2 * held
+                self._dispatch()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "interactive_reserved": self.interactive_reserved,
+                "active": self._active,
+                "admitted": {p: self._admitted[i] for i, p in enumerate(PRIORITIES)},
+                "queued": {p: sum(1 for w in self._waiters if w.rank == i) for i, p in enumerate(PRIORITIES)},
+                "granted": dict(self.granted),
+                "shed": dict(self.shed),
+                "abandoned": dict(self.abandoned),
+                "promote_after_s": self.promote_after,
+                "avg_call_ms": round(self._call_seconds * 1000, 1),
+                "max_wait_s": self.max_wait,
+            }
+
+
+class ScheduledLLM:
+    """``llm`` wrapper: every invoke() waits for a scheduler slot first"""
+
+    def __init__(self, llm, scheduler: LLMScheduler):
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def invoke(self, messages, **kwargs):
+        deadline, cancel = _call_limits.get()
+        timeout = None if deadline == math.inf else max(0.0, deadline - time.monotonic())
+        with self.scheduler.slot(timeout=timeout, cancel=cancel):
+            # Granted just as the caller gave up: free the slot, skip the call
+            if cancel is not None and cancel.is_set():
+                raise QueueTimeout(_request_class.get()[0], 0.0, "cancelled")
+            return self.llm.invoke(messages, **kwargs)
+
+    def __getattr__(self, name):
+        # model name, stats, ... of the wrapped pool / chat model
+        return getattr(self.llm, name)
@@ -1,6 +1,6 @@
 
 from pydantic import BaseModel, Json
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from datetime import datetime
 
 class AnalysisBase(BaseModel):
@@ -40,3 +40,10 @@ class JudgmentHistory(BaseModel):
     filename: str
     upload_date: datetime
     summary_snippet: Optional[str] = None
+
+class FastAnalysisOutput(BaseModel):
+    """JSON object the LLM must return in single-pass (fast) mode"""
+    laws: Union[str, List[str]]
+    precedent_analysis: str
+    logic_audit: str
+    summary: str
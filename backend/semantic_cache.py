@@ -0,0 +1,137 @@
+"""
+SEMANTIC QUERY CACHE
+====================
+
+Cache keyed by the query EMBEDDING instead of the exact text, so appeals,
+reprints and the same judgment from different sources reuse earlier work:
+
+  lookup(vector)  → cosine similarity against every cached query (one numpy
+                    matmul over a fixed-size matrix); a hit when the best
+                    match is >= threshold
+  store(vector, value)
+                  → least-recently-used entry is evicted when full
+
+The threshold is the trade-off knob: lower means more hits but more
+"false hits" (a different judgment answered from cache). To measure it, a
+fraction of hits (verify_rate) is recomputed by the caller and compared
+via record_verification(); stats() reports the observed false-hit rate.
+
+Each entry also carries a version and a scope, and a lookup only matches
+entries with the same ones. all-MiniLM-L6-v2 only reads the first ~256
+tokens, so two judgments with identical opening pages get (almost) the same
+vector; callers therefore scope entries by what the rest of the text
+decides - e.g. the statute sections detected in the WHOLE judgment, which
+pick the retrieval partitions - so such judgments never share results.
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+import metrics
+
+
+class SemanticCache:
+    """Thread-safe LRU cache with approximate (cosine) key matching"""
+
+    def __init__(self, name: str, max_entries: int = 256, threshold: float = 0.97,
+                 verify_rate: float = 0.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.verify_rate = verify_rate
+        self._matrix: Optional[np.ndarray] = None     # (max_entries, dim), unit rows
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()   # slot → (version, scope, value), LRU order
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verified = 0
+        self.false_hits = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype="float32").ravel()
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def lookup(self, vector, version: int = 0, scope: Hashable = None) -> Optional[Any]:
+        """
+        Cached value for the nearest query above the threshold, else None.
+        Entries stored under another version (e.g. an older vector index)
+        or another scope never match.
+        """
+        q = self._normalize(vector)
+        with self._lock:
+            value = None
+            if self._entries and self._matrix is not None and self._matrix.shape[1] == q.shape[0]:
+                slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+                scores = self._matrix[slots] @ q
+                stale = np.fromiter((v != version or sc != scope for v, sc, _ in self._entries.values()),
+                                    dtype=bool)
+                scores[stale] = -np.inf
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = int(slots[best])
+                    self._entries.move_to_end(slot)
+                    value = self._entries[slot][2]
+
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.cache_result(self.name, value is not None)
+        return value
+
+    def should_verify(self) -> bool:
+        """Sample a hit for recomputation (false-hit measurement)"""
+        return self.verify_rate > 0 and random.random() < self.verify_rate
+
+    def record_verification(self, agreed: bool) -> None:
+        with self._lock:
+            self.verified += 1
+            if not agreed:
+                self.false_hits += 1
+        if not agreed:
+            metrics.CACHE_FALSE_HITS.inc(cache=self.name)
+
+    def store(self, vector, value: Any, version: int = 0, scope: Hashable = None) -> None:
+        q = self._normalize(vector)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != q.shape[0]:
+                self._matrix = np.zeros((self.max_entries, q.shape[0]), dtype="float32")
+                self._entries.clear()
+
+            if len(self._entries) < self.max_entries:
+                used = set(self._entries)
+                slot = next(i for i in range(self.max_entries) if i not in used)
+            else:
+                slot, _ = self._entries.popitem(last=False)   # evict LRU
+            self._matrix[slot] = q
+            self._entries[slot] = (version, scope, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "verified_hits": self.verified,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.verified, 4) if self.verified else None,
+            }
+
+
+def same_documents(a: List, b: List) -> bool:
+    """Retrieval results agree when they return the same documents in any order"""
+    return {d.page_content for d in a} == {d.page_content for d in b}
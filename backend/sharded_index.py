@@ -0,0 +1,407 @@
+"""
+SHARDED VECTOR INDEX
+====================
+
+Splits the vector store into N FAISS shards, each loaded by its own worker
+process, so no single process has to hold the whole corpus:
+
+  data/vector_store/shards/shards.json        manifest (count, strategy, sizes)
+  data/vector_store/shards/shard-<i>/         index.faiss + index.pkl
+
+Documents are assigned by a stable hash of their id ("hash") or of their
+court ("court", keeps a High Court's judgments together). A query is sent
+to every worker in parallel (scatter), each returns its local top-k with
+L2 distances, and the results are merged into the global top-k (gather).
+
+Each shard can be rebuilt on its own (build_shard) and reloaded in place
+(ShardedIndex.reload(i), POST /admin/reload-index?shard=i) while the other
+shards keep serving.
+
+Section-filtered searches run in the workers as well: each worker maps the
+partitions of partitioned_index.py to its own rows and scans only those
+(ShardPartitions), so no partition index is loaded into the API process.
+
+Workers are started with "spawn". When serving shards, run the API as
+``uvicorn main:app`` - under ``python main.py`` every worker would
+re-import main.py as its __main__ module.
+
+ShardedIndex mirrors the FAISS methods run_analysis uses
+(similarity_search / similarity_search_by_vector), so it can replace
+vector_db directly.
+
+Usage:
+    python build_vector_db.py --shards 4 [--shard-by court]
+    python sharded_index.py --demo [--demo-size 200000]     # scaling check
+"""
+
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from partitioned_index import PartitionedIndex, partition_keys
+
+MANIFEST = "shards.json"
+STRATEGIES = ("hash", "court")
+
+
+def shard_dir(path: str, shard: int) -> str:
+    return os.path.join(path, f"shard-{shard}")
+
+
+def shard_of(doc: Document, num_shards: int, by: str = "hash") -> int:
+    meta = doc.metadata
+    if by == "court":
+        key = (meta.get("court") or meta.get("act") or "").lower()
+    else:
+        key = str(meta.get("case_no") or meta.get("section") or doc.page_content[:200])
+        key = f"{meta.get('doc_type', '')}:{key}"
+    return zlib.crc32(key.encode("utf-8")) % num_shards
+
+
+# --------------------------------------------------
+# BUILD
+# --------------------------------------------------
+def _write_manifest(path: str, manifest: dict):
+    tmp = os.path.join(path, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def read_manifest(path: str) -> Optional[dict]:
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_shard(members: List[Document], vectors, embeddings, path: str, shard: int):
+    store = FAISS.from_embeddings(
+        [(d.page_content, v) for d, v in zip(members, vectors)],
+        embeddings,
+        metadatas=[d.metadata for d in members],
+    )
+    store.save_local(shard_dir(path, shard))
+
+
+def build_shard(docs: List[Document], embeddings, path: str, shard: int,
+                num_shards: int, by: str = "hash") -> int:
+    """(Re)build ONE shard in place from the full document list; returns its size"""
+    members = [d for d in docs if shard_of(d, num_shards, by) == shard]
+    if not members:
+        raise ValueError(f"Shard {shard} would be empty - use fewer shards")
+    _save_shard(members, embeddings.embed_documents([d.page_content for d in members]), embeddings, path, shard)
+
+    manifest = read_manifest(path) or {"num_shards": num_shards, "by": by, "sizes": {}}
+    manifest["sizes"][str(shard)] = len(members)
+    _write_manifest(path, manifest)
+    return len(members)
+
+
+def build_shards(docs: List[Document], embeddings, path: str, num_shards: int, by: str = "hash") -> dict:
+    """
+    Build every shard in a temporary directory and swap it in whole: the
+    manifest is written last, so a failed build leaves the old shards (or
+    none) in place, never a manifest pointing at missing shards
+    """
+    if by not in STRATEGIES:
+        raise ValueError(f"Unknown shard strategy {by!r} (expected one of {STRATEGIES})")
+    groups = {i: [] for i in range(num_shards)}
+    for doc in docs:
+        groups[shard_of(doc, num_shards, by)].append(doc)
+    empty = [shard for shard, members in groups.items() if not members]
+    if empty:
+        raise ValueError(f"Shards {empty} would be empty - use fewer than {num_shards} shards")
+
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        for shard, members in groups.items():
+            vectors = embeddings.embed_documents([d.page_content for d in members])
+            _save_shard(members, vectors, embeddings, tmp, shard)
+        _write_manifest(tmp, {"num_shards": num_shards, "by": by,
+                              "sizes": {str(shard): len(members) for shard, members in groups.items()}})
+        remove_shards(path)
+        os.replace(tmp, path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return read_manifest(path)
+
+
+def remove_shards(path: str):
+    """Retire a shard set: the manifest goes first, so loaders stop picking it up"""
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        os.remove(os.path.join(path, MANIFEST))
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# --------------------------------------------------
+# WORKER PROCESS
+# --------------------------------------------------
+def _load(folder: str):
+    # Workers only search by vector, so no embedding model is loaded here
+    store = FAISS.load_local(folder, None, allow_dangerous_deserialization=True)
+    rows = defaultdict(list)
+    for row, doc_id in store.index_to_docstore_id.items():
+        for key in partition_keys(store.docstore.search(doc_id)):
+            rows[key].append(row)
+    return store, {key: np.array(ids, dtype="int64") for key, ids in rows.items()}
+
+
+def _loaded(store, rows) -> dict:
+    return {"documents": store.index.ntotal, "partitions": {key: len(ids) for key, ids in rows.items()}}
+
+
+def _search_rows(store, rows, vector, k: int, partitions: List[str]) -> list:
+    """Top-k among this shard's rows of the given partitions only"""
+    import faiss
+    selected = [rows[key] for key in partitions if key in rows]
+    if not selected:
+        return []
+    selector = faiss.IDSelectorBatch(np.unique(np.concatenate(selected)))
+    distances, found = store.index.search(np.array([vector], dtype="float32"), k,
+                                          params=faiss.SearchParameters(sel=selector))
+    hits = []
+    for row, distance in zip(found[0], distances[0]):
+        if row != -1:
+            doc = store.docstore.search(store.index_to_docstore_id[int(row)])
+            hits.append((doc.page_content, doc.metadata, float(distance)))
+    return hits
+
+
+def _shard_worker(folder: str, conn):
+    store, rows = _load(folder)
+    conn.send(("ready", _loaded(store, rows)))
+    while True:
+        command, payload = conn.recv()
+        try:
+            if command == "search":
+                vector, k, partitions = payload
+                if partitions is None:
+                    hits = [(d.page_content, d.metadata, float(s))
+                            for d, s in store.similarity_search_with_score_by_vector(vector, k=k)]
+                else:
+                    hits = _search_rows(store, rows, vector, k, partitions)
+                conn.send(("ok", hits))
+            elif command == "reload":
+                store, rows = _load(folder)
+                conn.send(("ok", _loaded(store, rows)))
+            elif command == "info":
+                import faiss
+                conn.send(("ok", {"documents": store.index.ntotal,
+                                  "index_mb": round(faiss.serialize_index(store.index).nbytes / 2**20, 2)}))
+            elif command == "stop":
+                conn.send(("ok", None))
+                return
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class _ShardClient:
+    """Parent-side handle on one worker (one request in flight at a time)"""
+
+    def __init__(self, ctx, folder: str, shard: int):
+        self.shard = shard
+        self.folder = folder
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_shard_worker, args=(folder, child), daemon=True,
+                                   name=f"vector-shard-{shard}")
+        self.process.start()
+        child.close()   # so a dead worker surfaces as EOFError instead of a hang
+        self.lock = threading.Lock()
+        try:
+            status, loaded = self.conn.recv()
+        except EOFError:
+            status = "died"
+        if status != "ready":
+            raise RuntimeError(f"Shard {shard} failed to start (exit code {self.process.exitcode})")
+        self._update(loaded)
+
+    def _update(self, loaded: dict):
+        self.size = loaded["documents"]
+        self.partitions: Dict[str, int] = loaded["partitions"]   # partition -> rows in this shard
+
+    def call(self, command: str, payload=None):
+        with self.lock:
+            try:
+                self.conn.send((command, payload))
+                status, result = self.conn.recv()
+            except (EOFError, BrokenPipeError) as e:
+                raise RuntimeError(f"Shard {self.shard} worker is gone (exit code {self.process.exitcode})") from e
+        if status == "error":
+            raise RuntimeError(f"Shard {self.shard}: {result}")
+        return result
+
+    def stop(self):
+        if self.process.is_alive():
+            try:
+                self.call("stop")
+            except (RuntimeError, OSError):
+                pass
+            self.process.join(timeout=5)
+
+
+class ShardedIndex:
+    """Scatter-gather search over shard worker processes"""
+
+    def __init__(self, path: str, embeddings=None):
+        manifest = read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f"No shard manifest in {path}")
+        self.path = path
+        self.embeddings = embeddings
+        self.manifest = manifest
+        # spawn, not fork: the API process runs threads (uvicorn, LLM pool)
+        ctx = multiprocessing.get_context("spawn")
+        self.shards = [_ShardClient(ctx, shard_dir(path, i), i) for i in range(manifest["num_shards"])]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard-query")
+        self.partitions = ShardPartitions(self)
+        atexit.register(self.close)
+
+    @classmethod
+    def load(cls, path: str, embeddings=None) -> Optional["ShardedIndex"]:
+        return cls(path, embeddings) if read_manifest(path) else None
+
+    def __len__(self):
+        return len(self.shards)
+
+    def _gather(self, vector, k: int, partitions: Optional[List[str]] = None) -> List[Tuple[Document, float]]:
+        payload = ([float(x) for x in vector], k, partitions)
+        partials = self._executor.map(lambda s: s.call("search", payload), self.shards)
+        hits = [hit for partial in partials for hit in partial]
+        hits.sort(key=lambda hit: hit[2])   # L2 distance: lower is closer
+        return [(Document(page_content=text, metadata=meta), score) for text, meta, score in hits[:k]]
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4) -> List[Tuple[Document, float]]:
+        return self._gather(vector, k)
+
+    def search_partitions(self, vector, partitions: List[str], k: int = 3) -> List[Tuple[Document, float]]:
+        """Top-k within the given partitions (see ShardPartitions)"""
+        return self._gather(vector, k, list(partitions))
+
+    def similarity_search_by_vector(self, vector, k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(vector, k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def reload(self, shard: Optional[int] = None) -> dict:
+        """Reload one shard (or all) from disk after build_shard()"""
+        targets = self.shards if shard is None else [self.shards[shard]]
+        self.manifest = read_manifest(self.path) or self.manifest
+        for s in targets:
+            s._update(s.call("reload"))
+        return {s.shard: s.size for s in targets}
+
+    def info(self) -> List[dict]:
+        return [{"shard": s.shard, **s.call("info")} for s in self.shards]
+
+    def close(self):
+        for shard in self.shards:
+            shard.stop()
+        self._executor.shutdown(wait=False)
+
+
+class ShardPartitions(PartitionedIndex):
+    """
+    PartitionedIndex interface over the shard workers: the manifest is the
+    sum of the workers' partition sizes and searches scan only the matching
+    rows inside each worker, so search_index() treats both the same way.
+    """
+
+    def __init__(self, index: ShardedIndex):
+        self.index = index
+        self.path = index.path
+        self.embeddings = index.embeddings
+
+    @property
+    def manifest(self) -> Dict[str, dict]:
+        totals: Dict[str, dict] = {}
+        for shard in self.index.shards:
+            for key, count in shard.partitions.items():
+                totals.setdefault(key, {"count": 0})["count"] += count
+        return totals
+
+    def search_by_vector(self, vector: List[float], partitions: List[str], k: int = 3) -> List[Tuple[Document, float]]:
+        return self.index.search_partitions(vector, partitions, k)
+
+
+# --------------------------------------------------
+# SCALING DEMO
+# --------------------------------------------------
+def _demo(size: int, dim: int, shard_counts: List[int], queries: int):
+    """
+    Same synthetic corpus served by 1, 2, 4... shards: per-worker memory
+    falls as 1/N (capacity per host budget grows ~N) and query latency
+    falls with N while there are cores to run the shards in parallel.
+    """
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((size, dim), dtype="float32")
+    docs = [Document(page_content=f"doc {i}", metadata={"doc_type": "synthetic", "case_no": i})
+            for i in range(size)]
+    probes = rng.standard_normal((queries, dim), dtype="float32")
+
+    print(f"📦 {size} vectors x {dim} dims, {queries} queries, {os.cpu_count()} CPUs\n")
+    print(f"{'shards':>6} | {'docs/shard':>10} | {'index MB/worker':>15} | {'p50 ms':>7} | {'qps':>7}")
+    baseline = None
+    for n in shard_counts:
+        root = tempfile.mkdtemp(prefix="shards-")
+        try:
+            groups = {i: [] for i in range(n)}
+            for doc, vector in zip(docs, vectors):
+                groups[shard_of(doc, n)].append((doc, vector))
+            for shard, members in groups.items():
+                # Vectors are given, so no embedding model is needed to build or query
+                _save_shard([d for d, _ in members], [v for _, v in members], None, root, shard)
+            _write_manifest(root, {"num_shards": n, "by": "hash",
+                                   "sizes": {str(shard): len(members) for shard, members in groups.items()}})
+
+            index = ShardedIndex(root)
+            latencies = []
+            start = time.perf_counter()
+            for probe in probes:
+                t0 = time.perf_counter()
+                index.similarity_search_by_vector(probe, k=3)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            qps = queries / (time.perf_counter() - start)
+            index_mb = max(i["index_mb"] for i in index.info())
+            index.close()
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        latencies.sort()
+        baseline = baseline or qps
+        print(f"{n:>6} | {size // n:>10} | {index_mb:>15.1f} | {latencies[len(latencies) // 2]:>7.2f} | "
+              f"{qps:>7.1f}  ({qps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded FAISS index tools")
+    parser.add_argument("--demo", action="store_true", help="run the multi-process scaling check")
+    parser.add_argument("--demo-size", type=int, default=100_000)
+    parser.add_argument("--demo-dim", type=int, default=384)
+    parser.add_argument("--demo-shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--demo-queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.demo:
+        _demo(args.demo_size, args.demo_dim, args.demo_shards, args.demo_queries)
+    else:
+        parser.print_help()
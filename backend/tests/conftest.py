@@ -0,0 +1,69 @@
+"""
+Shared pytest setup: the backend modules use top-level imports (they are
+run from backend/), so that directory goes on sys.path first.
+
+App-level tests import main.py once, with the benchmark fakes installed
+(no Ollama, Gemini, DuckDuckGo or embedding model) and a throwaway
+database.
+
+Run from backend/:  python -m pytest -q tests
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ADMIN_TOKEN = "test-admin-token"
+
+# Set before collection: test modules import agents -> checkpoints ->
+# database.py, which binds its engine to DATABASE_URL on first import
+_DB_DIR = tempfile.mkdtemp(prefix="judicial-tests-")
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "test.db")
+os.environ["ADMIN_TOKEN"] = ADMIN_TOKEN
+os.environ["VECTOR_SHARDS"] = "0"
+
+JUDGMENT = """IN THE HIGH COURT OF JUDICATURE AT BOMBAY
+CRIMINAL APPEAL NO. 123 OF 2021
+
+The appellant was convicted under Section 302 read with Section 34 of the IPC
+for the murder of the deceased near the village market. The prosecution relied
+on the dying declaration recorded by the magistrate and on the evidence of two
+eye witnesses who saw the appellant strike the deceased with a sickle.
+
+The defence argued that the appellant acted in private defence and that the
+dying declaration was recorded when the deceased was not in a fit state of mind.
+The trial court rejected both contentions. We find no reason to interfere with
+the conviction and the appeal is dismissed."""
+
+
+@pytest.fixture
+def judgment() -> str:
+    return JUDGMENT
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    """main.py imported against fake providers (see benchmark.install_fakes)"""
+    import benchmark
+
+    benchmark.install_fakes(argparse.Namespace(llm_latency=0.0, prefill_ms_per_token=0.0, search_latency=0.0,
+                                               jitter=0.0, real_embeddings=False))
+    import main
+    return main
+
+
+@pytest.fixture
+def client(main_module):
+    from fastapi.testclient import TestClient
+
+    with TestClient(main_module.app) as client:
+        yield client
@@ -0,0 +1,42 @@
+"""Test doubles for the LLM backends (no Ollama / Gemini needed)"""
+
+import json
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+
+FAST_REPLY = json.dumps({
+    "laws": "Section 302 (IPC) - Punishment for Murder",
+    "precedent_analysis": "The judgment follows established precedent.",
+    "logic_audit": "The reasoning is consistent with the findings.",
+    "summary": "The court upheld the murder conviction.",
+})
+
+
+class RecordingLLM:
+    """Chat model stand-in that records every prompt it receives"""
+
+    def __init__(self, model: str = "fake-llm", reply=None, latency: float = 0.0, error: Exception = None):
+        self.model = model
+        self.reply = reply
+        self.latency = latency
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        with self._lock:
+            self.calls.append(list(messages))
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        task = messages[-1].content
+        if self.reply is not None:
+            content = self.reply(task) if callable(self.reply) else self.reply
+        elif "ONE JSON object" in task:
+            content = FAST_REPLY
+        else:
+            content = "Section 302 (IPC) - Punishment for Murder. Synthetic analysis text."
+        return AIMessage(content=content, response_metadata={"model": self.model})
@@ -0,0 +1,37 @@
+import pytest
+
+from agents import MultiAgentOrchestrator
+from fakes import RecordingLLM
+
+
+def search(query):
+    return {"answer": "", "sources": []}
+
+
+def test_cheap_agents_go_to_the_small_model(judgment):
+    small, large = RecordingLLM("small"), RecordingLLM("large")
+    orchestrator = MultiAgentOrchestrator(large, web_search_function=search,
+                                          agent_llms={"web": small, "summary": small})
+    result = orchestrator.run(judgment, "")
+
+    by_agent = {call["agent"]: call["model"] for call in result["agent_stats"]}
+    assert by_agent == {"Web Research": "small", "Precedent Analyzer": "large",
+                        "Logic Auditor": "large", "Summary Writer": "small"}
+
+
+def test_routing_report_totals_per_agent_and_model(judgment):
+    orchestrator = MultiAgentOrchestrator(RecordingLLM("large"), web_search_function=search)
+    orchestrator.run(judgment, "")
+    orchestrator.run(judgment, "")
+
+    report = {row["agent"]: row for row in orchestrator.routing_report()}
+    assert report["Logic Auditor"]["calls"] == 2
+    assert report["Logic Auditor"]["model"] == "large"
+    assert report["Logic Auditor"]["avg_latency_ms"] >= 0
+
+
+def test_unknown_agent_keys_are_rejected():
+    with pytest.raises(ValueError, match="agent_llms"):
+        MultiAgentOrchestrator(RecordingLLM(), agent_llms={"lawyer": RecordingLLM()})
+    with pytest.raises(ValueError, match="agent_timeouts"):
+        MultiAgentOrchestrator(RecordingLLM(), agent_timeouts={"lawyer": 5})
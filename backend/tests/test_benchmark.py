@@ -0,0 +1,46 @@
+import io
+
+import PyPDF2
+
+import benchmark
+from law_extractor import LawExtractor
+
+
+def test_percentiles_and_summary():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 50) == 50
+    assert benchmark.percentile(values, 99) == 99
+    assert benchmark.percentile([], 95) == 0.0
+    summary = benchmark.summarize([10.0, 20.0, 30.0])
+    assert summary["count"] == 3 and summary["mean_ms"] == 20.0 and summary["max_ms"] == 30.0
+
+
+def test_synthetic_judgments_are_deterministic():
+    first = benchmark.synthetic_judgment(7)
+    assert first == benchmark.synthetic_judgment(7)
+    assert first != benchmark.synthetic_judgment(8)
+    assert len(LawExtractor().sections(first)) == 3
+
+
+def test_generated_pdf_round_trips_through_pypdf2():
+    text = benchmark.synthetic_judgment(1)
+    reader = PyPDF2.PdfReader(io.BytesIO(benchmark.make_pdf(text, lines_per_page=10)))
+    extracted = "".join(page.extract_text() for page in reader.pages)
+    assert len(reader.pages) > 1
+    assert "convicted under Sections" in extracted
+
+
+def test_fake_embeddings_are_normalized_and_stable():
+    embeddings = benchmark.FakeEmbeddings()
+    vector = embeddings.embed_query("murder conviction appeal")
+    assert vector == embeddings.embed_documents(["murder conviction appeal"])[0]
+    assert abs(sum(v * v for v in vector) - 1.0) < 1e-9
+
+
+def test_analyze_end_to_end_with_fakes(client):
+    pdf = benchmark.make_pdf(benchmark.synthetic_judgment(3))
+    response = client.post("/analyze?mode=fast", files={"file": ("case.pdf", pdf, "application/pdf")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "fast"
+    assert body["summary"]
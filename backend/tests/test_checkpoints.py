@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+from agents import MultiAgentOrchestrator, WebResearchAgent
+from checkpoints import CheckpointStore
+from fakes import RecordingLLM
+
+FULL_PIPELINE = ["Law Identifier", "Web Research", "Precedent Analyzer", "Logic Auditor", "Summary Writer"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkpoints.db'}", connect_args={"check_same_thread": False})
+    models.Base.metadata.create_all(bind=engine)
+    return CheckpointStore(sessionmaker(bind=engine))
+
+
+class Search:
+    def __init__(self, error=None):
+        self.error = error
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        if self.error:
+            raise self.error
+        return {"answer": "Recent rulings on Section 302.", "sources": [{"title": "A", "url": "https://a.example"}]}
+
+
+def run(store, judgment, llm=None, search=None):
+    llm = llm or RecordingLLM()
+    orchestrator = MultiAgentOrchestrator(llm, web_search_function=search or Search(), checkpoints=store)
+    return orchestrator.run(judgment, mode="full"), llm
+
+
+def test_rerun_resumes_every_agent(store, judgment):
+    first, _ = run(store, judgment)
+    assert first["resumed_agents"] == [] and first["degraded_agents"] == []
+
+    again, llm = run(store, judgment)
+    assert again["resumed_agents"] == FULL_PIPELINE
+    assert llm.calls == [] and again["summary"] == first["summary"]
+
+
+def test_failed_web_search_is_degraded_not_checkpointed(store, judgment):
+    failed, _ = run(store, judgment, search=Search(ConnectionError("search engine unreachable")))
+    assert [(d["agent"], d["reason"]) for d in failed["degraded_agents"]] == [("Web Research", "error")]
+    assert failed["web_research"] == "Skipped (backend error)"
+    assert "unreachable" not in failed["web_research"]
+
+    # Only the agent before the failure resumes; web research runs again
+    search = Search()
+    retry, _ = run(store, judgment, search=search)
+    assert retry["resumed_agents"] == ["Law Identifier"]
+    assert retry["degraded_agents"] == [] and len(search.queries) == 1
+    assert retry["web_research"] == "Recent rulings on Section 302."
+
+
+def test_core_facts_failure_marks_the_search_degraded(store, judgment):
+    def reply(task):
+        if task.startswith("YOUR ROLE: Search query writer"):
+            raise ConnectionError("backend reset")
+        return "Section 302 (IPC) - Punishment for Murder. Synthetic analysis text."
+
+    search = Search()
+    result, _ = run(store, judgment, llm=RecordingLLM(reply=reply), search=search)
+    assert "IPC case law" in search.queries[0]   # searched with the fallback query
+    assert result["web_research"] == "Recent rulings on Section 302."
+    assert [(d["agent"], d["reason"]) for d in result["degraded_agents"]] == [("Web Research", "error")]
+
+    retry, _ = run(store, judgment)
+    assert retry["resumed_agents"] == ["Law Identifier"]
+
+
+def test_timeouts_still_propagate_from_core_facts(judgment):
+    from agents import AgentTimeout
+
+    agent = WebResearchAgent(RecordingLLM(error=AgentTimeout("no time left")), Search())
+    state = MultiAgentOrchestrator(RecordingLLM())._new_state(judgment, "")
+    state['laws_found'] = "Section 302 (IPC)"
+    with pytest.raises(AgentTimeout):
+        agent.run(state)
+    assert state["degraded_agents"] == []
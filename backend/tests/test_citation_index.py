@@ -0,0 +1,98 @@
+import pytest
+from langchain_core.documents import Document
+
+from agents import MultiAgentOrchestrator, PrecedentAnalyzerAgent
+from citation_index import CitationIndex
+from fakes import RecordingLLM
+
+SC, HC = "Supreme Court of India", "Bombay High Court"
+
+
+def precedent(case_no, sections, primary, court, year):
+    return Document(page_content=f"CASE {case_no}\nLegal Principle: principle {case_no}",
+                    metadata={"doc_type": "precedent", "case_no": case_no, "title": f"Case {case_no}",
+                              "year": year, "court": court, "sections": sections, "primary_section": primary})
+
+
+DOCS = [
+    precedent(1, ["302", "34"], "302", SC, 2020),
+    precedent(2, ["302"], "302", HC, 2022),
+    precedent(3, ["302", "201"], "201", SC, 2018),
+    precedent(4, ["201"], "201", SC, 2015),
+    precedent(5, ["420"], "420", HC, 2019),
+    precedent(6, ["34", "149"], "149", SC, 2021),
+    Document(page_content="Section 302: Punishment for Murder", metadata={"doc_type": "statute", "section": "302"}),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CitationIndex.from_documents(DOCS)
+
+
+def numbers(cases):
+    return [case["case_no"] for case in cases]
+
+
+# --- section → precedent lookup ---
+
+def test_section_ranking_is_primary_charge_then_court_then_recency(index):
+    assert len(index) == 6
+    assert numbers(index.candidates(["302"])) == [1, 2, 3]   # 3 only mentions 302
+    assert numbers(index.candidates(["34"])) == [6, 1]       # neither is primary: SC, most recent first
+    assert index.candidates(["999"]) == []
+
+
+def test_cases_matching_more_sections_go_first(index):
+    assert numbers(index.candidates(["302", "34"])) == [1, 6, 2, 3]
+    assert numbers(index.candidates(["302", "34"], limit=2)) == [1, 6]
+    assert numbers(index.candidates(["302a", "302"])) == [1, 2, 3]
+
+
+# --- case graph ---
+
+def test_related_cases_share_a_section(index):
+    related = index.related(1)
+    assert numbers(related) == [6, 3, 2]   # one shared section each: SC before HC, then recency
+    assert all(case["shared_sections"] == 1 for case in related)
+    assert numbers(index.related("3")) == [1, 4, 2]
+    assert index.related(5) == [] and index.related(99) == []
+
+
+def test_related_to_ranks_cases_linked_to_the_most_given_cases(index):
+    assert numbers(index.related_to([1, 2])) == [3, 6]   # 3 is linked to both
+    assert numbers(index.related_to([1, 3], limit=1)) == [2]
+    assert index.related_to([5]) == []
+
+
+# --- precedent analysis ---
+
+def test_precedent_prompt_lists_candidates_and_related_cases(index, judgment):
+    llm = RecordingLLM()
+    agent = PrecedentAnalyzerAgent(llm, index, max_candidates=2)
+    state = MultiAgentOrchestrator(RecordingLLM())._new_state(judgment, "")
+    state['laws_found'], state['sections_found'] = "Section 302 (IPC)", ["302"]
+
+    agent.run(state)
+    assert numbers(state['precedent_candidates']) == [1, 2]
+    assert numbers(state['related_precedents']) == [3, 6]
+    prompt = llm.calls[0][-1].content
+    related = prompt.split("RELATED CASES (share sections with the candidates):\n")[1]
+    assert related.startswith("- Case 3, Supreme Court of India [302, 201]: principle 3\n- Case 6,")
+
+
+def test_degraded_precedent_analysis_lists_related_cases(index, judgment):
+    agent = PrecedentAnalyzerAgent(RecordingLLM(), index, max_candidates=2)
+    state = MultiAgentOrchestrator(RecordingLLM())._new_state(judgment, "")
+    state['sections_found'] = ["302"]
+
+    agent.degrade(state, "timeout")
+    assert "Related cases:\n- Case 3" in state['precedent_analysis']
+
+
+def test_related_cases_are_in_the_result(index, judgment):
+    orchestrator = MultiAgentOrchestrator(RecordingLLM(), citation_index=index)
+    orchestrator.precedent_agent.max_candidates = 2
+    result = orchestrator.run(judgment, mode="full")   # cites Sections 302 and 34
+    assert numbers(result["precedent_candidates"]) == [1, 6]
+    assert numbers(result["related_precedents"]) == [3, 2]
@@ -0,0 +1,77 @@
+import pytest
+
+import benchmark
+from dedup import NearDuplicateIndex, content_hash, signature, similarity
+
+JUDGMENT = benchmark.synthetic_judgment(5)
+REST = JUDGMENT.split("\n", 1)[1]   # without the court header
+
+
+def test_signatures_estimate_overlap():
+    reprint = "REPORTED IN 2019 CRI LJ 1042\n" + JUDGMENT
+    assert similarity(signature(JUDGMENT), signature(reprint)) > 0.9
+    assert similarity(signature(JUDGMENT), signature(benchmark.synthetic_judgment(6))) < 0.9   # shared templates only
+
+
+def test_content_hash_ignores_spacing_and_case_only():
+    assert content_hash(JUDGMENT) == content_hash("  " + JUDGMENT.upper().replace("\n", "\n\n"))
+    assert content_hash(JUDGMENT) != content_hash(JUDGMENT.replace("upheld", "set aside"))
+
+
+def test_index_returns_closest_match_and_evicts_oldest():
+    index = NearDuplicateIndex(threshold=0.9, max_entries=2)
+    index.add("a", signature(JUDGMENT), "first")
+    key, value, score = index.find(signature(JUDGMENT))
+    assert (key, value, score) == ("a", "first", 1.0)
+    assert index.find(signature(benchmark.synthetic_judgment(6))) is None
+
+    index.add("b", signature(benchmark.synthetic_judgment(6)))
+    index.add("c", signature(benchmark.synthetic_judgment(7)))
+    assert len(index) == 2 and index.find(signature(JUDGMENT)) is None
+
+
+# --- /analyze: reuse only verified duplicates ---
+
+@pytest.fixture
+def dedup_client(client, main_module, monkeypatch):
+    monkeypatch.setattr(main_module, "upload_index", NearDuplicateIndex(threshold=0.9))
+    return client
+
+
+def analyze(client, text, filename):
+    pdf = benchmark.make_pdf(text)
+    return client.post("/analyze?mode=fast", files={"file": (filename, pdf, "application/pdf")}).json()
+
+
+def test_off_by_default(main_module):
+    assert main_module.upload_index is None
+
+
+def test_verified_duplicates_are_served_from_the_earlier_analysis(dedup_client):
+    first = analyze(dedup_client, JUDGMENT, "original.pdf")
+    assert not first["cached"] and "duplicate_of" not in first
+
+    again = analyze(dedup_client, JUDGMENT, "again.pdf")
+    assert again["cached"] and again["duplicate_of"]["filename"] == "original.pdf"
+
+    # Other reporter header, same statutes: verified at section level
+    reprint = analyze(dedup_client, "IN THE HIGH COURT - REPORTED AS 2019 CRI LJ 1042\n" + REST, "reprint.pdf")
+    assert reprint["cached"] and reprint["duplicate_of"]["filename"] == "original.pdf"
+
+
+def test_similar_text_with_other_statutes_is_analysed_again(dedup_client, main_module):
+    analyze(dedup_client, JUDGMENT, "original.pdf")
+    altered = JUDGMENT + "\nThe accused is also convicted under Section 201 IPC."
+    assert similarity(signature(JUDGMENT), signature(altered)) >= main_module.upload_index.threshold
+
+    response = analyze(dedup_client, altered, "altered.pdf")
+    assert not response["cached"] and "duplicate_of" not in response
+    assert len(main_module.upload_index) == 2   # stored as a judgment of its own
+
+
+def test_upload_matches_needs_same_words_or_same_statutes(main_module):
+    entry = main_module.upload_fingerprint(JUDGMENT)
+    assert main_module.upload_matches(entry, main_module.upload_fingerprint(JUDGMENT.lower()))
+    # No statutes cited on either side is not evidence of the same judgment
+    no_statutes = {"hash": "x", "statutes": []}
+    assert not main_module.upload_matches(no_statutes, {"hash": "y", "statutes": []})
@@ -0,0 +1,149 @@
+import datetime
+import json
+import sys
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import export_analyses
+import models
+from export_analyses import iter_rows, jsonl_chunks, parse_date, peak_rss_mb
+
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for day, laws in [(1, "Section 302 (IPC) - Murder"), (2, "Section 3021 (IPC)"),
+                      (3, "Section 304A (IPC) - Negligence"), (4, None)]:
+        session.add(models.Analysis(judgment=models.Judgment(filename=f"judgment-{day}.pdf"), laws=laws,
+                                    summary=f"Summary {day}", created_at=datetime.datetime(2025, 1, day, 10),
+                                    web_sources=json.dumps([{"title": "A", "url": f"https://a.example/{day}"}])
+                                    if day == 1 else None))
+    session.commit()
+    yield session
+    session.close()
+
+
+def filenames(batches):
+    return [row["filename"] for batch in batches for row in batch]
+
+
+def test_rows_stream_oldest_first_in_batches(db):
+    batches = list(iter_rows(db, batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert filenames(batches) == [f"judgment-{day}.pdf" for day in range(1, 5)]
+    assert batches[0][0]["web_sources"] == [{"title": "A", "url": "https://a.example/1"}]
+    assert batches[1][0]["web_sources"] == []
+
+
+def test_date_and_section_filters(db):
+    window = parse_date("2025-01-02"), parse_date("2025-01-03", end=True)   # --until includes that day
+    assert filenames(iter_rows(db, *window)) == ["judgment-2.pdf", "judgment-3.pdf"]
+    assert filenames(iter_rows(db, sections=["302"])) == ["judgment-1.pdf"]   # not "3021"
+    assert filenames(iter_rows(db, sections=["304a", "302"])) == ["judgment-1.pdf", "judgment-3.pdf"]
+    assert filenames(iter_rows(db, since=parse_date("2025-01-02"), sections=["302"])) == []
+
+
+def test_until_is_inclusive(db):
+    stamped = datetime.datetime(2025, 1, 3, 10)   # created_at of judgment-3
+    assert filenames(iter_rows(db, until=parse_date(stamped.isoformat(), end=True)))[-1] == "judgment-3.pdf"
+    assert filenames(iter_rows(db, until=stamped - datetime.timedelta(microseconds=1)))[-1] == "judgment-2.pdf"
+    assert filenames(iter_rows(db, since=stamped, until=stamped)) == ["judgment-3.pdf"]
+    assert parse_date("2025-01-03", end=True) == datetime.datetime(2025, 1, 3, 23, 59, 59, 999999)
+
+
+def test_jsonl_lines(db):
+    lines = b"".join(jsonl_chunks(iter_rows(db, batch_size=2))).decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["summary"] for r in records] == ["Summary 1", "Summary 2", "Summary 3", "Summary 4"]
+    assert records[0]["created_at"] == "2025-01-01T10:00:00"
+
+
+def test_parquet_keeps_every_web_source_field(db):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import io
+
+    sources = [{"title": "A", "url": "https://a.example", "snippet": "Relevant legal precedent"}]
+    row = db.query(models.Analysis).first()
+    row.web_sources = json.dumps(sources)
+    db.commit()
+
+    data = b"".join(export_analyses.parquet_chunks(iter_rows(db)))
+    records = pq.read_table(io.BytesIO(data)).to_pylist()
+    jsonl = [json.loads(line) for line in b"".join(jsonl_chunks(iter_rows(db))).decode("utf-8").splitlines()]
+    assert records[0]["web_sources"] == jsonl[0]["web_sources"] == sources
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="csv"):
+        export_analyses.export_chunks("csv", iter([]))
+
+
+# --- peak RSS (resource is Unix-only) ---
+
+def test_peak_rss_without_resource_uses_psutil(monkeypatch):
+    memory = types.SimpleNamespace(rss=100 * 2**20, peak_wset=300 * 2**20)
+    psutil = types.SimpleNamespace(Process=lambda: types.SimpleNamespace(memory_info=lambda: memory))
+    monkeypatch.setitem(sys.modules, "resource", None)   # import resource -> ImportError, as on Windows
+    monkeypatch.setitem(sys.modules, "psutil", psutil)
+    assert peak_rss_mb() == 300
+
+
+def test_peak_rss_is_unknown_without_resource_or_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, "resource", None)
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert peak_rss_mb() is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="resource is Unix-only")
+def test_peak_rss_from_resource():
+    assert peak_rss_mb() > 0
+
+
+# --- GET /export ---
+
+@pytest.fixture
+def saved(main_module):
+    return main_module.save_analysis("export.pdf", {"summary": "Conviction upheld. " * 100,
+                                                    "laws": "Section 302 (IPC) - Murder"})
+
+
+def test_export_needs_the_admin_token(client, saved):
+    assert client.get("/export").status_code == 403
+    assert client.get("/export", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_jsonl_export_is_compressed(client, saved):
+    response = client.get("/export?sections=302", headers={**ADMIN, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="analyses.jsonl"'
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert saved in [r["id"] for r in records] and all("302" in r["laws"] for r in records)
+
+
+def test_parquet_export_is_not_compressed_again(client, main_module, monkeypatch):
+    payload = b"PAR1" + bytes(range(256)) * 8 + b"PAR1"
+    monkeypatch.setattr(main_module.export_analyses, "pa", object())
+    monkeypatch.setattr(main_module.export_analyses, "stream_export", lambda *args: iter([payload]))
+    response = client.get("/export?format=parquet", headers={**ADMIN, "Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "identity" and response.content == payload
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+
+
+@pytest.mark.skipif(export_analyses.pa is not None, reason="pyarrow is installed")
+def test_parquet_export_needs_pyarrow(client, saved):
+    assert client.get("/export?format=parquet", headers=ADMIN).status_code == 501
+
+
+def test_bad_export_dates(client):
+    response = client.get("/export?since=yesterday", headers=ADMIN)
+    assert response.status_code == 400 and "Bad date" in response.json()["detail"]
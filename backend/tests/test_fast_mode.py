@@ -0,0 +1,47 @@
+"""Fast mode: bad JSON falls back to the five agents, timeouts and backend
+errors degrade instead of failing the request."""
+
+import pytest
+
+from agents import MultiAgentOrchestrator
+from fakes import RecordingLLM
+from llm_pool import NoBackendAvailable
+
+
+def test_valid_json_stays_in_fast_mode(judgment):
+    result = MultiAgentOrchestrator(RecordingLLM()).run(judgment, mode="fast")
+    assert result["mode"] == "fast"
+    assert result["degraded_agents"] == []
+    assert "upheld" in result["summary"]
+
+
+@pytest.mark.parametrize("reply", ["Sorry, here is prose instead of JSON.", '{"laws": "Section 302", }',
+                                   '{"laws": "Section 302"}'])
+@pytest.mark.parametrize("timeouts", [None, {"fast": 5.0}])
+def test_bad_json_falls_back_to_full_pipeline(judgment, reply, timeouts):
+    llm = RecordingLLM(reply=lambda task: reply if "ONE JSON object" in task else "Synthetic analysis text.")
+    result = MultiAgentOrchestrator(llm, agent_timeouts=timeouts).run(judgment, mode="fast")
+    assert result["mode"] == "full"
+    assert result["degraded_agents"] == []
+
+
+def test_timeout_degrades(judgment):
+    llm = RecordingLLM(latency=0.5)
+    result = MultiAgentOrchestrator(llm, agent_timeouts={"fast": 0.05}).run(judgment, mode="fast")
+    assert result["mode"] == "fast"
+    assert [(d["agent"], d["reason"]) for d in result["degraded_agents"]] == [("Fast Analyzer", "timeout")]
+    assert result["summary"]   # extractive summary of the judgment
+
+
+@pytest.mark.parametrize("error", [ConnectionError("connection refused"),
+                                   NoBackendAvailable("all LLM backends failed"),
+                                   RuntimeError("model crashed"),
+                                   ValueError("invalid literal for int() in the client")])
+@pytest.mark.parametrize("timeouts", [None, {"fast": 5.0}])
+def test_backend_error_degrades(judgment, error, timeouts):
+    llm = RecordingLLM(error=error)
+    result = MultiAgentOrchestrator(llm, agent_timeouts=timeouts).run(judgment, mode="fast")
+    assert result["mode"] == "fast"
+    assert [(d["agent"], d["reason"]) for d in result["degraded_agents"]] == [("Fast Analyzer", "error")]
+    assert type(error).__name__ in result["degraded_agents"][0]["detail"]
+    assert len(llm.calls) == 1   # no fallback run against the failing backend
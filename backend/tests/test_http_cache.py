@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+
+from http_cache import IMMUTABLE, REVALIDATE, cache_headers, http_date, not_modified, parse_fields, weak_etag
+
+CREATED = datetime.datetime(2024, 3, 1, 12, 30, 15, 500000)   # naive UTC, as SQLite returns it
+
+
+def test_weak_etag_changes_with_every_part():
+    etag = weak_etag("analysis", 1, "summary")
+    assert etag.startswith('W/"') and etag == weak_etag("analysis", 1, "summary")
+    assert etag != weak_etag("analysis", 1, "summary,laws") != weak_etag("analysis", 2, "summary")
+
+
+def test_cache_headers():
+    assert cache_headers('W/"a"', CREATED, IMMUTABLE) == {
+        "ETag": 'W/"a"', "Cache-Control": IMMUTABLE, "Last-Modified": "Fri, 01 Mar 2024 12:30:15 GMT"}
+    assert cache_headers('W/"a"', None, REVALIDATE) == {"ETag": 'W/"a"', "Cache-Control": REVALIDATE}
+
+
+def test_if_none_match():
+    etag = weak_etag("analysis", 1)
+    assert not_modified({"if-none-match": etag}, etag, CREATED)
+    assert not_modified({"if-none-match": f'"other", {etag.removeprefix("W/")}'}, etag, CREATED)   # weak comparison
+    assert not_modified({"if-none-match": "*"}, etag, CREATED)
+    assert not not_modified({"if-none-match": '"other"'}, etag, CREATED)
+    # If-None-Match wins over If-Modified-Since
+    assert not not_modified({"if-none-match": '"other"', "if-modified-since": http_date(CREATED)}, etag, CREATED)
+
+
+def test_if_modified_since():
+    etag = weak_etag("analysis", 1)
+    assert not_modified({"if-modified-since": http_date(CREATED)}, etag, CREATED)   # second precision
+    earlier = http_date(CREATED - datetime.timedelta(seconds=1))
+    assert not not_modified({"if-modified-since": earlier}, etag, CREATED)
+    assert not not_modified({"if-modified-since": "not a date"}, etag, CREATED)
+    assert not not_modified({"if-modified-since": http_date(CREATED)}, etag, None)
+    assert not not_modified({}, etag, CREATED)
+
+
+def test_parse_fields():
+    allowed = ["id", "summary", "laws"]
+    assert parse_fields("", allowed, ["id", "summary"]) == ["id", "summary"]
+    assert parse_fields(" laws, summary,laws ,", allowed, []) == ["id", "laws", "summary"]
+    with pytest.raises(ValueError, match="secret"):
+        parse_fields("summary,secret", allowed, [])
+
+
+# --- history endpoints ---
+
+@pytest.fixture
+def saved(main_module):
+    result = {"summary": "Conviction upheld.", "laws": "Section 302 (IPC)", "analysis": "Analysis text.",
+              "web_sources": [{"title": "A", "url": "https://a.example"}]}
+    return main_module.save_analysis("judgment.pdf", result)
+
+
+def test_history_list_revalidates_with_the_etag(client, saved):
+    response = client.get("/history")
+    assert response.status_code == 200 and response.headers["cache-control"] == REVALIDATE
+    newest = response.json()[0]
+    assert newest["id"] == saved and newest["filename"] == "judgment.pdf"
+    assert set(newest) == {"id", "judgment_id", "filename", "upload_date", "created_at"}
+
+    etag = response.headers["etag"]
+    again = client.get("/history", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert client.get("/history?fields=summary", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_new_analysis_changes_the_history_etag(client, main_module, saved):
+    etag = client.get("/history").headers["etag"]
+    main_module.save_analysis("another.pdf", {"summary": "Appeal allowed."})
+    response = client.get("/history", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()[0]["filename"] == "another.pdf"
+
+
+def test_history_item_is_immutable(client, saved):
+    response = client.get(f"/history/{saved}")
+    assert response.status_code == 200 and response.headers["cache-control"] == IMMUTABLE
+    record = response.json()
+    assert record["summary"] == "Conviction upheld." and record["web_sources"][0]["url"] == "https://a.example"
+
+    assert client.get(f"/history/{saved}", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    since = response.headers["last-modified"]
+    assert client.get(f"/history/{saved}", headers={"If-Modified-Since": since}).status_code == 304
+
+
+def test_history_fields(client, saved):
+    assert client.get(f"/history/{saved}?fields=summary,laws").json() == {
+        "id": saved, "summary": "Conviction upheld.", "laws": "Section 302 (IPC)"}
+    assert client.get("/history?fields=laws&limit=1").json() == [{"id": saved, "laws": "Section 302 (IPC)"}]
+
+    response = client.get("/history?fields=summary,password")
+    assert response.status_code == 400 and "password" in response.json()["detail"]
+    assert client.get(f"/history/{saved}?fields=password").status_code == 400
+    assert client.get("/history/999999").status_code == 404
@@ -0,0 +1,98 @@
+import pytest
+from langchain_core.documents import Document
+
+from agents import MultiAgentOrchestrator
+from benchmark import FakeEmbeddings
+from citation_index import CitationIndex, build_citation_index, save_citation_index
+from fakes import RecordingLLM
+from index_manager import IndexManager
+
+
+def precedent(case_no, sections, title):
+    return Document(page_content=f"CASE {case_no}: {title}",
+                    metadata={"doc_type": "precedent", "case_no": case_no, "title": title,
+                              "court": "Supreme Court of India", "sections": sections})
+
+
+def write_lookups(root, cases, laws):
+    save_citation_index(build_citation_index(cases), str(root / "citation_index.json"))
+    (root / "laws.txt").write_text(laws, encoding="utf-8")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    write_lookups(tmp_path, [precedent(1, ["302"], "Old murder case")], "Section 302: Punishment for Murder\n")
+    manager = IndexManager(str(tmp_path / "vector_store"), FakeEmbeddings(), use_shards=False,
+                           citation_path=str(tmp_path / "citation_index.json"),
+                           laws_path=str(tmp_path / "laws.txt"))
+    manager.load()
+    return manager
+
+
+def test_reload_swaps_the_lookups_with_the_index(manager, tmp_path):
+    old = manager.current
+    assert [c["title"] for c in old.citation_index.candidates(["302"])] == ["Old murder case"]
+    assert old.law_extractor.extract("Section 420 IPC")[0].description == ""
+
+    swapped = []
+    manager.on_swap(swapped.append)
+    write_lookups(tmp_path, [precedent(1, ["302"], "Old murder case"), precedent(2, ["420"], "New cheating case")],
+                  "Section 302: Punishment for Murder\nSection 420: Cheating\n")
+    assert manager.reload(wait=True)
+
+    new = manager.current
+    assert swapped == [new] and new.version == old.version + 1 and old.retired
+    assert [c["title"] for c in new.citation_index.candidates(["420"])] == ["New cheating case"]
+    assert new.law_extractor.extract("Section 420 IPC")[0].description == "Cheating"
+
+
+def test_failed_reload_is_reported_and_keeps_serving(manager, tmp_path, capsys):
+    before = manager.current
+    (tmp_path / "vector_store").mkdir()
+    (tmp_path / "vector_store" / "index.faiss").write_bytes(b"not an index")
+
+    manager.reload(wait=True)
+    out = capsys.readouterr().out
+    assert "reload failed" in out and "reloaded" not in out
+    assert manager.current is before and manager.last_error
+    assert manager.info()["last_error"] == manager.last_error
+
+
+def test_agents_follow_the_swapped_lookups(manager):
+    orchestrator = MultiAgentOrchestrator(RecordingLLM(), law_extractor=manager.current.law_extractor,
+                                          citation_index=manager.current.citation_index)
+    before = orchestrator.precedent_agent.fingerprint()
+    replacement = CitationIndex(build_citation_index([precedent(9, ["302"], "Replacement case")]))
+
+    manager.on_swap(lambda snapshot: orchestrator.use_lookups(snapshot.law_extractor, snapshot.citation_index))
+    manager.install_objects(citation_index=replacement)
+    assert orchestrator.precedent_agent.citation_index is replacement
+    assert orchestrator.law_agent.extractor is manager.current.law_extractor
+    assert orchestrator.precedent_agent.fingerprint() != before   # old checkpoints are not resumed
+
+
+def test_main_agents_are_swapped_on_reload(main_module):
+    manager = main_module.index_manager
+    old = manager.current.citation_index
+    replacement = CitationIndex(build_citation_index([precedent(9, ["302"], "Replacement case")]))
+    try:
+        manager.install_objects(citation_index=replacement)
+        assert main_module.multi_agent.precedent_agent.citation_index is replacement
+    finally:
+        manager.install_objects(citation_index=old)
+
+
+# --- admin endpoints ---
+
+def test_admin_endpoints_are_closed_without_a_token(client, main_module, monkeypatch):
+    monkeypatch.setattr(main_module, "ADMIN_TOKEN", "")
+    for method, path in [("post", "/admin/reload-index"), ("get", "/export")]:
+        response = getattr(client, method)(path, headers={"X-Admin-Token": ""})
+        assert response.status_code == 403 and "ADMIN_TOKEN" in response.json()["detail"]
+
+
+def test_admin_token_is_checked(client, main_module, manager, monkeypatch):
+    monkeypatch.setattr(main_module, "index_manager", manager)
+    assert client.post("/admin/reload-index", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.post("/admin/reload-index", headers={"X-Admin-Token": "test-admin-token"})
+    assert response.status_code == 202 and response.json()["started"]
@@ -0,0 +1,136 @@
+import pytest
+
+from agents import LawIdentifierAgent
+from fakes import RecordingLLM
+from law_extractor import UNKNOWN_ACT, LawExtractor
+
+TITLES = {"302": "Punishment for Murder", "34": "Common Intention", "100": "Right of Private Defence",
+          "376": "Punishment for Rape", "304": "Culpable Homicide", "304B": "Dowry Death",
+          "498A": "Cruelty by Husband or Relatives"}
+
+
+@pytest.fixture
+def extractor():
+    return LawExtractor(TITLES)
+
+
+def refs(extractor, text):
+    return [(ref.section, ref.act, ref.description) for ref in extractor.extract(text)]
+
+
+@pytest.mark.parametrize("text", ["Section 100 CPC", "Section 100 C.P.C.",
+                                  "Section 100 of the Code of Civil Procedure"])
+def test_cpc_is_not_the_ipc(extractor, text):
+    assert refs(extractor, text) == [("100", "CPC", "")]
+    assert extractor.sections(text) == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Section 13(1)(d) of the Prevention of Corruption Act", [("13(1)(d)", "Prevention of Corruption Act", "")]),
+    ("Sections 13(1)(D) and 13(2) of the PC Act", [("13(1)(d)", "Prevention of Corruption Act", ""),
+                                                   ("13(2)", "Prevention of Corruption Act", "")]),
+    ("u/s 138 N.I. Act", [("138", "Negotiable Instruments Act", "")]),
+    ("Section 438 Cr.P.C.", [("438", "CrPC", "")]),
+    ("Section 20(b)(ii) of the NDPS Act", [("20(b)(ii)", "NDPS Act", "")]),
+    ("Section 103 of the Bharatiya Nyaya Sanhita", [("103", "BNS", "")]),
+])
+def test_other_acts_and_sub_clauses(extractor, text, expected):
+    assert refs(extractor, text) == expected
+
+
+@pytest.mark.parametrize("text", ["Section 498-A IPC and Section 304-B IPC", "Sections 498A and 304B IPC",
+                                  "u/s 498-a and 304-b of the Indian Penal Code", "498-A IPC, 304-B IPC"])
+def test_hyphenated_suffix_is_the_same_section(extractor, text):
+    assert refs(extractor, text) == [("498A", "IPC", "Cruelty by Husband or Relatives"),
+                                     ("304B", "IPC", "Dowry Death")]
+    assert extractor.sections(text) == ["498A", "304B"]
+
+
+@pytest.mark.parametrize("text", ["Order 7 Rule 11 CPC", "O. 7 R. 11 CPC", "Chapter 2 of the Evidence Act",
+                                  "Rule 5 of the Arms Act", "para 12 IPC offences", "paragraph 12 IPC",
+                                  "Schedule 1 of the NDPS Act"])
+def test_numbered_parts_that_are_not_sections(extractor, text):
+    assert refs(extractor, text) == []
+
+
+def test_bare_number_with_an_act_is_a_section(extractor):
+    assert refs(extractor, "punishable under 302 IPC, 34 IPC and Order 7 Rule 11 CPC") == \
+        [("302", "IPC", "Punishment for Murder"), ("34", "IPC", "Common Intention")]
+
+
+def test_ipc_sub_clause_keeps_title_and_base_section(extractor):
+    text = "convicted under Section 376(2)(g) IPC"
+    assert refs(extractor, text) == [("376(2)(g)", "IPC", "Punishment for Rape")]
+    assert extractor.sections(text) == ["376"]
+
+
+def test_unnamed_act_is_unknown_not_ipc(extractor):
+    text = "The accused was charged under Sections 302 and 201."
+    assert refs(extractor, text) == [("302", UNKNOWN_ACT, ""), ("201", UNKNOWN_ACT, "")]
+    assert not any(ref.resolved for ref in extractor.extract(text))
+    assert extractor.sections(text) == []
+    assert "Section 302 (Act not stated)" in extractor.format_laws(extractor.extract(text))
+
+
+def test_chained_reference_takes_the_named_act(extractor):
+    text = "Section 302 read with Section 34 of the IPC"
+    assert refs(extractor, text) == [("302", "IPC", "Punishment for Murder"), ("34", "IPC", "Common Intention")]
+
+
+def test_number_cited_earlier_with_an_act_keeps_it(extractor):
+    text = "The validity of Section 66A IT Act was challenged. Section 66A was vague. Article 21 applies; see Section 21."
+    assert refs(extractor, text) == [("66A", "IT Act", ""), ("21", "Constitution of India", ""),
+                                     ("21", UNKNOWN_ACT, "")]
+
+
+def test_default_act_for_an_ipc_only_corpus():
+    corpus = LawExtractor(TITLES, default_act="IPC")
+    assert corpus.sections("Charge: Section 302 (Murder) + Section 100 CPC") == ["302"]
+
+
+def test_formatted_laws_parse_back(extractor):
+    text = "Section 302 IPC, Section 100 CPC and Section 13(1)(d) of the PC Act"
+    found = extractor.extract(text)
+    assert extractor.extract(extractor.format_laws(found)) == found
+
+
+# --- LawIdentifierAgent: the LLM only gets what the regex cannot resolve ---
+
+def _state(text):
+    from agents import MultiAgentOrchestrator
+    return MultiAgentOrchestrator(RecordingLLM())._new_state(text, "")
+
+
+def test_agent_skips_llm_when_everything_resolves(extractor):
+    llm = RecordingLLM()
+    state = LawIdentifierAgent(llm, extractor).run(_state("convicted u/s 302 r/w 34 IPC"))
+    assert llm.calls == []
+    assert state['sections_found'] == ["302", "34"]
+
+
+def test_agent_asks_llm_only_about_unresolved_references(extractor):
+    llm = RecordingLLM(reply="Section 201 (IPC) - Causing disappearance of evidence")
+    text = "Convicted under Section 302 IPC. The second appeal under Section 100 CPC. Section 201 was also framed."
+    state = LawIdentifierAgent(llm, extractor).run(_state(text))
+
+    task = llm.calls[0][-1].content
+    assert "Section 302 (IPC)" in task.split("UNRESOLVED")[0]
+    assert "Section 201 (Act not stated)" in task.split("UNRESOLVED")[1]
+    assert "Section 100 (CPC)" in state['laws_found']
+    assert "Section 201 (IPC)" in state['laws_found']
+    assert "Act not stated" not in state['laws_found']
+    assert state['sections_found'] == ["302", "201"]
+
+
+def test_agent_keeps_references_the_llm_cannot_place(extractor):
+    llm = RecordingLLM(reply="No further provisions.")
+    state = LawIdentifierAgent(llm, extractor).run(_state("Charged under Section 420 IPC and Section 120B."))
+    assert "Section 120B (Act not stated)" in state['laws_found']
+    assert state['sections_found'] == ["420"]
+
+
+def test_agent_uses_full_prompt_when_nothing_is_found(extractor):
+    llm = RecordingLLM(reply="Section 302 (IPC) - Punishment for Murder")
+    state = LawIdentifierAgent(llm, extractor).run(_state("The appellant killed the deceased."))
+    assert llm.calls[0][-1].content == LawIdentifierAgent.PROMPT
+    assert state['sections_found'] == ["302"]
@@ -0,0 +1,81 @@
+from legal_corpus import load_corpus, metadata_filter, parse_laws, parse_precedents
+
+LAWS = """THE INDIAN PENAL CODE
+==========
+
+=== CHAPTER XVI: OFFENCES AFFECTING THE HUMAN BODY ===
+
+Section 302: Punishment for Murder
+Whoever commits murder shall be punished with death or imprisonment for life.
+
+Section 304A: Causing Death by Negligence
+Whoever causes the death of any person by doing any rash or negligent act.
+
+=== CHAPTER XVII: OFFENCES AGAINST PROPERTY ===
+
+Section 379: Punishment for Theft
+Whoever commits theft shall be punished.
+"""
+
+PRECEDENTS = """=== CATEGORY 1: MURDER ===
+
+CASE 1: K.M. Nanavati vs. State of Maharashtra (1962)
+Court: Supreme Court of India
+Charge: Section 302 IPC (Murder) vs Section 304 Part I
+Facts: The accused shot the deceased.
+Legal Principle: A time gap negates sudden provocation.
+
+=== CATEGORY 2: PUBLIC INTEREST ===
+
+CASE 2: Shreya Singhal vs. Union of India (2015)
+Court: Supreme Court of India
+Issue: Validity of Section 66A IT Act.
+Facts: Arrests under Section 66A for online posts; Section 505 IPC was also invoked.
+"""
+
+
+def test_one_statute_document_per_section():
+    docs = parse_laws(LAWS)
+    assert [d.metadata["section"] for d in docs] == ["302", "304A", "379"]
+    murder = docs[0]
+    assert murder.metadata["title"] == "Punishment for Murder"
+    assert murder.metadata["chapter"] == "CHAPTER XVI: OFFENCES AFFECTING THE HUMAN BODY"
+    assert murder.page_content.startswith("Section 302:") and "Section 304A" not in murder.page_content
+    # Blocks end at the next chapter header, and offsets point back into the source
+    assert "CHAPTER XVII" not in docs[1].page_content
+    assert LAWS[murder.metadata["start_index"]:].startswith("Section 302:")
+    assert docs[2].metadata["chapter"].startswith("CHAPTER XVII")
+
+
+def test_one_precedent_document_per_case():
+    first, second = parse_precedents(PRECEDENTS)
+    assert first.metadata["case_no"] == 1 and first.metadata["year"] == 1962
+    assert first.metadata["court"] == "Supreme Court of India"
+    assert first.metadata["sections"] == ["302", "304"]   # unnamed sections in this IPC corpus are IPC
+    assert first.metadata["primary_section"] == "302"
+    assert first.metadata["category"] == "CATEGORY 1: MURDER"
+    # No Charge line: sections come from the text; 66A stays with the IT Act
+    assert second.metadata["charge"] == ""
+    assert second.metadata["sections"] == ["505"]
+    assert "CATEGORY 2" not in first.page_content
+
+
+def test_metadata_filter():
+    precedent = {"doc_type": "precedent", "sections": ["302", "34"], "court": "Supreme Court of India", "year": 2010}
+    statute = {"doc_type": "statute", "section": "302"}
+    assert metadata_filter() is None
+    assert metadata_filter(sections=["302"])(statute)
+    assert metadata_filter(sections=["302"], doc_type="precedent")(precedent)
+    assert not metadata_filter(sections=["420"])(precedent)
+    assert metadata_filter(court="supreme", year_from=2000, year_to=2010)(precedent)
+    assert not metadata_filter(year_from=2011)(precedent)
+    assert not metadata_filter(year_to=2020)(statute)   # no year: excluded by a year filter
+
+
+def test_real_corpus_parses_completely():
+    docs = load_corpus()
+    statutes = [d for d in docs if d.metadata["doc_type"] == "statute"]
+    precedents = [d for d in docs if d.metadata["doc_type"] == "precedent"]
+    assert len(statutes) > 500 and len(precedents) == 40
+    assert len({d.metadata["section"] for d in statutes}) == len(statutes)
+    assert [d.metadata["case_no"] for d in precedents] == list(range(1, 41))
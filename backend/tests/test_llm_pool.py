@@ -0,0 +1,111 @@
+"""LLMPool routing against fake backends: prefix affinity, least-loaded fallback, retries"""
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents import MultiAgentOrchestrator
+from fakes import RecordingLLM
+from llm_pool import HedgeRoute, LLMBackend, LLMPool, NoBackendAvailable, prefix_key
+
+
+def prompt(prefix: str, task: str):
+    return [SystemMessage(content=prefix), HumanMessage(content=task)]
+
+
+@pytest.fixture
+def backends():
+    return [LLMBackend(name, RecordingLLM(name), max_concurrency=2) for name in ("a", "b", "c")]
+
+
+def served_by(backends):
+    return {b.name: len(b.llm.calls) for b in backends}
+
+
+def test_prefix_key_needs_a_task_after_the_prefix():
+    assert prefix_key(prompt("judgment", "task 1")) == prefix_key(prompt("judgment", "task 2"))
+    assert prefix_key(prompt("judgment", "task")) != prefix_key(prompt("other judgment", "task"))
+    assert prefix_key([HumanMessage(content="ping")]) is None
+    assert prefix_key("plain string prompt") is None
+
+
+def test_same_prefix_sticks_to_one_backend(backends):
+    pool = LLMPool(backends)
+    first = pool.invoke(prompt("judgment A", "laws"))
+    sticky = next(b for b in backends if b.model == first.response_metadata["model"])
+    # Make the sticky backend look slower than the rest: affinity still wins
+    sticky.ewma_latency = 10.0
+    for task in ("web", "precedent", "logic", "summary"):
+        pool.invoke(prompt("judgment A", task))
+
+    assert len(sticky.llm.calls) == 5
+    assert pool.affinity_stats() == {"prefixes": 1, "hits": 4, "misses": 1, "hit_rate": 0.8}
+
+
+def test_new_prefixes_use_least_loaded(backends):
+    pool = LLMPool(backends)
+    backends[0].in_flight = 1
+    backends[1].ewma_latency = 0.5
+    pool.invoke(prompt("judgment B", "laws"))
+    assert served_by(backends) == {"a": 0, "b": 0, "c": 1}
+
+
+@pytest.mark.parametrize("make_unavailable", [
+    lambda b: setattr(b, "in_flight", b.max_concurrency),   # busy
+    lambda b: setattr(b, "unhealthy_until", float("inf")),   # cooling down
+])
+def test_falls_back_when_sticky_backend_is_unavailable(backends, make_unavailable):
+    pool = LLMPool(backends)
+    pool.invoke(prompt("judgment C", "laws"))
+    sticky = next(b for b in backends if b.llm.calls)
+    make_unavailable(sticky)
+
+    pool.invoke(prompt("judgment C", "web"))
+    moved = next(b for b in backends if b.llm.calls and b is not sticky)
+    # The prefix now lives on the new backend
+    pool.invoke(prompt("judgment C", "precedent"))
+    assert len(moved.llm.calls) == 2
+    assert pool.affinity_stats()["misses"] == 2
+
+
+def test_failed_backend_is_retried_elsewhere(backends):
+    backends[0].llm.error = ConnectionError("refused")
+    pool = LLMPool(backends, cooldown=60)
+    response = pool.invoke(prompt("judgment D", "laws"))
+    assert response.response_metadata["model"] in ("b", "c")
+    assert not backends[0].healthy
+
+
+def test_all_backends_failing_raises_the_last_error(backends):
+    for b in backends:
+        b.llm.error = ConnectionError(f"{b.name} refused")
+    with pytest.raises(ConnectionError):
+        LLMPool(backends, max_retries=5).invoke(prompt("judgment E", "laws"))
+    with pytest.raises(NoBackendAvailable):
+        LLMPool(backends, max_retries=5)._choose({"a", "b", "c"})
+
+
+def test_hedge_avoids_the_sticky_backend(backends):
+    pool = LLMPool(backends)
+    pool.invoke(prompt("judgment F", "laws"))
+    sticky = next(b for b in backends if b.llm.calls)
+    HedgeRoute(pool).invoke(prompt("judgment F", "web"))
+    assert len(sticky.llm.calls) == 1
+    assert sum(len(b.llm.calls) for b in backends) == 2
+    assert pool.affinity_stats()["hits"] == 0   # hedges neither count nor move the pin
+
+
+def test_affinity_map_is_bounded(backends):
+    pool = LLMPool(backends, affinity_size=2)
+    for name in ("1", "2", "3"):
+        pool.invoke(prompt(f"judgment {name}", "laws"))
+    assert pool.affinity_stats()["prefixes"] == 2
+    assert prefix_key(prompt("judgment 1", "x")) not in pool._affinity
+
+
+def test_one_judgment_runs_on_one_backend(backends, judgment):
+    """Every agent of a run shares the prefix (see test_prompt_prefix), so the pool keeps them together"""
+    pool = LLMPool(backends)
+    search = lambda query: {"answer": "", "sources": []}
+    MultiAgentOrchestrator(pool, web_search_function=search).run(judgment, "similar cases")
+    calls = served_by(backends)
+    assert sorted(calls.values())[:2] == [0, 0] and sum(calls.values()) >= 4
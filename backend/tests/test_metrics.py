@@ -0,0 +1,53 @@
+import contextvars
+
+import metrics
+
+
+def test_counter_and_gauge_render_with_escaped_labels():
+    registry = metrics.Registry()
+    requests = registry.counter("test_requests_total", "Requests", ("mode",))
+    requests.inc(mode="fast")
+    requests.inc(2, mode='full "quoted"')
+    in_flight = registry.gauge("test_in_flight", "In flight")
+    with in_flight.track():
+        assert in_flight._values[()] == 1
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{mode="fast"} 1.0' in text
+    assert 'test_requests_total{mode="full \\"quoted\\""} 2.0' in text
+    assert "test_in_flight 0.0" in text
+    assert requests.value(mode="fast") == 1.0
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.Registry()
+    latency = registry.histogram("test_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 2' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+    assert "test_seconds_count 3" in lines
+
+
+def test_registering_twice_returns_the_same_metric():
+    registry = metrics.Registry()
+    assert registry.counter("test_total", "a") is registry.counter("test_total", "b")
+
+
+def test_stage_timings_are_request_local():
+    def request():
+        timings = metrics.start_request_timing()
+        with metrics.stage("pdf_extract"):
+            pass
+        metrics.observe_llm_call({"agent": "Logic Auditor", "model": "large", "latency_ms": 12.5,
+                                  "prompt_tokens": 100, "completion_tokens": 20})
+        return timings
+
+    timings = contextvars.copy_context().run(request)
+    assert [t["stage"] for t in timings] == ["pdf_extract", "agent:Logic Auditor"]
+    assert timings[1]["ms"] == 12.5
+    assert metrics._request_timings.get() is None   # nothing leaked outside the request
@@ -0,0 +1,52 @@
+import pytest
+from langchain_core.documents import Document
+
+from benchmark import FakeEmbeddings
+from partitioned_index import PartitionedIndex, build_partitions, partition_keys
+
+
+def precedent(case_no, sections, text):
+    return Document(page_content=text, metadata={"doc_type": "precedent", "case_no": case_no, "sections": sections})
+
+
+DOCS = [
+    Document(page_content="Section 302: Punishment for Murder", metadata={"doc_type": "statute", "section": "302"}),
+    precedent(1, ["302"], "murder conviction upheld on eye witness evidence"),
+    precedent(2, ["302", "34"], "murder with common intention by two accused"),
+    precedent(3, ["304A"], "rash driving caused death of pedestrian"),
+    precedent(4, [], "public interest litigation on prison conditions"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    embeddings = FakeEmbeddings()
+    build_partitions(DOCS, embeddings, str(tmp_path))
+    return PartitionedIndex.load(str(tmp_path), embeddings)
+
+
+def test_partition_keys():
+    assert partition_keys(DOCS[0]) == ["statute"]
+    assert partition_keys(DOCS[2]) == ["precedent:302", "precedent:34"]
+    assert partition_keys(DOCS[4]) == ["precedent:_none"]
+
+
+def test_manifest_counts(index):
+    assert {key: entry["count"] for key, entry in index.manifest.items()} == {
+        "statute": 1, "precedent:302": 2, "precedent:34": 1, "precedent:304A": 1, "precedent:_none": 1}
+    assert index.precedent_partitions(["302", "34", "420", "302"]) == ["precedent:302", "precedent:34"]
+    assert index.documents_in(["precedent:302", "precedent:34"]) == 3
+
+
+def test_search_stays_inside_partitions_and_merges_duplicates(index):
+    results = index.search("murder", ["precedent:302", "precedent:34"], k=5)
+    assert sorted(doc.metadata["case_no"] for doc in results) == [1, 2]   # case 2 is in both, returned once
+
+
+def test_partitions_load_lazily(index):
+    index.search("rash driving", ["precedent:304A"], k=1)
+    assert set(index._stores) == {"precedent:304A"}
+
+
+def test_missing_manifest_means_no_partitions(tmp_path):
+    assert PartitionedIndex.load(str(tmp_path / "nothing"), FakeEmbeddings()) is None
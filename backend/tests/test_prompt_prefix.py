@@ -0,0 +1,52 @@
+"""The shared system message must be byte-identical for every agent call,
+otherwise Ollama cannot reuse the KV cache of the previous prompt."""
+
+from langchain_core.messages import SystemMessage
+
+from agents import JUDGMENT_CHARS, SYSTEM_PROMPT, MultiAgentOrchestrator, build_shared_prefix
+from fakes import RecordingLLM
+
+RAG = "CASE 7: State v. Kumar (2019) - dying declaration held reliable. " * 5
+
+
+def search(query):
+    return {"answer": "Courts have upheld convictions on dying declarations.",
+            "sources": [{"title": "Case 1", "url": "https://example.org/1"}]}
+
+
+def _prefixes(calls):
+    assert all(isinstance(call[0], SystemMessage) and len(call) == 2 for call in calls)
+    return {call[0].content.encode("utf-8") for call in calls}
+
+
+def test_all_agents_share_the_prefix_byte_for_byte(judgment):
+    llm = RecordingLLM()
+    orchestrator = MultiAgentOrchestrator(llm, web_search_function=search)
+    orchestrator.run(judgment, RAG, mode="full")
+    orchestrator.run(judgment, RAG, mode="fast")
+
+    expected = build_shared_prefix({"judgment_text": judgment, "rag_context": RAG})[0].content
+    assert len(llm.calls) >= 5
+    assert _prefixes(llm.calls) == {expected.encode("utf-8")}
+    assert expected.startswith(SYSTEM_PROMPT)
+    # Each agent's own instructions only ever follow the prefix
+    assert len({call[1].content for call in llm.calls}) == len(llm.calls)
+
+
+def test_prefix_is_shared_across_routed_models(judgment):
+    small, large = RecordingLLM("small"), RecordingLLM("large")
+    orchestrator = MultiAgentOrchestrator(large, web_search_function=search,
+                                          agent_llms={"web": small, "summary": small})
+    orchestrator.run(judgment, RAG)
+
+    assert small.calls and large.calls
+    assert len(_prefixes(small.calls + large.calls)) == 1
+
+
+def test_prefix_ignores_agent_outputs_and_truncates_stably(judgment):
+    long_text = judgment * 20
+    state = {"judgment_text": long_text, "rag_context": RAG}
+    before = build_shared_prefix(state)[0].content
+    state.update(laws_found="Section 302 (IPC)", precedent_analysis="...", web_research="...")
+    assert build_shared_prefix(state)[0].content == before
+    assert long_text[:JUDGMENT_CHARS] in before and long_text[:JUDGMENT_CHARS + 1] not in before
@@ -0,0 +1,43 @@
+import numpy as np
+
+import rag_eval
+
+TEXT = "a" * 1000
+
+
+def test_chunks_are_labelled_by_substantial_overlap():
+    spans = [{"id": "case:1", "source": "precedents", "start": 0, "end": 500},
+             {"id": "case:2", "source": "precedents", "start": 500, "end": 1000}]
+    chunks = [{"source": "precedents", "start": 0, "end": 400},
+              {"source": "precedents", "start": 450, "end": 850},   # 50 chars of case 1 - too little
+              {"source": "laws", "start": 0, "end": 400}]
+    assert rag_eval.label_chunks(chunks, spans) == [{"case:1"}, {"case:2"}, set()]
+
+
+def test_evaluate_recall_and_mrr():
+    vectors = np.eye(4, dtype="float32")
+    index = rag_eval.build_index("flat", vectors)
+    labels = [{"a"}, {"b"}, {"c"}, {"d"}]
+    queries = [{"query": "", "expected": "a"}, {"query": "", "expected": "b"}]
+    # First query finds its chunk at rank 1, the second at rank 2
+    query_vectors = np.array([[1, 0, 0, 0], [0, 0.4, 0.6, 0]], dtype="float32")
+
+    scores = rag_eval.evaluate(index, query_vectors, queries, labels)
+    assert scores["recall@1"] == 0.5
+    assert scores["recall@3"] == 1.0
+    assert scores["mrr@10"] == 0.75
+
+
+def test_queries_come_from_the_real_corpus():
+    with open(rag_eval.PRECEDENTS_FILE, encoding="utf-8") as f:
+        cases = rag_eval.load_case_spans(f.read())
+    with open(rag_eval.LAWS_FILE, encoding="utf-8") as f:
+        sections = rag_eval.load_section_spans(f.read())
+    queries = rag_eval.build_queries(cases, sections, "Facts")
+    assert len(queries["statute"]) == len(sections) > 100
+    assert all(q["expected"].startswith("case:") for q in queries["case"])
+
+
+def test_fixed_size_chunks_cover_the_text():
+    chunks = rag_eval.chunk_corpus({"laws": TEXT}, chunk_size=300, overlap=0)
+    assert chunks[0]["start"] == 0 and chunks[-1]["end"] == len(TEXT)
@@ -0,0 +1,261 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import AgentTimeout, LawIdentifierAgent, MultiAgentOrchestrator
+from fakes import RecordingLLM
+from scheduler import LLMScheduler, Overloaded, QueueTimeout, ScheduledLLM, call_limits
+
+
+class Caller:
+    """One LLM call in its own thread: waits for a slot, holds it until released"""
+
+    def __init__(self, scheduler, name, priority="interactive", client="anonymous", order=None, **slot_kw):
+        self.release = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(scheduler, name, priority, client, order, slot_kw))
+        self.thread.start()
+
+    def _run(self, scheduler, name, priority, client, order, slot_kw):
+        with scheduler.context(priority, client):
+            try:
+                with scheduler.slot(**slot_kw):
+                    if order is not None:
+                        order.append(name)
+                    self.release.wait(5)
+            except QueueTimeout as e:
+                self.error = e
+
+    def finish(self):
+        self.release.set()
+        self.thread.join(5)
+
+
+def wait_queued(scheduler, count, active=None):
+    for _ in range(200):
+        stats = scheduler.stats()
+        if sum(stats["queued"].values()) == count and active in (None, stats["active"]):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"expected {count} queued calls: {scheduler.stats()}")
+
+
+def wait_started(order, count):
+    for _ in range(200):
+        if len(order) >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"expected {count} started calls: {order}")
+
+
+def drain(callers, order, expected):
+    """Release the running call until `expected` calls have held the slot"""
+    for i in range(expected):
+        wait_started(order, i + 1)
+        callers[order[i]].finish()
+
+
+def finish_all(callers):
+    for caller in callers.values():
+        caller.release.set()
+    for caller in callers.values():
+        caller.thread.join(5)
+
+
+@pytest.fixture
+def single_slot():
+    return LLMScheduler(max_concurrency=1, interactive_reserved=0)
+
+
+def test_interactive_calls_go_before_earlier_batch_calls(single_slot):
+    order = []
+    callers = {"busy": Caller(single_slot, "busy", order=order)}
+    wait_queued(single_slot, 0, active=1)
+    callers["batch"] = Caller(single_slot, "batch", "batch", order=order)
+    wait_queued(single_slot, 1)
+    callers["interactive"] = Caller(single_slot, "interactive", order=order)
+    wait_queued(single_slot, 2)
+
+    drain(callers, order, 3)
+    assert order == ["busy", "interactive", "batch"]
+
+
+def test_fewest_running_calls_per_client_goes_first():
+    scheduler = LLMScheduler(max_concurrency=2, interactive_reserved=0)
+    order = []
+    callers = {"a1": Caller(scheduler, "a1", client="a", order=order),
+               "b1": Caller(scheduler, "b1", client="b", order=order)}
+    wait_queued(scheduler, 0, active=2)
+    callers["a2"] = Caller(scheduler, "a2", client="a", order=order)
+    wait_queued(scheduler, 1)
+    callers["b2"] = Caller(scheduler, "b2", client="b", order=order)
+    wait_queued(scheduler, 2)
+
+    callers["b1"].finish()   # b now has fewer running calls than a
+    wait_started(order, 3)
+    assert order[2] == "b2"
+    finish_all(callers)
+
+
+def test_batch_starves_under_interactive_load_without_aging(single_slot):
+    order = []
+    callers = {"busy": Caller(single_slot, "busy", order=order)}
+    wait_queued(single_slot, 0, active=1)
+    callers["batch"] = Caller(single_slot, "batch", "batch", order=order)
+    wait_queued(single_slot, 1)
+    # A new interactive call arrives before every release
+    for i in range(3):
+        callers[f"i{i}"] = Caller(single_slot, f"i{i}", order=order)
+        wait_queued(single_slot, 2)
+        callers[order[-1]].finish()
+        wait_started(order, i + 2)
+    assert "batch" not in order
+    finish_all(callers)
+    assert order[-1] == "batch"
+
+
+def test_aged_batch_call_is_not_starved():
+    scheduler = LLMScheduler(max_concurrency=1, interactive_reserved=0, promote_after=0.1)
+    order = []
+    callers = {"busy": Caller(scheduler, "busy", order=order)}
+    wait_queued(scheduler, 0, active=1)
+    callers["batch"] = Caller(scheduler, "batch", "batch", order=order)
+    wait_queued(scheduler, 1)
+    time.sleep(0.15)
+    callers["interactive"] = Caller(scheduler, "interactive", order=order)
+    wait_queued(scheduler, 2)
+
+    drain(callers, order, 3)
+    assert order == ["busy", "batch", "interactive"]   # aged: ranks as interactive, and queued first
+
+
+def test_wait_gives_up_after_the_timeout(single_slot):
+    busy = Caller(single_slot, "busy")
+    wait_queued(single_slot, 0, active=1)
+    start = time.monotonic()
+    with pytest.raises(QueueTimeout) as error:
+        with single_slot.slot(timeout=0.1):
+            pass
+    assert 0.1 <= time.monotonic() - start < 2
+    assert error.value.reason == "timeout" and isinstance(error.value, TimeoutError)
+    stats = single_slot.stats()
+    assert stats["queued"] == {"interactive": 0, "batch": 0} and stats["abandoned"] == {"interactive": 1}
+
+    busy.finish()
+    with single_slot.slot(timeout=0.1):   # the abandoned waiter did not take the freed slot
+        assert single_slot.stats()["active"] == 1
+
+
+def test_cancel_aborts_the_wait(single_slot):
+    busy = Caller(single_slot, "busy")
+    wait_queued(single_slot, 0, active=1)
+    cancel = threading.Event()
+    waiting = Caller(single_slot, "waiting", cancel=cancel)
+    wait_queued(single_slot, 1)
+
+    cancel.set()
+    waiting.thread.join(2)
+    assert not waiting.thread.is_alive()
+    assert waiting.error.reason == "cancelled"
+    wait_queued(single_slot, 0, active=1)
+    busy.finish()
+
+
+# --- load shedding ---
+
+def admit_burst(scheduler, count, priority="interactive"):
+    def admit(_):
+        try:
+            return scheduler.admit(priority)
+        except Overloaded as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(admit, range(count)))
+
+
+def test_burst_is_shed_before_any_call_finishes():
+    # 2 slots, 5 calls of ~2s per request: the 3rd concurrent request would wait ~5s, the 4th ~10s
+    scheduler = LLMScheduler(max_concurrency=2, max_wait={"interactive": 6.0}, expected_call_seconds=2.0)
+    results = admit_burst(scheduler, 10)
+    admitted = [r for r in results if not isinstance(r, Overloaded)]
+    shed = [r for r in results if isinstance(r, Overloaded)]
+    assert len(admitted) == 3 and len(shed) == 7
+    assert all(e.retry_after >= 6 for e in shed)
+    stats = scheduler.stats()
+    assert stats["admitted"]["interactive"] == 3 and stats["shed"] == {"interactive": 7}
+    assert stats["granted"] == {} and stats["active"] == 0   # no LLM call has even started
+
+    # Finished requests stop counting
+    for admission in admitted:
+        with admission:
+            pass
+    admitted[0].release()   # releasing twice is harmless
+    assert scheduler.stats()["admitted"]["interactive"] == 0
+    assert scheduler.estimated_wait("interactive") == 0.0
+
+
+def test_admitted_batch_requests_do_not_delay_interactive_ones():
+    scheduler = LLMScheduler(max_concurrency=2, max_wait={"interactive": 1.0, "batch": 1000.0},
+                             expected_call_seconds=2.0)
+    assert not any(isinstance(r, Overloaded) for r in admit_burst(scheduler, 6, "batch"))
+    assert scheduler.estimated_wait("interactive") == 0.0
+    assert scheduler.estimated_wait("batch") > 0
+
+
+def test_nothing_is_shed_without_a_call_duration():
+    scheduler = LLMScheduler(max_concurrency=1)
+    assert not any(isinstance(r, Overloaded) for r in admit_burst(scheduler, 5))
+
+
+# --- abandoned calls (deadline + cancel from the agent run) ---
+
+def test_call_waits_only_until_the_callers_deadline(single_slot):
+    busy = Caller(single_slot, "busy")
+    wait_queued(single_slot, 0, active=1)
+    model = RecordingLLM()
+    with call_limits(deadline=time.monotonic() + 0.1), pytest.raises(QueueTimeout) as error:
+        ScheduledLLM(model, single_slot).invoke(["prompt"])
+    assert error.value.reason == "timeout" and model.calls == []
+    busy.finish()
+
+
+def test_cancelled_call_never_reaches_the_model(single_slot):
+    model = RecordingLLM()
+    cancel = threading.Event()
+    cancel.set()
+    with call_limits(cancel=cancel), pytest.raises(QueueTimeout) as error:
+        ScheduledLLM(model, single_slot).invoke(["prompt"])   # a slot is free, but nobody waits for the answer
+    assert error.value.reason == "cancelled" and model.calls == []
+    assert single_slot.stats()["active"] == 0
+
+
+def test_agent_checks_for_cancellation_before_calling(judgment):
+    model = RecordingLLM()
+    cancel = threading.Event()
+    cancel.set()
+    agent = LawIdentifierAgent(model)
+    agent.hedge_llm, agent.hedge_after = RecordingLLM(), 1.0
+    state = MultiAgentOrchestrator(model)._new_state(judgment, "")
+    with call_limits(cancel=cancel), pytest.raises(AgentTimeout):
+        agent.ask(state, "task")
+    assert model.calls == [] and agent.hedge_llm.calls == []
+
+
+def test_timed_out_agent_leaves_the_queue(single_slot, judgment):
+    busy = Caller(single_slot, "busy")
+    wait_queued(single_slot, 0, active=1)
+    model = RecordingLLM()
+    orchestrator = MultiAgentOrchestrator(ScheduledLLM(model, single_slot), agent_timeouts={"fast": 5.0})
+    orchestrator.timeouts["fast"] = 0.1
+
+    result = orchestrator.run(judgment, mode="fast")
+    assert [(d["agent"], d["reason"]) for d in result["degraded_agents"]] == [("Fast Analyzer", "timeout")]
+    wait_queued(single_slot, 0, active=1)   # the abandoned call gave up its place in the queue
+    assert single_slot.stats()["abandoned"] == {"interactive": 1}
+
+    busy.finish()
+    time.sleep(0.1)
+    assert model.calls == []   # ... and never ran once the slot was free
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from benchmark import FakeEmbeddings
+from partitioned_index import PartitionedIndex, build_partitions
+from semantic_cache import SemanticCache, same_documents
+
+A = [1.0, 0.0, 0.0]
+NEAR_A = [0.99, 0.1, 0.0]    # cosine ~0.995
+FAR = [0.0, 1.0, 0.0]
+
+
+def test_hits_above_threshold_only():
+    cache = SemanticCache("test", threshold=0.99)
+    cache.store(A, "value")
+    assert cache.lookup(NEAR_A) == "value"
+    assert cache.lookup(FAR) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_version_and_scope_must_match():
+    cache = SemanticCache("test", threshold=0.99)
+    cache.store(A, "302 results", version=1, scope=("302",))
+    cache.store(A, "420 results", version=1, scope=("420",))
+    assert cache.lookup(A, version=1, scope=("302",)) == "302 results"
+    assert cache.lookup(A, version=1, scope=("420",)) == "420 results"
+    assert cache.lookup(A, version=1, scope=("302", "34")) is None
+    assert cache.lookup(A, version=2, scope=("302",)) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache("test", max_entries=2, threshold=0.99)
+    cache.store([1, 0, 0], "a")
+    cache.store([0, 1, 0], "b")
+    cache.lookup([1, 0, 0])          # a is now the most recently used
+    cache.store([0, 0, 1], "c")
+    assert cache.lookup([0, 1, 0]) is None
+    assert cache.lookup([1, 0, 0]) == "a" and cache.lookup([0, 0, 1]) == "c"
+
+
+def test_false_hits_are_reported():
+    cache = SemanticCache("test", verify_rate=1.0)
+    assert cache.should_verify()
+    cache.record_verification(agreed=True)
+    cache.record_verification(agreed=False)
+    assert cache.stats()["false_hit_rate"] == 0.5
+    assert same_documents([Document(page_content="x")], [Document(page_content="x")])
+
+
+# --- main.py: judgments that only differ after the embedded opening ---
+
+OPENING = ("The appellant was convicted by the trial court and sentenced. The prosecution examined "
+           "several witnesses and relied on the recovery of the weapon. ") * 10
+
+
+@pytest.fixture
+def small_index(main_module, tmp_path):
+    embeddings = FakeEmbeddings()
+    docs = [Document(page_content=f"{text} (case {no})",
+                     metadata={"doc_type": "precedent", "case_no": no, "sections": [section]})
+            for no, section, text in [(1, "302", "murder conviction upheld"), (2, "302", "murder by poisoning"),
+                                      (3, "420", "cheating investors"), (4, "420", "forged sale deed")]]
+    build_partitions(docs, embeddings, str(tmp_path))
+    main_module.index_manager.install_objects(FAISS.from_documents(docs, embeddings),
+                                              PartitionedIndex.load(str(tmp_path), embeddings))
+    yield main_module
+    main_module.index_manager.install_objects()
+
+
+def test_same_opening_different_sections_do_not_collide(small_index):
+    main = small_index
+    murder = OPENING + "The conviction under Section 302 IPC is upheld."
+    cheating = OPENING + "The conviction under Section 420 IPC is upheld."
+    # MiniLM truncates at ~256 tokens: both judgments embed like their opening
+    vector = main.embeddings.embed_query(OPENING)
+    sections = main.index_manager.current.law_extractor.sections
+
+    misses = main.retrieval_cache.misses
+    murder_docs, _ = main.retrieve_context(sections(murder), vector, k=2)
+    cheating_docs, _ = main.retrieve_context(sections(cheating), vector, k=2)
+    assert main.retrieval_cache.misses == misses + 2
+    assert {d.metadata["case_no"] for d in murder_docs} == {1, 2}
+    assert {d.metadata["case_no"] for d in cheating_docs} == {3, 4}
+
+    again, _ = main.retrieve_context(sections(murder), vector, k=2)
+    assert main.retrieval_cache.misses == misses + 2   # same sections: served from cache
+    assert same_documents(again, murder_docs)
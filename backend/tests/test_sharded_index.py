@@ -0,0 +1,186 @@
+import os
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from benchmark import FakeEmbeddings
+from index_manager import IndexManager, load_snapshot
+from partitioned_index import PartitionedIndex, build_partitions
+from sharded_index import ShardedIndex, build_shard, build_shards, read_manifest, remove_shards, shard_of
+
+
+def precedent(case_no, sections, text):
+    return Document(page_content=text, metadata={"doc_type": "precedent", "case_no": case_no, "sections": sections})
+
+
+DOCS = [
+    Document(page_content="Section 302: Punishment for Murder", metadata={"doc_type": "statute", "section": "302"}),
+    Document(page_content="Section 420: Cheating", metadata={"doc_type": "statute", "section": "420"}),
+    precedent(1, ["302"], "murder conviction upheld on eye witness evidence"),
+    precedent(2, ["302", "34"], "murder with common intention by two accused"),
+    precedent(3, ["304A"], "rash driving caused death of pedestrian"),
+    precedent(4, ["420"], "cheating investors with a forged sale deed"),
+    precedent(5, ["302"], "murder by poisoning proved by circumstantial evidence"),
+    precedent(6, [], "public interest litigation on prison conditions"),
+]
+QUERIES = ["murder", "cheating", "rash driving", "prison", "common intention"]
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    root = tmp_path_factory.mktemp("vector_store")
+    embeddings = FakeEmbeddings()
+    build_shards(DOCS, embeddings, str(root / "shards"), num_shards=2)
+    build_partitions(DOCS, embeddings, str(root / "partitions"))
+    index = ShardedIndex(str(root / "shards"), embeddings)
+    yield root, embeddings, index
+    index.close()
+
+
+def ranking(hits):
+    # FakeEmbeddings vectors of unrelated texts tie at the same distance
+    return sorted((round(float(score), 4), doc.page_content) for doc, score in hits)
+
+
+def test_every_document_lands_in_exactly_one_shard(store):
+    root, _, index = store
+    sizes = read_manifest(str(root / "shards"))["sizes"]
+    assert len(index) == 2 and sum(sizes.values()) == len(DOCS) and all(sizes.values())
+    assert [shard.size for shard in index.shards] == [sizes["0"], sizes["1"]]
+
+
+def test_scatter_gather_matches_a_single_index(store):
+    _, embeddings, index = store
+    single = FAISS.from_documents(DOCS, embeddings)
+    for query in QUERIES:
+        vector = embeddings.embed_query(query)
+        assert ranking(index.similarity_search_with_score_by_vector(vector, k=len(DOCS))) == \
+            ranking(single.similarity_search_with_score_by_vector(vector, k=len(DOCS)))
+        top = index.similarity_search_with_score_by_vector(vector, k=3)
+        assert [round(float(s), 4) for _, s in top] == [s for s, _ in ranking(top)][:3]   # nearest first
+    assert index.similarity_search("murder", k=1)[0].page_content == \
+        single.similarity_search("murder", k=1)[0].page_content
+
+
+def test_partition_search_runs_in_the_workers(store):
+    root, embeddings, index = store
+    partitioned = PartitionedIndex.load(str(root / "partitions"), embeddings)
+    assert {key: entry["count"] for key, entry in index.partitions.manifest.items()} == \
+        {key: entry["count"] for key, entry in partitioned.manifest.items()}
+
+    keys = index.partitions.precedent_partitions(["302", "34"])
+    assert keys == ["precedent:302", "precedent:34"] and index.partitions.documents_in(keys) == 4
+    for query in QUERIES:
+        vector = embeddings.embed_query(query)
+        hits = index.partitions.search_by_vector(vector, keys, k=4)
+        assert ranking(hits) == ranking(partitioned.search_by_vector(vector, keys, k=4))
+        assert all({"302", "34"} & set(doc.metadata["sections"]) for doc, _ in hits)
+
+
+def test_sharded_snapshot_keeps_partitions_in_the_workers(store):
+    root, embeddings, _ = store
+    snapshot = load_snapshot(str(root), embeddings, version=1)
+    try:
+        assert snapshot.kind == "sharded"
+        assert snapshot.partitioned_db is snapshot.vector_db.partitions
+        assert snapshot.documents() == len(DOCS)
+    finally:
+        snapshot.close()
+
+
+def test_reload_one_shard_through_the_endpoint(tmp_path, main_module, client, monkeypatch):
+    embeddings = FakeEmbeddings()
+    path = str(tmp_path / "shards")
+    build_shards(DOCS, embeddings, path, num_shards=2)
+    manager = IndexManager(str(tmp_path), embeddings)
+    monkeypatch.setattr(main_module, "index_manager", manager)
+    headers = {"X-Admin-Token": "test-admin-token"}
+
+    response = client.post("/admin/reload-index?shard=0", headers=headers)
+    assert response.status_code == 409   # nothing loaded yet
+
+    manager.load()
+    try:
+        index = manager.current.vector_db
+        # Rebuild shard 0 with one more case, then reload only that shard
+        extra = next(doc for no in range(7, 50)
+                     for doc in [precedent(no, ["302"], f"murder case {no}")] if shard_of(doc, 2) == 0)
+        before = index.shards[0].size
+        build_shard(DOCS + [extra], embeddings, path, shard=0, num_shards=2)
+        version = manager.version
+
+        response = client.post("/admin/reload-index?shard=0", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"shard": 0, "documents": before + 1, "version": version + 1}
+        assert index.partitions.manifest["precedent:302"]["count"] == 4
+        assert client.post("/admin/reload-index?shard=5", headers=headers).status_code == 404
+        assert client.post("/admin/reload-index?shard=0").status_code == 403
+    finally:
+        manager.current.close()
+
+
+# --- rebuilds ---
+
+class FailingEmbeddings(FakeEmbeddings):
+    """Fails on the n-th embed_documents call (a build that dies half way)"""
+
+    def __init__(self, fail_on: int):
+        super().__init__()
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("embedding model crashed")
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def built(tmp_path):
+    path = str(tmp_path / "shards")
+    build_shards(DOCS, FakeEmbeddings(), path, num_shards=2)
+    return path, read_manifest(path)
+
+
+def assert_serves(path, manifest):
+    assert read_manifest(path) == manifest
+    index = ShardedIndex(path, FakeEmbeddings())
+    try:
+        assert len(index) == 2 and sum(shard.size for shard in index.shards) == len(DOCS)
+    finally:
+        index.close()
+
+
+def test_empty_shard_is_rejected_before_anything_is_written(built):
+    path, manifest = built
+    with pytest.raises(ValueError, match="would be empty"):
+        build_shards(DOCS, FakeEmbeddings(), path, num_shards=len(DOCS) * 4)
+    assert_serves(path, manifest)
+
+
+def test_failed_build_keeps_the_old_shards(built):
+    path, manifest = built
+    with pytest.raises(RuntimeError):
+        build_shards(DOCS, FailingEmbeddings(fail_on=2), path, num_shards=3)
+    assert_serves(path, manifest)
+    assert not os.path.exists(path + ".tmp")
+
+    assert build_shards(DOCS, FakeEmbeddings(), path, num_shards=3)["num_shards"] == 3
+    assert sorted(os.listdir(path)) == ["shard-0", "shard-1", "shard-2", "shards.json"]
+
+
+def test_single_index_rebuild_retires_old_shards(tmp_path):
+    embeddings = FakeEmbeddings()
+    build_shards(DOCS, embeddings, str(tmp_path / "shards"), num_shards=2)
+    FAISS.from_documents(DOCS[:2], embeddings).save_local(str(tmp_path))   # rebuilt without --shards
+    manifest = tmp_path / "shards" / "shards.json"
+    os.utime(manifest, (1, 1))   # built long before the new index.faiss
+
+    snapshot = load_snapshot(str(tmp_path), embeddings, version=1)
+    assert snapshot.kind == "faiss" and snapshot.documents() == 2
+
+    remove_shards(str(tmp_path / "shards"))
+    assert not (tmp_path / "shards").exists()
+    remove_shards(str(tmp_path / "shards"))   # nothing to remove
@@ -0,0 +1,56 @@
+import pytest
+
+import tracing
+from agents import MultiAgentOrchestrator
+from fakes import RecordingLLM
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter():
+    previous = tracing.TRACER
+    exporter = ListExporter()
+    tracing.configure(exporter, sample_rate=1.0)
+    yield exporter
+    tracing.TRACER = previous
+
+
+def test_agent_spans_parent_their_llm_calls(exporter, judgment):
+    with tracing.span("run_analysis", mode="full"):
+        MultiAgentOrchestrator(RecordingLLM(), web_search_function=lambda q: {"answer": "", "sources": []}
+                               ).run(judgment, "")
+
+    by_id = {span.span_id: span for span in exporter.spans}
+    root = next(span for span in exporter.spans if span.name == "run_analysis")
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+    llm_calls = [span for span in exporter.spans if span.name == "llm.invoke"]
+    assert llm_calls
+    for span in llm_calls:
+        parent = by_id[span.parent_id]
+        assert parent.name == "agent.run" and parent.attributes["agent"] == span.attributes["agent"]
+        assert span.attributes["llm.model"] == "fake-llm"
+
+
+def test_exceptions_are_recorded_and_reraised(exporter):
+    with pytest.raises(RuntimeError):
+        with tracing.span("vector_db.similarity_search"):
+            raise RuntimeError("index missing")
+    (span,) = exporter.spans
+    assert span.status == "ERROR"
+    assert span.events[0]["attributes"]["exception.type"] == "RuntimeError"
+
+
+def test_unsampled_traces_export_nothing():
+    exporter = ListExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=0.0)
+    with tracer.span("run_analysis") as span:
+        span.set_attribute("ignored", True)
+    assert span is tracing.NOOP_SPAN
+    assert exporter.spans == []
@@ -0,0 +1,216 @@
+"""
+DISTRIBUTED TRACING
+===================
+
+OpenTelemetry-compatible spans for the analysis pipeline:
+run_analysis → agent.run → llm.invoke / search_tool.run / vector_db.similarity_search
+
+Configured from the environment:
+  TRACE_EXPORTER     none (default) | file | console | otlp
+  TRACE_SAMPLE_RATE  fraction of analyses traced (head sampling, default 0.1)
+  TRACE_FILE         JSONL output for the "file" exporter (default data/traces.jsonl)
+
+"otlp" uses the OpenTelemetry SDK (pip install opentelemetry-sdk
+opentelemetry-exporter-otlp) and the standard OTEL_EXPORTER_OTLP_ENDPOINT.
+The other exporters use the small built-in tracer below, which writes spans
+with OTLP field names so they can be replayed into a collector later.
+Unsampled requests get a no-op span, so tracing costs ~nothing when off.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+SERVICE_NAME = "judicial-ai-backend"
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/traces.jsonl")
+
+
+class _NoopSpan:
+    """Returned for unsampled traces - every call is a no-op"""
+
+    sampled = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Minimal span with OTLP-style fields"""
+
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "OK"
+        self.events = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc):
+        self.status = "ERROR"
+        self.events.append({
+            "name": "exception",
+            "time_unix_nano": time.time_ns(),
+            "attributes": {"exception.type": type(exc).__name__, "exception.message": str(exc)},
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            "resource": {"service.name": SERVICE_NAME},
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id or "",
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "events": self.events,
+        }
+
+
+class FileExporter:
+    """Appends finished spans as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class ConsoleExporter:
+    def export(self, span: Span):
+        print(f"   🔭 {span.name} {(span.end_ns - span.start_ns) / 1e6:.1f} ms {span.attributes}")
+
+
+_current_span: contextvars.ContextVar[Optional[object]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Head-sampled tracer: the root span decides, children inherit"""
+
+    def __init__(self, exporter=None, sample_rate: float = 0.1, otel_tracer=None):
+        self.exporter = exporter
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.otel_tracer = otel_tracer
+
+    @property
+    def enabled(self) -> bool:
+        return (self.exporter is not None or self.otel_tracer is not None) and self.sample_rate > 0
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        if parent is None:
+            sampled = random.random() < self.sample_rate
+        else:
+            sampled = parent is not NOOP_SPAN
+        if not sampled:
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                yield NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        if self.otel_tracer is not None:
+            with self.otel_tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+                token = _current_span.set(otel_span)
+                try:
+                    yield otel_span
+                finally:
+                    _current_span.reset(token)
+            return
+
+        trace_id = parent.trace_id if parent is not None else "%032x" % random.getrandbits(128)
+        span = Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.export(span)
+
+
+def _otel_tracer():
+    """OpenTelemetry SDK tracer with OTLP export (optional dependency)"""
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ALWAYS_ON
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        print("⚠️ TRACE_EXPORTER=otlp needs opentelemetry-sdk + opentelemetry-exporter-otlp – tracing disabled")
+        return None
+
+    # Sampling is decided by Tracer.span(), so the SDK records everything it is given
+    provider = TracerProvider(sampler=ALWAYS_ON, resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    return provider.get_tracer("judicial-ai")
+
+
+def tracer_from_env() -> Tracer:
+    exporter_name = os.getenv("TRACE_EXPORTER", "none").lower()
+    sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+
+    if exporter_name == "file":
+        return Tracer(FileExporter(os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE)), sample_rate)
+    if exporter_name == "console":
+        return Tracer(ConsoleExporter(), sample_rate)
+    if exporter_name == "otlp":
+        return Tracer(sample_rate=sample_rate, otel_tracer=_otel_tracer())
+    return Tracer(sample_rate=0.0)
+
+
+TRACER = tracer_from_env()
+
+
+def span(name: str, **attributes):
+    """``with tracing.span("llm.invoke", agent=...) as sp:`` on the global tracer"""
+    return TRACER.span(name, **attributes)
+
+
+def configure(exporter=None, sample_rate: float = 1.0) -> Tracer:
+    """Replace the global tracer (benchmarks / tests)"""
+    global TRACER
+    TRACER = Tracer(exporter, sample_rate)
+    return TRACER